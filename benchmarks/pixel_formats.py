@@ -0,0 +1,92 @@
+"""
+Benchmark: export pixel path before and after removing RGB->BGR conversion
+
+Compares the old path (paint into Format_RGB888, cv2.cvtColor to BGR for
+cv2.VideoWriter) with the native path (paint into Format_RGB32, hand the
+buffer to FFmpeg as-is) at 1080p and 4K.
+
+Usage:
+    python -m benchmarks.pixel_formats [--frames N]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QPainter, QImage, QColor
+from PyQt6.QtCore import QRectF
+
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+
+
+def paint_bars(image: QImage, width: int, height: int, frame_idx: int):
+    """Paint a bar equalizer similar to the default visualizer"""
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    num_bars = 64
+    bar_width = width / num_bars
+    for i in range(num_bars):
+        level = 0.5 + 0.5 * np.sin(frame_idx * 0.1 + i * 0.3)
+        bar_height = level * height * 0.5
+        painter.fillRect(
+            QRectF(i * bar_width + 1, height - bar_height, bar_width - 2, bar_height),
+            QColor(0, 180, 216)
+        )
+    painter.end()
+
+
+def bench_rgb888_convert(width: int, height: int, frames: int) -> float:
+    """Old path: RGB888 painter target plus a full-frame cvtColor"""
+    rgb = np.zeros((height, width, 3), dtype=np.uint8)
+    bgr = np.zeros((height, width, 3), dtype=np.uint8)
+    image = QImage(rgb.ctypes.data, width, height, width * 3,
+                   QImage.Format.Format_RGB888)
+    
+    start = time.perf_counter()
+    for frame_idx in range(frames):
+        rgb.fill(0)
+        paint_bars(image, width, height, frame_idx)
+        cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR, dst=bgr)
+    return (time.perf_counter() - start) / frames
+
+
+def bench_rgb32_native(width: int, height: int, frames: int) -> float:
+    """New path: RGB32 painter target written to FFmpeg unchanged"""
+    pixels = np.zeros((height, width, 4), dtype=np.uint8)
+    image = QImage(pixels.ctypes.data, width, height, width * 4,
+                   QImage.Format.Format_RGB32)
+    
+    start = time.perf_counter()
+    for frame_idx in range(frames):
+        image.fill(0xFF000000)
+        paint_bars(image, width, height, frame_idx)
+    return (time.perf_counter() - start) / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--frames", type=int, default=120,
+                        help="Frames rendered per measurement")
+    args = parser.parse_args()
+    
+    app = QApplication.instance() or QApplication(sys.argv)
+    
+    print(f"{'Resolution':<12}{'RGB888+cvtColor':>18}{'RGB32 native':>16}{'Speedup':>10}")
+    for name, (width, height) in RESOLUTIONS.items():
+        old = bench_rgb888_convert(width, height, args.frames)
+        new = bench_rgb32_native(width, height, args.frames)
+        print(f"{name:<12}{old * 1000:>15.2f} ms{new * 1000:>13.2f} ms{old / new:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""
+Benchmark: offscreen rendering across visualizer types, band counts and resolutions
+
+Renders synthetic songs through the export render core (scene snapshot,
+VideoExporter.update_nodes and paint_frame) without a window or an
+encoder, and records throughput, per-frame latency percentiles and
+Python-level allocations for every case. Results are written as JSON;
+compare checks a run against a stored baseline and exits with status 1
+if any case got slower.
+
+Usage:
+    python -m benchmarks.render_suite run [--suite standard] [--output results.json]
+                                          [--baseline baseline.json]
+    python -m benchmarks.render_suite compare baseline.json results.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.headless import setup_headless_environment, ensure_application
+
+setup_headless_environment()
+
+from PyQt6.QtCore import QT_VERSION_STR
+
+from benchmarks.synthetic_audio import AUDIO_KINDS, write_audio
+from core.scene_snapshot import SceneSnapshot
+from core.segments import read_json, write_json_atomic
+from core.video_exporter import VideoExporter
+from models.audio_processor import AudioProcessor
+from models.project_state import ProjectState, ElementState
+from utils.config import ElementType, VisualizerType
+from utils.resources import peak_rss_mb
+
+
+RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4K": (3840, 2160),
+}
+
+BAND_COUNTS = (16, 32, 64, 128, 256, 512)
+
+SUITES = ("quick", "standard", "full")
+
+# Frames rendered per case (after warm-up), unless --frames is given
+SUITE_FRAMES = {"quick": 60, "standard": 120, "full": 120}
+
+AUDIO_SECONDS = 10.0
+FPS = 30
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """One project configuration to render"""
+    visualizer_type: str
+    bands: int
+    resolution: str
+    audio: str = "sweep"
+    
+    @property
+    def id(self) -> str:
+        return f"{self.visualizer_type}/{self.bands}b/{self.resolution}/{self.audio}"
+    
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def build_suite(name: str) -> List[BenchmarkCase]:
+    """
+    Cases of a suite
+    
+    quick:    a few common types at 720p
+    standard: every type at 1080p, plus band count, resolution and
+              audio sweeps of the bar visualizer
+    full:     every type at every band count and resolution
+    """
+    types = [t.value for t in VisualizerType]
+    
+    if name == "quick":
+        cases = [BenchmarkCase(t, 64, "720p") for t in ("bars", "circular", "waveform")]
+    elif name == "standard":
+        cases = [BenchmarkCase(t, 64, "1080p") for t in types]
+        cases += [BenchmarkCase("bars", bands, "1080p") for bands in BAND_COUNTS]
+        cases += [BenchmarkCase("bars", 64, resolution) for resolution in RESOLUTIONS]
+        cases += [BenchmarkCase("bars", 64, "1080p", audio) for audio in AUDIO_KINDS]
+    elif name == "full":
+        cases = [BenchmarkCase(t, bands, resolution, audio)
+                 for t in types
+                 for bands in BAND_COUNTS
+                 for resolution in RESOLUTIONS
+                 for audio in AUDIO_KINDS]
+    else:
+        raise ValueError(f"Unknown suite '{name}' (expected one of {', '.join(SUITES)})")
+    
+    # Drop duplicates (e.g. bars/64b/1080p/sweep), keeping the order
+    return list(dict.fromkeys(cases))
+
+
+def build_project(case: BenchmarkCase, audio_path: str) -> ProjectState:
+    """Project with one full-width visualizer"""
+    project = ProjectState(audio_path=audio_path, resolution=RESOLUTIONS[case.resolution],
+                           fps=FPS)
+    project.visualizer_settings.visualizer_type = VisualizerType(case.visualizer_type)
+    project.visualizer_settings.eq_bands = case.bands
+    project.add_element(ElementState(ElementType.VISUALIZER, 160, 240, 1600, 600))
+    return project
+
+
+def percentile_ms(samples: np.ndarray, q: float) -> float:
+    return round(float(np.percentile(samples, q)) * 1000, 3)
+
+
+def run_case(case: BenchmarkCase, audio_processor: AudioProcessor, frames: int,
+             warmup: int = 10, alloc_frames: int = 20) -> Dict:
+    """
+    Render one case and measure it
+    
+    Latency covers updating (spectrum analysis) and painting a frame.
+    Allocations are measured in a separate pass with tracemalloc, which
+    would otherwise slow down the timed frames: alloc_peak_kb is the
+    largest Python/NumPy working set of a frame, alloc_net_kb what the
+    frames left allocated (growth here points at a leak).
+    """
+    project = build_project(case, audio_processor.filepath)
+    scene = SceneSnapshot.capture(project, audio_processor)
+    exporter = VideoExporter(scene, "")
+    width, height = exporter.resolution
+    exporter.prepare_buffers(width, height)
+    
+    # Wrap around within the song, skipping the silent first second
+    span = max(1.0, audio_processor.duration - 1.0)
+    
+    def render(index: int):
+        exporter.update_nodes(1.0 + (index / FPS) % span)
+        exporter.paint_frame(width, height)
+    
+    for index in range(warmup):
+        render(index)
+    
+    clock = time.perf_counter
+    latencies = np.empty(frames)
+    started = clock()
+    for i in range(frames):
+        frame_started = clock()
+        render(warmup + i)
+        latencies[i] = clock() - frame_started
+    elapsed = clock() - started
+    
+    result = {
+        **case.to_dict(),
+        'id': case.id,
+        'width': width,
+        'height': height,
+        'frames': frames,
+        'fps': round(frames / elapsed, 2),
+        'mean_ms': round(float(latencies.mean()) * 1000, 3),
+        'p50_ms': percentile_ms(latencies, 50),
+        'p95_ms': percentile_ms(latencies, 95),
+        'p99_ms': percentile_ms(latencies, 99),
+        'max_ms': round(float(latencies.max()) * 1000, 3),
+    }
+    
+    if alloc_frames > 0:
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            for i in range(alloc_frames):
+                render(warmup + frames + i)
+            after, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result['alloc_peak_kb'] = round((peak - before) / 1024, 1)
+        result['alloc_net_kb'] = round((after - before) / 1024, 1)
+    
+    return result
+
+
+def git_revision() -> Optional[str]:
+    """Short commit hash of the tree being measured"""
+    try:
+        output = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def run_suite(cases: List[BenchmarkCase], frames: int, warmup: int = 10,
+              alloc_frames: int = 20, log=None) -> Dict:
+    """Run cases and return the results document"""
+    ensure_application()
+    
+    results = []
+    with tempfile.TemporaryDirectory(prefix="vs_bench_") as directory:
+        audio_processors: Dict[str, AudioProcessor] = {}
+        
+        for index, case in enumerate(cases, start=1):
+            audio_processor = audio_processors.get(case.audio)
+            if audio_processor is None:
+                path = write_audio(case.audio, directory, AUDIO_SECONDS)
+                audio_processor = AudioProcessor()
+                with contextlib.redirect_stdout(sys.stderr):
+                    if not audio_processor.load_audio(path):
+                        raise RuntimeError(f"Failed to load synthetic audio {path}")
+                audio_processors[case.audio] = audio_processor
+            
+            result = run_case(case, audio_processor, frames, warmup, alloc_frames)
+            results.append(result)
+            if log:
+                log(f"[{index}/{len(cases)}] {case.id:<36}{result['fps']:>9.1f} fps"
+                    f"{result['p50_ms']:>9.2f} ms p50{result['p99_ms']:>9.2f} ms p99")
+    
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'qt': QT_VERSION_STR,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'frames': frames,
+            'warmup': warmup,
+            'alloc_frames': alloc_frames,
+            'peak_rss_mb': peak_rss_mb(),
+        },
+        'cases': results,
+    }
+
+
+def compare_results(baseline: Dict, current: Dict, metric: str = "p50_ms",
+                    threshold: float = 0.10,
+                    min_delta_ms: float = 0.1) -> List[Dict]:
+    """
+    Compare two result documents case by case
+    
+    A case is 'slower' when its metric grew by more than threshold
+    (relative) and min_delta_ms (absolute - sub-millisecond cases are
+    noisy), 'faster' for the same improvement, otherwise 'same'. Cases
+    only in one of the documents are 'new' or 'missing'.
+    """
+    base_cases = {case['id']: case for case in baseline.get('cases', [])}
+    current_cases = {case['id']: case for case in current.get('cases', [])}
+    
+    rows = []
+    for case_id, case in current_cases.items():
+        base = base_cases.get(case_id)
+        if base is None or metric not in base:
+            rows.append({'id': case_id, 'status': 'new', 'current': case.get(metric)})
+            continue
+        
+        before, after = base[metric], case[metric]
+        change = (after - before) / before if before else 0.0
+        status = "same"
+        if abs(after - before) >= min_delta_ms:
+            if change > threshold:
+                status = "slower"
+            elif change < -threshold:
+                status = "faster"
+        rows.append({'id': case_id, 'status': status, 'baseline': before,
+                     'current': after, 'change': round(change, 4)})
+    
+    for case_id in base_cases.keys() - current_cases.keys():
+        rows.append({'id': case_id, 'status': 'missing',
+                     'baseline': base_cases[case_id].get(metric)})
+    
+    return rows
+
+
+def print_comparison(rows: List[Dict], metric: str):
+    print(f"{'Case':<38}{'Baseline':>12}{'Current':>12}{'Change':>10}  Status")
+    for row in rows:
+        before = row.get('baseline')
+        after = row.get('current')
+        change = row.get('change')
+        print(f"{row['id']:<38}"
+              f"{'' if before is None else f'{before:.2f}':>12}"
+              f"{'' if after is None else f'{after:.2f}':>12}"
+              f"{'' if change is None else f'{change:+.1%}':>10}  {row['status']}")
+    
+    slower = sum(1 for row in rows if row['status'] == 'slower')
+    print(f"\n{slower} of {len(rows)} cases slower ({metric})")
+
+
+def load_results(path: str) -> Dict:
+    results = read_json(path)
+    if results is None or 'cases' not in results:
+        raise SystemExit(f"Not a benchmark result file: {path}")
+    return results
+
+
+def add_compare_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--metric", default="p50_ms",
+                        choices=("mean_ms", "p50_ms", "p95_ms", "p99_ms"),
+                        help="Latency compared against the baseline (default: p50_ms)")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown reported as a regression (default: 0.10)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.1,
+                        help="Ignore changes smaller than this (default: 0.1 ms)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    run = commands.add_parser("run", help="Run a suite and write the results")
+    run.add_argument("--suite", choices=SUITES, default="standard")
+    run.add_argument("--type", action="append", dest="types",
+                     choices=[t.value for t in VisualizerType],
+                     help="Only run cases of this visualizer type (repeatable)")
+    run.add_argument("--frames", type=int, help="Frames measured per case")
+    run.add_argument("--warmup", type=int, default=10, help="Unmeasured frames per case")
+    run.add_argument("--alloc-frames", type=int, default=20,
+                     help="Frames of the allocation pass (0 disables it)")
+    run.add_argument("--output", "-o", help="Results file (default: print to stdout)")
+    run.add_argument("--baseline", help="Compare the results against this file")
+    add_compare_arguments(run)
+    
+    compare = commands.add_parser("compare", help="Compare two result files")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    add_compare_arguments(compare)
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == "compare":
+        baseline = load_results(args.baseline)
+        current = load_results(args.current)
+    else:
+        baseline = load_results(args.baseline) if args.baseline else None
+        
+        cases = build_suite(args.suite)
+        if args.types:
+            cases = [case for case in cases if case.visualizer_type in args.types]
+        frames = args.frames or SUITE_FRAMES[args.suite]
+        
+        current = run_suite(cases, frames, args.warmup, args.alloc_frames,
+                            log=lambda line: print(line, file=sys.stderr))
+        if args.output:
+            write_json_atomic(args.output, current)
+        else:
+            json.dump(current, sys.stdout, indent=2)
+            print()
+        
+        if baseline is None:
+            return 0
+    
+    rows = compare_results(baseline, current, args.metric, args.threshold,
+                           args.min_delta_ms)
+    # The table goes to stderr when stdout carries the results
+    with contextlib.redirect_stdout(sys.stderr if args.command == "run"
+                                    and not args.output else sys.stdout):
+        print_comparison(rows, args.metric)
+    return 1 if any(row['status'] == 'slower' for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
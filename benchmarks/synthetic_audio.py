@@ -0,0 +1,89 @@
+"""
+Synthetic test audio for the render benchmarks
+
+Each signal stresses the analysis differently: a sine sweep moves one
+peak across all bands, white noise fills every band at once and a drum
+loop produces the sharp transients of real music. Signals are seeded,
+so every run analyses the same samples.
+"""
+import os
+from typing import Callable, Dict
+
+import numpy as np
+import soundfile as sf
+
+
+SAMPLE_RATE = 22050
+
+
+def sine_sweep(duration: float, sample_rate: int = SAMPLE_RATE,
+               low: float = 40.0, high: float = 10000.0) -> np.ndarray:
+    """Exponential sweep from low to high Hz"""
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    rate = np.log(high / low) / duration
+    phase = 2 * np.pi * low * (np.exp(rate * t) - 1) / rate
+    return (0.5 * np.sin(phase)).astype(np.float32)
+
+
+def white_noise(duration: float, sample_rate: int = SAMPLE_RATE,
+                seed: int = 0) -> np.ndarray:
+    """Gaussian noise at about -12 dBFS"""
+    rng = np.random.default_rng(seed)
+    samples = rng.normal(0.0, 0.25, int(duration * sample_rate))
+    return np.clip(samples, -1.0, 1.0).astype(np.float32)
+
+
+def drum_loop(duration: float, sample_rate: int = SAMPLE_RATE,
+              bpm: float = 120.0, seed: int = 0) -> np.ndarray:
+    """Four-on-the-floor kick, snare on 2 and 4, eighth-note hi-hats"""
+    rng = np.random.default_rng(seed)
+    out = np.zeros(int(duration * sample_rate), dtype=np.float32)
+    beat = 60.0 / bpm
+    
+    def hit(start: float, sound: np.ndarray):
+        i = int(start * sample_rate)
+        n = min(len(sound), len(out) - i)
+        if n > 0:
+            out[i:i + n] += sound[:n]
+    
+    t = np.arange(int(0.25 * sample_rate)) / sample_rate
+    # Kick: pitch drops from 120 to 45 Hz
+    kick = np.sin(2 * np.pi * (45 * t + 75 * (1 - np.exp(-t * 30)) / 30))
+    kick *= np.exp(-t * 12)
+    # Snare: noise burst over a 190 Hz body
+    snare = (rng.normal(0, 0.5, len(t)) + np.sin(2 * np.pi * 190 * t)) * np.exp(-t * 25)
+    # Hi-hat: short noise burst, high-passed by differencing
+    hat = np.diff(rng.normal(0, 0.3, len(t) + 1)) * np.exp(-t * 80)
+    
+    position = 0.0
+    count = 0
+    while position < duration:
+        if count % 2 == 0:
+            hit(position, 0.8 * kick)
+            if count % 4 == 2:
+                hit(position, 0.5 * snare)
+        hit(position, 0.3 * hat)
+        position += beat / 2
+        count += 1
+    
+    return np.clip(out, -1.0, 1.0).astype(np.float32)
+
+
+AUDIO_KINDS: Dict[str, Callable[[float], np.ndarray]] = {
+    "sweep": sine_sweep,
+    "noise": white_noise,
+    "drums": drum_loop,
+}
+
+
+def write_audio(kind: str, directory: str, duration: float) -> str:
+    """Generate a signal and write it as WAV; returns the file path"""
+    try:
+        generate = AUDIO_KINDS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown audio kind '{kind}' "
+                         f"(expected one of {', '.join(AUDIO_KINDS)})")
+    
+    path = os.path.join(directory, f"{kind}_{duration:g}s.wav")
+    sf.write(path, generate(duration), SAMPLE_RATE)
+    return path
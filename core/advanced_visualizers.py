@@ -23,7 +23,6 @@ class DotsVisualizer:
             gradient_func: Function to get gradient color
             num_particles: Number of particles
         """
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         painter.setPen(Qt.PenStyle.NoPen)
         
         # Calculate particle positions
@@ -73,8 +72,6 @@ class WaveformVisualizer:
     def draw(painter: QPainter, spectrum: np.ndarray, width: float, height: float,
              gradient_func, line_thickness: int = 2):
         """Draw waveform visualizer"""
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
         center_y = height / 2
         
         # Upper waveform
@@ -163,8 +160,6 @@ class RibbonVisualizer:
     def draw(painter: QPainter, spectrum: np.ndarray, width: float, height: float,
              gradient_func, ribbon_width: float = 40):
         """Draw ribbon visualizer"""
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
         center_y = height / 2
         
         # Create ribbon path
@@ -226,8 +221,6 @@ class AreaVisualizer:
     def draw(painter: QPainter, spectrum: np.ndarray, width: float, height: float,
              gradient_func):
         """Draw area visualizer"""
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
         # Create path for area
         path = QPainterPath()
         path.moveTo(0, height)
@@ -275,8 +268,6 @@ class SpiralVisualizer:
     def draw(painter: QPainter, spectrum: np.ndarray, width: float, height: float,
              gradient_func, num_spirals: int = 3):
         """Draw spiral visualizer"""
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
         center_x = width / 2
         center_y = height / 2
         max_radius = min(width, height) / 2 - 20
@@ -318,7 +309,6 @@ class PulseCircleVisualizer:
     def draw(painter: QPainter, spectrum: np.ndarray, width: float, height: float,
              gradient_func):
         """Draw pulse circles"""
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         painter.setPen(Qt.PenStyle.NoPen)
         
         center_x = width / 2
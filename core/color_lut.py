@@ -0,0 +1,215 @@
+"""
+Adobe/Resolve .cube colour lookup tables
+
+A 3D LUT samples a colour transform on an N x N x N grid (typically 17,
+33 or 65 points per axis). Interpolating that grid for every pixel of
+every frame would cost dozens of float operations per pixel, so the LUT
+is expanded once - by vectorized trilinear interpolation - into a table
+with an entry for each of the 256^3 8-bit colours (64 MB). The table is
+indexed by the pixel itself: a BGRA pixel read as a little-endian uint32
+is A << 24 | R << 16 | G << 8 | B, so grading a frame is
+
+    index = pixel & 0xFFFFFF
+    pixel = table[index] | pixel & 0xFF000000
+
+with entries packed the same way (B', G', R', 0 bytes).
+
+1D LUTs (per-channel curves) compile to 256-entry tables for cv2.LUT.
+"""
+import functools
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class CubeLUT:
+    """
+    Parsed .cube file
+    
+    table holds the output RGB values (floats, usually 0-1): shape
+    (size, size, size, 3) indexed [blue][green][red] for 3D LUTs - the
+    file order, red changing fastest - or (size, 3) for 1D LUTs.
+    """
+    
+    def __init__(self, table: np.ndarray, title: str = "",
+                 domain_min: Tuple[float, float, float] = (0.0, 0.0, 0.0),
+                 domain_max: Tuple[float, float, float] = (1.0, 1.0, 1.0)):
+        self.table = table
+        self.title = title
+        self.domain_min = np.asarray(domain_min, dtype=np.float32)
+        self.domain_max = np.asarray(domain_max, dtype=np.float32)
+    
+    @property
+    def is_3d(self) -> bool:
+        return self.table.ndim == 4
+    
+    @property
+    def size(self) -> int:
+        return self.table.shape[0]
+    
+    @classmethod
+    def parse(cls, text: str) -> 'CubeLUT':
+        """Parse the contents of a .cube file; raises ValueError if invalid"""
+        title = ""
+        size_1d = size_3d = None
+        domain_min = (0.0, 0.0, 0.0)
+        domain_max = (1.0, 1.0, 1.0)
+        values: List[Tuple[float, float, float]] = []
+        
+        for number, line in enumerate(text.splitlines(), 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            
+            keyword, _, rest = line.partition(' ')
+            try:
+                if keyword == 'TITLE':
+                    title = rest.strip().strip('"')
+                elif keyword == 'LUT_3D_SIZE':
+                    size_3d = int(rest)
+                elif keyword == 'LUT_1D_SIZE':
+                    size_1d = int(rest)
+                elif keyword == 'DOMAIN_MIN':
+                    domain_min = tuple(float(v) for v in rest.split())
+                elif keyword == 'DOMAIN_MAX':
+                    domain_max = tuple(float(v) for v in rest.split())
+                elif keyword[0].isalpha():
+                    continue  # Other keywords (e.g. LUT_3D_INPUT_RANGE)
+                else:
+                    r, g, b = (float(v) for v in line.split())
+                    values.append((r, g, b))
+            except ValueError:
+                raise ValueError(f"Invalid .cube line {number}: '{line}'")
+        
+        if (size_1d is None) == (size_3d is None):
+            raise ValueError("A .cube file needs exactly one of LUT_1D_SIZE and LUT_3D_SIZE")
+        if len(domain_min) != 3 or len(domain_max) != 3:
+            raise ValueError("DOMAIN_MIN and DOMAIN_MAX need three values")
+        
+        size = size_3d or size_1d
+        expected = size ** 3 if size_3d else size
+        if size < 2 or len(values) != expected:
+            raise ValueError(f"Expected {expected} LUT entries for size {size}, "
+                             f"found {len(values)}")
+        
+        table = np.asarray(values, dtype=np.float32)
+        if size_3d:
+            table = table.reshape(size, size, size, 3)
+        return cls(table, title, domain_min, domain_max)
+    
+    @classmethod
+    def load(cls, path: str) -> 'CubeLUT':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.parse(f.read())
+    
+    def grid_positions(self) -> np.ndarray:
+        """
+        Grid coordinate of every 8-bit input value, per channel
+        
+        Returns:
+            (256, 3) float32 in 0..size-1, columns R, G, B
+        """
+        values = np.arange(256, dtype=np.float32)[:, None] / 255
+        span = np.maximum(self.domain_max - self.domain_min, 1e-6)
+        positions = (values - self.domain_min) / span * (self.size - 1)
+        return np.clip(positions, 0, self.size - 1)
+    
+    def compile_1d(self) -> np.ndarray:
+        """
+        Per-channel table for cv2.LUT
+        
+        Returns:
+            (256, 3) uint8, columns B, G, R
+        """
+        if self.is_3d:
+            raise ValueError("compile_1d needs a 1D LUT")
+        
+        positions = self.grid_positions()
+        grid = np.arange(self.size, dtype=np.float32)
+        curves = [np.interp(positions[:, c], grid, self.table[:, c]) for c in (2, 1, 0)]
+        return _to_uint8(np.stack(curves, axis=1))
+    
+    def expand_3d(self, chunk: int = 32) -> np.ndarray:
+        """
+        Trilinear interpolation of the grid at every 8-bit colour
+        
+        Trilinear interpolation is separable, so the grid is interpolated
+        along red, then green, then blue - one lerp per axis instead of
+        eight corner lookups per colour.
+        
+        Args:
+            chunk: Blue values interpolated at a time (bounds the
+                   temporary float memory to about chunk x 0.8 MB)
+        
+        Returns:
+            (256^3,) uint32 indexed by R << 16 | G << 8 | B; each entry's
+            bytes are B', G', R', 0 (in memory order)
+        """
+        if not self.is_3d:
+            raise ValueError("expand_3d needs a 3D LUT")
+        
+        positions = self.grid_positions()
+        lower = np.minimum(positions.astype(np.int32), self.size - 2)
+        fraction = positions - lower
+        
+        # [b][g][r] grid -> [b][g][256 reds] -> [b][256 greens][256 reds]
+        table = _lerp_axis(self.table, lower[:, 0], fraction[:, 0], axis=2)
+        table = _lerp_axis(table, lower[:, 1], fraction[:, 1], axis=1)
+        
+        # Written as [r][g][b] with BGR0 bytes
+        out = np.zeros((256, 256, 256, 4), dtype=np.uint8)
+        for start in range(0, 256, chunk):
+            blue = slice(start, start + chunk)
+            rgb = _lerp_axis(table, lower[blue, 2], fraction[blue, 2], axis=0)
+            out[:, :, blue, :3] = _to_uint8(rgb[..., ::-1]).transpose(2, 1, 0, 3)
+        
+        return out.view(np.uint32).reshape(-1)
+
+
+def _lerp_axis(table: np.ndarray, lower: np.ndarray, fraction: np.ndarray,
+               axis: int) -> np.ndarray:
+    """Sample table along an axis at lower + fraction (per output index)"""
+    shape = [1] * table.ndim
+    shape[axis] = -1
+    fraction = fraction.reshape(shape)
+    a = np.take(table, lower, axis=axis)
+    b = np.take(table, lower + 1, axis=axis)
+    return a + (b - a) * fraction
+
+
+def _to_uint8(values: np.ndarray) -> np.ndarray:
+    return np.clip(np.rint(values * 255), 0, 255).astype(np.uint8)
+
+
+# Expanded 3D tables kept by load_lut (64 MB each)
+LUT_CACHE_SIZE = 2
+
+
+@functools.lru_cache(maxsize=LUT_CACHE_SIZE)
+def _load_lut(path: str, mtime: float, size: int) -> Tuple[bool, np.ndarray]:
+    lut = CubeLUT.load(path)
+    if lut.is_3d:
+        table = lut.expand_3d()
+    else:
+        table = lut.compile_1d()
+    table.setflags(write=False)
+    return lut.is_3d, table
+
+
+def load_lut(path: str) -> Tuple[bool, np.ndarray]:
+    """
+    Load and compile a .cube file, cached until the file changes
+    
+    Returns:
+        (is_3d, table) - the expand_3d() table of a 3D LUT or the
+        compile_1d() table of a 1D LUT, read-only
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return _load_lut(path, stat.st_mtime, stat.st_size)
+
+
+def is_lut_file(grade: Optional[str]) -> bool:
+    """True if a grade setting names a .cube file rather than a look"""
+    return bool(grade) and grade.lower().endswith('.cube')
@@ -0,0 +1,443 @@
+"""
+Distributed chunked rendering through a shared work directory
+
+The coordinator splits the timeline into fixed-length chunks and
+publishes one task file per chunk. Workers - local processes or other
+machines mounting the same directory - claim tasks, render the chunk's
+frames to an encoded segment and report back. The coordinator verifies
+each segment's frame count, reassigns failed or abandoned chunks and
+finally concatenates the segments and muxes in the audio.
+
+Work directory layout:
+    job.json                       Render settings and chunk plan
+    project.json                   Project with absolute media paths
+    tasks/chunk_00003.a1.json      Attempt 1 of chunk 3, waiting to be claimed
+    claimed/chunk_00003.a1.json    Claimed (atomic rename); mtime is the heartbeat
+    done/chunk_00003.a1.json       Worker finished, awaiting verification
+    failed/chunk_00003.a1.json     Worker gave up on the chunk
+    segments/chunk_00003.a1.mp4    Encoded video of attempt 1
+    logs/<worker>.log              Output of locally spawned workers
+    STOP                           Tells workers to exit
+
+Media paths in the project must be valid on every worker machine
+(e.g. on the same shared storage as the work directory).
+"""
+import contextlib
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from core.ffmpeg_utils import concat_videos
+from core.segments import Chunk, plan_chunks, read_json, verify_segment, write_json_atomic
+
+
+class WorkDirectory:
+    """Paths of the shared work directory"""
+    
+    SUBDIRS = ('tasks', 'claimed', 'done', 'failed', 'segments', 'logs')
+    
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.job_path = os.path.join(self.root, 'job.json')
+        self.project_path = os.path.join(self.root, 'project.json')
+        self.stop_path = os.path.join(self.root, 'STOP')
+    
+    def create(self, clean: bool = True):
+        """Create the directory tree, optionally removing previous state"""
+        for sub in self.SUBDIRS:
+            path = os.path.join(self.root, sub)
+            if clean and os.path.isdir(path):
+                shutil.rmtree(path)
+            os.makedirs(path, exist_ok=True)
+        
+        if os.path.exists(self.stop_path):
+            os.remove(self.stop_path)
+    
+    def path(self, sub: str, name: str) -> str:
+        return os.path.join(self.root, sub, name)
+    
+    def task_path(self, task_name: str) -> str:
+        return self.path('tasks', f"{task_name}.json")
+    
+    def claimed_path(self, task_name: str) -> str:
+        return self.path('claimed', f"{task_name}.json")
+    
+    def done_path(self, task_name: str) -> str:
+        return self.path('done', f"{task_name}.json")
+    
+    def failed_path(self, task_name: str) -> str:
+        return self.path('failed', f"{task_name}.json")
+    
+    def segment_path(self, chunk: Chunk) -> str:
+        return self.path('segments', f"{chunk.task_name}.mp4")
+    
+    def is_stopped(self) -> bool:
+        return os.path.exists(self.stop_path)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class RenderCoordinator:
+    """
+    Splits a project into chunks and collects the rendered segments
+    
+    Runs entirely on this machine if local_workers > 0; remote workers
+    may join at any time by running `python -m visualiserstudio worker`
+    on the same work directory.
+    """
+    
+    def __init__(self, project_path: str, output_path: str, work_dir: str,
+                 chunk_seconds: float = 10.0, local_workers: int = 2,
+                 preset: str = "medium", max_attempts: int = 3,
+                 lease_timeout: float = 60.0, poll_interval: float = 0.5,
+                 keep_work_dir: bool = False,
+                 on_event: Optional[Callable[..., None]] = None):
+        self.project_path = project_path
+        self.output_path = os.path.abspath(output_path)
+        self.work = WorkDirectory(work_dir)
+        self.chunk_seconds = chunk_seconds
+        self.local_workers = local_workers
+        self.preset = preset
+        self.max_attempts = max_attempts
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self.keep_work_dir = keep_work_dir
+        self.on_event = on_event
+        
+        self.chunks: List[Chunk] = []
+        self.completed: Dict[int, str] = {}  # chunk index -> segment path
+        self._processes: List[subprocess.Popen] = []
+    
+    def emit(self, event: str, **fields):
+        if self.on_event:
+            self.on_event(event, **fields)
+    
+    def run(self) -> bool:
+        """Render the project; returns True if the output was written"""
+        from core.headless import load_project
+        from core.scene_snapshot import SceneSnapshot
+        from core.video_exporter import VideoExporter
+        from models.audio_processor import AudioProcessor
+        
+        project = load_project(self.project_path)
+        if not project.audio_path:
+            self.emit("error", message="Project has no audio file")
+            return False
+        
+        # Library code reports problems with print() - keep stdout clean
+        # for machine-readable output
+        with contextlib.redirect_stdout(sys.stderr):
+            audio_processor = AudioProcessor()
+            loaded = audio_processor.load_audio(project.audio_path)
+        if not loaded:
+            self.emit("error", message=f"Failed to load audio: {project.audio_path}")
+            return False
+        
+        # Same frame count the exporter would render
+        total_frames = int(audio_processor.duration * project.fps)
+        if total_frames == 0:
+            self.emit("error", message="Invalid duration or FPS")
+            return False
+        
+        self.chunks = plan_chunks(total_frames, project.fps, self.chunk_seconds)
+        self.completed = {}
+        
+        # Publish job and tasks
+        self.work.create()
+        project.save_to_file(self.work.project_path)
+        write_json_atomic(self.work.job_path, {
+            'preset': self.preset,
+            'fps': project.fps,
+            'total_frames': total_frames,
+            'chunks': [c.to_dict() for c in self.chunks],
+        })
+        for chunk in self.chunks:
+            write_json_atomic(self.work.task_path(chunk.task_name), chunk.to_dict())
+        
+        self.emit("status", message=f"Split {total_frames} frames into "
+                                    f"{len(self.chunks)} chunks")
+        
+        try:
+            self._spawn_local_workers()
+            if not self._collect():
+                return False
+        finally:
+            self._stop_workers()
+        
+        # Join segments in timeline order
+        self.emit("status", message="Concatenating segments...")
+        segments = [self.completed[c.index] for c in self.chunks]
+        joined = os.path.join(self.work.root, 'video.mp4')
+        ok, stderr = concat_videos(segments, joined)
+        if not ok:
+            self.emit("error", message=f"Concatenation failed: {stderr}")
+            return False
+        
+        # Mux audio exactly like a local export
+        self.emit("status", message="Adding audio...")
+        muxer = VideoExporter(SceneSnapshot(project, audio_processor), self.output_path)
+        errors = []
+        muxer.error.connect(errors.append)
+        if not muxer.combine_audio_video(joined):
+            self.emit("error", message="; ".join(errors) or "Mux failed")
+            return False
+        
+        if not self.keep_work_dir:
+            shutil.rmtree(self.work.root, ignore_errors=True)
+        
+        self.emit("finished", output=self.output_path, chunks=len(self.chunks),
+                  frames=total_frames)
+        return True
+    
+    def _spawn_local_workers(self):
+        """Start worker processes on this machine"""
+        for i in range(self.local_workers):
+            self._processes.append(self._spawn_worker(f"local{i + 1}"))
+    
+    def _spawn_worker(self, worker_id: str) -> subprocess.Popen:
+        log = open(self.work.path('logs', f"{worker_id}.log"), 'a', encoding='utf-8')
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'visualiserstudio', 'worker',
+             self.work.root, '--worker-id', worker_id],
+            stdout=log,
+            stderr=subprocess.STDOUT
+        )
+        log.close()
+        return process
+    
+    def _stop_workers(self):
+        """Ask workers to exit and reap local processes"""
+        open(self.work.stop_path, 'w').close()
+        
+        for process in self._processes:
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self._processes.clear()
+    
+    def _collect(self) -> bool:
+        """Wait for all chunks, verifying and reassigning as needed"""
+        while len(self.completed) < len(self.chunks):
+            for chunk in self.chunks:
+                if chunk.index in self.completed:
+                    continue
+                if not self._check_chunk(chunk):
+                    return False
+            
+            self.emit("progress", value=int(len(self.completed) / len(self.chunks) * 90),
+                      completed=len(self.completed), chunks=len(self.chunks))
+            
+            # Restart local workers that died while work remains
+            for i, process in enumerate(self._processes):
+                if process.poll() is not None:
+                    self.emit("status", message=f"Restarting local worker {i + 1}")
+                    self._processes[i] = self._spawn_worker(f"local{i + 1}")
+            
+            if len(self.completed) < len(self.chunks):
+                time.sleep(self.poll_interval)
+        
+        return True
+    
+    def _check_chunk(self, chunk: Chunk) -> bool:
+        """Advance one chunk's state; False if it can't be completed"""
+        done = read_json(self.work.done_path(chunk.task_name))
+        if done is not None:
+            segment = self.work.segment_path(chunk)
+            if verify_segment(segment, chunk.frame_count):
+                self.completed[chunk.index] = segment
+                self.emit("chunk_done", chunk=chunk.index, worker=done.get('worker'),
+                          render_time=done.get('render_time'))
+                return True
+            return self._reassign(chunk, "segment failed verification")
+        
+        failed = read_json(self.work.failed_path(chunk.task_name))
+        if failed is not None:
+            return self._reassign(chunk, failed.get('error', 'worker failed'))
+        
+        # Abandoned claim: the worker's heartbeat stopped
+        claimed = self.work.claimed_path(chunk.task_name)
+        try:
+            age = time.time() - os.path.getmtime(claimed)
+        except OSError:
+            return True
+        if age > self.lease_timeout:
+            return self._reassign(chunk, f"no heartbeat for {age:.0f}s")
+        
+        return True
+    
+    def _reassign(self, chunk: Chunk, reason: str) -> bool:
+        """Put a chunk back into the task queue with a new attempt number"""
+        self.emit("chunk_failed", chunk=chunk.index, attempt=chunk.attempt, reason=reason)
+        
+        if chunk.attempt >= self.max_attempts:
+            self.emit("error", message=f"Chunk {chunk.index} failed "
+                                       f"{chunk.attempt} times: {reason}")
+            return False
+        
+        # A late result from the previous attempt is simply ignored
+        _remove(self.work.segment_path(chunk))
+        _remove(self.work.claimed_path(chunk.task_name))
+        
+        chunk.attempt += 1
+        write_json_atomic(self.work.task_path(chunk.task_name), chunk.to_dict())
+        return True
+
+
+class RenderWorker:
+    """
+    Claims chunks from a work directory and renders them
+    
+    The project is loaded once and reused for every chunk.
+    """
+    
+    def __init__(self, work_dir: str, worker_id: Optional[str] = None,
+                 idle_exit: bool = False, heartbeat_interval: float = 5.0,
+                 poll_interval: float = 0.5,
+                 on_event: Optional[Callable[..., None]] = None):
+        self.work = WorkDirectory(work_dir)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.idle_exit = idle_exit
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+        self.on_event = on_event
+        
+        self.exporter = None
+        self.job: Dict[str, Any] = {}
+    
+    def emit(self, event: str, **fields):
+        if self.on_event:
+            fields.setdefault('worker', self.worker_id)
+            self.on_event(event, **fields)
+    
+    def run(self) -> int:
+        """Render chunks until stopped; returns number of chunks rendered"""
+        # Wait for the coordinator to publish the job
+        while (read_json(self.work.job_path) is None
+               or not os.path.exists(self.work.project_path)):
+            if self.work.is_stopped():
+                return 0
+            time.sleep(self.poll_interval)
+        
+        self._load_job()
+        rendered = 0
+        
+        while not self.work.is_stopped():
+            chunk = self.claim_next()
+            if chunk is None:
+                if self.idle_exit:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+            
+            if self.render_chunk(chunk):
+                rendered += 1
+        
+        return rendered
+    
+    def _load_job(self):
+        """Load project, audio and elements once"""
+        from core.headless import ensure_application, load_project, prepare_render
+        from core.video_exporter import VideoExporter
+        
+        ensure_application()
+        self.job = read_json(self.work.job_path)
+        project = load_project(self.work.project_path)
+        scene, background = prepare_render(project)
+        
+        self.exporter = VideoExporter(scene, '', background,
+                                      preset=self.job.get('preset', 'medium'))
+        self.emit("status", message="Job loaded")
+    
+    def claim_next(self) -> Optional[Chunk]:
+        """Atomically claim the next waiting task"""
+        try:
+            names = sorted(os.listdir(os.path.join(self.work.root, 'tasks')))
+        except OSError:
+            return None
+        
+        for filename in names:
+            if not filename.endswith('.json'):
+                continue
+            task_name = filename[:-5]
+            try:
+                # The rename keeps the file's mtime, which the coordinator
+                # reads as the last heartbeat - refresh it first, so a task
+                # that waited longer than the lease isn't taken as abandoned
+                os.utime(self.work.task_path(task_name))
+                # Only one worker's rename can succeed
+                os.rename(self.work.task_path(task_name), self.work.claimed_path(task_name))
+            except OSError:
+                continue
+            
+            data = read_json(self.work.claimed_path(task_name))
+            if data is not None:
+                return Chunk.from_dict(data)
+        
+        return None
+    
+    def render_chunk(self, chunk: Chunk) -> bool:
+        """Render one chunk to its segment and report the result"""
+        claimed = self.work.claimed_path(chunk.task_name)
+        segment = self.work.segment_path(chunk)
+        errors: List[str] = []
+        
+        def on_error(message: str):
+            errors.append(message)
+        
+        # Heartbeat keeps the claim alive while rendering
+        stop_heartbeat = threading.Event()
+        
+        def heartbeat():
+            while not stop_heartbeat.wait(self.heartbeat_interval):
+                try:
+                    os.utime(claimed)
+                except OSError:
+                    return
+        
+        thread = threading.Thread(target=heartbeat, daemon=True)
+        thread.start()
+        
+        self.emit("chunk_started", chunk=chunk.index, attempt=chunk.attempt)
+        start = time.perf_counter()
+        
+        self.exporter.error.connect(on_error)
+        try:
+            ok = self.exporter.render_frames(segment, chunk.end_frame,
+                                             self.job['fps'], chunk.start_frame)
+        except Exception as e:
+            ok = False
+            errors.append(str(e))
+        finally:
+            self.exporter.error.disconnect(on_error)
+            stop_heartbeat.set()
+            thread.join()
+        
+        record = {
+            'chunk': chunk.index,
+            'attempt': chunk.attempt,
+            'worker': self.worker_id,
+            'render_time': round(time.perf_counter() - start, 3),
+        }
+        
+        if ok and not errors:
+            record['frames'] = chunk.frame_count
+            write_json_atomic(self.work.done_path(chunk.task_name), record)
+            self.emit("chunk_done", **record)
+        else:
+            record['error'] = "; ".join(errors) or "render failed"
+            write_json_atomic(self.work.failed_path(chunk.task_name), record)
+            self.emit("chunk_failed", **record)
+        
+        _remove(claimed)
+        return ok
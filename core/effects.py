@@ -1,9 +1,65 @@
 """
 Visual effects: Glow, Blur, Color grading
+
+Effects built with their parameters (GlowEffect(31, 0.5), ...) process
+frames in place and can be chained:
+
+    chain = EffectChain([GlowEffect(31, 0.5), ColorGrading("warm", 0.3),
+                         VignetteEffect(0.5)])
+    chain.apply(frame)      # uint8 BGR or BGRA, modified in place
+
+Each effect writes through dst= arguments into work arrays the chain
+allocates on the first frame of a resolution, so chaining effects does
+not allocate per frame. Frames stay uint8; effects that need fractions
+work in float32. The static apply() functions keep their old behaviour
+(a new array, input untouched) on top of the same code.
 """
+import functools
+import sys
+
 import cv2
 import numpy as np
-from typing import Tuple, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.color_lut import is_lut_file, load_lut
+
+
+class ScratchBuffers:
+    """
+    Work arrays reused across frames
+    
+    get() returns the same array for the same name, shape and dtype.
+    Effects run one after another, so effects of a chain share arrays
+    by name.
+    """
+    
+    def __init__(self):
+        self._arrays: Dict[Tuple, np.ndarray] = {}
+    
+    def get(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """Array of the given shape and dtype (contents undefined)"""
+        key = (name, tuple(shape), np.dtype(dtype))
+        array = self._arrays.get(key)
+        if array is None:
+            array = self._arrays[key] = np.empty(shape, dtype=dtype)
+        return array
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self._arrays.values())
+    
+    def clear(self):
+        self._arrays.clear()
+
+
+def _odd(size: int) -> int:
+    """Kernel sizes must be odd"""
+    return size + 1 if size % 2 == 0 else size
+
+
+def _color_channels(frame: np.ndarray) -> np.ndarray:
+    """View of the B, G, R channels (alpha is left alone)"""
+    return frame[..., :3] if frame.shape[2] == 4 else frame
 
 
 class GlowEffect:
@@ -11,6 +67,17 @@ class GlowEffect:
     Gaussian blur-based glow effect
     """
     
+    def __init__(self, blur_size: int = 31, intensity: float = 0.5):
+        self.blur_size = _odd(blur_size)
+        self.intensity = intensity
+    
+    def process(self, frame: np.ndarray, scratch: ScratchBuffers) -> np.ndarray:
+        """Add the blurred frame onto itself, in place"""
+        blurred = scratch.get('frame', frame.shape)
+        cv2.GaussianBlur(frame, (self.blur_size, self.blur_size), 0, dst=blurred)
+        cv2.addWeighted(frame, 1.0, blurred, self.intensity, 0, dst=frame)
+        return frame
+    
     @staticmethod
     def apply(image: np.ndarray, blur_size: int = 31, 
               intensity: float = 0.5) -> np.ndarray:
@@ -21,21 +88,11 @@ class GlowEffect:
             image: Input image (BGR or RGB)
             blur_size: Kernel size for Gaussian blur (must be odd)
             intensity: Glow intensity (0.0 to 1.0)
-            
+        
         Returns:
             Image with glow effect applied
         """
-        # Ensure blur_size is odd
-        if blur_size % 2 == 0:
-            blur_size += 1
-        
-        # Create blurred version
-        blurred = cv2.GaussianBlur(image, (blur_size, blur_size), 0)
-        
-        # Blend original with blurred (additive)
-        result = cv2.addWeighted(image, 1.0, blurred, intensity, 0)
-        
-        return result
+        return GlowEffect(blur_size, intensity).process(image.copy(), ScratchBuffers())
     
     @staticmethod
     def apply_selective(image: np.ndarray, mask: np.ndarray, 
@@ -60,7 +117,7 @@ class GlowEffect:
         
         # Apply mask
         mask_3ch = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR) if len(mask.shape) == 2 else mask
-        mask_float = mask_3ch.astype(float) / 255.0
+        mask_float = mask_3ch.astype(np.float32) / 255.0
         
         result = (image * (1 - mask_float) + glow * mask_float).astype(np.uint8)
         
@@ -115,6 +172,30 @@ class ChromaticAberration:
     Chromatic aberration effect (RGB channel shift)
     """
     
+    def __init__(self, shift: int = 5):
+        self.shift = shift
+    
+    def process(self, frame: np.ndarray, scratch: ScratchBuffers) -> np.ndarray:
+        """Shift red right and blue left by shift pixels, in place"""
+        height, width = frame.shape[:2]
+        shift = min(abs(self.shift), width)
+        if shift == 0:
+            return frame
+        
+        # Channels are strided views - copy one out before shifting it
+        # over itself
+        channel = scratch.get('channel', (height, width))
+        red, blue = (2, 0) if self.shift > 0 else (0, 2)
+        
+        np.copyto(channel, frame[..., red])
+        frame[:, shift:, red] = channel[:, :width - shift]
+        frame[:, :shift, red] = 0
+        
+        np.copyto(channel, frame[..., blue])
+        frame[:, :width - shift, blue] = channel[:, shift:]
+        frame[:, width - shift:, blue] = 0
+        return frame
+    
     @staticmethod
     def apply(image: np.ndarray, shift: int = 5) -> np.ndarray:
         """
@@ -124,53 +205,112 @@ class ChromaticAberration:
             image: Input image (BGR)
             shift: Pixel shift amount
         """
-        height, width = image.shape[:2]
-        
-        # Split channels
-        b, g, r = cv2.split(image)
-        
-        # Shift red channel right
-        M_r = np.float32([[1, 0, shift], [0, 1, 0]])
-        r_shifted = cv2.warpAffine(r, M_r, (width, height))
-        
-        # Shift blue channel left
-        M_b = np.float32([[1, 0, -shift], [0, 1, 0]])
-        b_shifted = cv2.warpAffine(b, M_b, (width, height))
-        
-        # Merge back
-        result = cv2.merge([b_shifted, g, r_shifted])
-        
-        return result
+        return ChromaticAberration(shift).process(image.copy(), ScratchBuffers())
+
+
+# Vignette masks kept by vignette_mask (a 4K float32 mask is 33 MB)
+VIGNETTE_MASK_CACHE_SIZE = 8
+
+
+@functools.lru_cache(maxsize=VIGNETTE_MASK_CACHE_SIZE)
+def vignette_mask(width: int, height: int, strength: float = 0.5, falloff: float = 1.0,
+                  center: Tuple[float, float] = (0.5, 0.5), aspect: Optional[float] = None,
+                  fixed_point: bool = False) -> np.ndarray:
+    """
+    Single-channel vignette mask, cached (LRU) by its parameters
+    
+    Args:
+        width, height: Frame size
+        strength: Darkening at the edge of the unit ellipse (0.0 to 1.0)
+        falloff: Exponent of the distance - 1 is linear, higher keeps
+                 the centre bright longer
+        center: Centre as fractions of the frame (0.5, 0.5 = middle)
+        aspect: Width / height of the vignette ellipse in pixels; None
+                follows the frame's shape, 1.0 is circular
+        fixed_point: Store uint16 factors with 8 fractional bits (0-256)
+                     instead of float32 (0.0-1.0)
+    
+    Returns:
+        Read-only (height, width, 1) array that broadcasts over the
+        colour channels
+    """
+    cx, cy = center
+    # -1..1 across the frame when centred, like np.linspace(-1, 1, n)
+    x = (np.arange(width, dtype=np.float32) / max(width - 1, 1) - cx) * 2
+    y = (np.arange(height, dtype=np.float32)[:, None] / max(height - 1, 1) - cy) * 2
+    if aspect is not None:
+        x *= (width / height) / aspect
+    
+    distance = np.sqrt(x * x + y * y)
+    if falloff != 1.0:
+        np.power(distance, falloff, out=distance)
+    np.multiply(distance, strength, out=distance)
+    np.clip(distance, 0, 1, out=distance)
+    mask = np.subtract(1, distance, out=distance)[..., None]
+    
+    if fixed_point:
+        mask = np.round(mask * 256).astype(np.uint16)
+    mask.setflags(write=False)
+    return mask
 
 
 class VignetteEffect:
     """
     Vignette effect (darkened edges)
+    
+    Masks come from vignette_mask, so effects with equal parameters share
+    one mask and no frame rebuilds it. Elliptical, circular and
+    off-centre vignettes differ only in their mask parameters.
     """
     
+    def __init__(self, strength: float = 0.5, falloff: float = 1.0,
+                 center: Tuple[float, float] = (0.5, 0.5), aspect: Optional[float] = None,
+                 fixed_point: bool = False):
+        self.strength = strength
+        self.falloff = falloff
+        self.center = tuple(center)
+        self.aspect = aspect
+        self.fixed_point = fixed_point
+    
+    def mask(self, width: int, height: int) -> np.ndarray:
+        """Brightness factor per pixel (see vignette_mask)"""
+        return vignette_mask(width, height, self.strength, self.falloff, self.center,
+                             self.aspect, self.fixed_point)
+    
+    def process(self, frame: np.ndarray, scratch: ScratchBuffers) -> np.ndarray:
+        """Darken the edges, in place"""
+        color = _color_channels(frame)
+        mask = self.mask(frame.shape[1], frame.shape[0])
+        
+        if self.fixed_point:
+            # color * factor / 256 in 16-bit integers (255 * 256 fits)
+            work = scratch.get('uint16', color.shape, np.uint16)
+            np.multiply(color, mask, out=work)
+            np.right_shift(work, 8, out=work)
+        else:
+            work = scratch.get('float', color.shape, np.float32)
+            np.multiply(color, mask, out=work)
+        
+        # Truncates like astype(np.uint8)
+        np.copyto(color, work, casting='unsafe')
+        return frame
+    
     @staticmethod
-    def apply(image: np.ndarray, strength: float = 0.5) -> np.ndarray:
+    def apply(image: np.ndarray, strength: float = 0.5, falloff: float = 1.0,
+              center: Tuple[float, float] = (0.5, 0.5),
+              aspect: Optional[float] = None) -> np.ndarray:
         """
         Apply vignette effect
         
         Args:
             image: Input image
             strength: Vignette strength (0.0 to 1.0)
+            falloff: Distance exponent (1 = linear)
+            center: Centre as fractions of the frame
+            aspect: Ellipse width / height in pixels (None = frame shape)
         """
-        height, width = image.shape[:2]
-        
-        # Create radial gradient mask
-        X, Y = np.meshgrid(np.linspace(-1, 1, width), np.linspace(-1, 1, height))
-        radius = np.sqrt(X**2 + Y**2)
-        
-        # Normalize and invert
-        vignette = 1 - np.clip(radius * strength, 0, 1)
-        
-        # Apply to each channel
-        vignette_3ch = np.stack([vignette] * 3, axis=2)
-        result = (image * vignette_3ch).astype(np.uint8)
-        
-        return result
+        return VignetteEffect(strength, falloff, center, aspect).process(
+            image.copy(), ScratchBuffers())
 
 
 class MotionBlur:
@@ -178,6 +318,25 @@ class MotionBlur:
     Directional motion blur effect
     """
     
+    def __init__(self, size: int = 15, angle: float = 0):
+        self.kernel = MotionBlur.kernel(size, angle)
+    
+    def process(self, frame: np.ndarray, scratch: ScratchBuffers) -> np.ndarray:
+        """Blur along the direction, in place"""
+        blurred = scratch.get('frame', frame.shape)
+        cv2.filter2D(frame, -1, self.kernel, dst=blurred)
+        np.copyto(frame, blurred)
+        return frame
+    
+    @staticmethod
+    def kernel(size: int, angle: float) -> np.ndarray:
+        """Line kernel of length size, rotated by angle degrees"""
+        kernel = np.zeros((size, size), dtype=np.float32)
+        kernel[int((size - 1) / 2), :] = 1.0 / size
+        
+        M = cv2.getRotationMatrix2D((size / 2, size / 2), angle, 1.0)
+        return cv2.warpAffine(kernel, M, (size, size))
+    
     @staticmethod
     def apply(image: np.ndarray, size: int = 15, angle: float = 0) -> np.ndarray:
         """
@@ -188,70 +347,63 @@ class MotionBlur:
             size: Blur length
             angle: Blur direction in degrees (0 = horizontal)
         """
-        # Create motion blur kernel
-        kernel = np.zeros((size, size))
-        kernel[int((size - 1) / 2), :] = np.ones(size)
-        kernel = kernel / size
-        
-        # Rotate kernel
-        M = cv2.getRotationMatrix2D((size / 2, size / 2), angle, 1.0)
-        kernel = cv2.warpAffine(kernel, M, (size, size))
-        
-        # Apply blur
-        result = cv2.filter2D(image, -1, kernel)
-        
-        return result
+        return cv2.filter2D(image, -1, MotionBlur.kernel(size, angle))
 
 
 class ParticleEffect:
     """
     Particle overlay effect
+    
+    Particles move in straight lines and wrap around the edges, so their
+    positions are a pure function of the seed and the frame number.
     """
     
-    def __init__(self, width: int, height: int, num_particles: int = 100):
+    def __init__(self, width: int, height: int, num_particles: int = 100,
+                 seed: int = 0):
         self.width = width
         self.height = height
         self.num_particles = num_particles
-        
-        # Initialize particles
-        self.particles = []
-        for _ in range(num_particles):
-            self.particles.append({
-                'x': np.random.randint(0, width),
-                'y': np.random.randint(0, height),
-                'vx': np.random.uniform(-2, 2),
-                'vy': np.random.uniform(-2, 2),
-                'size': np.random.randint(1, 4),
-                'alpha': np.random.uniform(0.3, 1.0)
-            })
+        self.seed = seed
+        self.frame = 0
+        
+        # Initialize particles from a private generator
+        rng = np.random.default_rng(seed)
+        self.start_x = rng.integers(0, width, num_particles).astype(float)
+        self.start_y = rng.integers(0, height, num_particles).astype(float)
+        self.vx = rng.uniform(-2, 2, num_particles)
+        self.vy = rng.uniform(-2, 2, num_particles)
+        self.sizes = rng.integers(1, 4, num_particles)
+        self.alphas = rng.uniform(0.3, 1.0, num_particles)
     
     def update(self):
-        """Update particle positions"""
-        for p in self.particles:
-            p['x'] += p['vx']
-            p['y'] += p['vy']
-            
-            # Wrap around edges
-            if p['x'] < 0:
-                p['x'] = self.width
-            elif p['x'] > self.width:
-                p['x'] = 0
-            
-            if p['y'] < 0:
-                p['y'] = self.height
-            elif p['y'] > self.height:
-                p['y'] = 0
+        """Advance particles by one frame"""
+        self.frame += 1
+    
+    def set_frame(self, frame: int):
+        """Jump to a frame (e.g. when seeking or rendering a chunk)"""
+        self.frame = frame
+    
+    def positions(self, frame: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Get particle x/y positions at a frame (default: current frame)"""
+        if frame is None:
+            frame = self.frame
+        
+        # Wrap around edges
+        x = np.mod(self.start_x + self.vx * frame, self.width)
+        y = np.mod(self.start_y + self.vy * frame, self.height)
+        return x, y
     
     def render(self, image: np.ndarray, color: Tuple[int, int, int] = (255, 255, 255)) -> np.ndarray:
         """Render particles on image"""
         result = image.copy()
+        xs, ys = self.positions()
         
-        for p in self.particles:
+        for x, y, size in zip(xs, ys, self.sizes):
             # Draw particle as circle
             cv2.circle(
                 result,
-                (int(p['x']), int(p['y'])),
-                p['size'],
+                (int(x), int(y)),
+                int(size),
                 color,
                 -1
             )
@@ -262,43 +414,196 @@ class ParticleEffect:
 class ColorGrading:
     """
     Color grading and LUT effects
+    
+    ColorGrading("warm" | "cool", intensity) or ColorGrading("vintage")
+    grades frames in place. Warm and cool are per-channel curves, compiled
+    once into 256-entry tables and applied with cv2.LUT in one uint8 pass.
     """
     
+    LOOKS = ("warm", "cool", "vintage")
+    
+    # Sepia tone (rows produce B, G, R from B, G, R columns)
+    SEPIA = np.array([[0.272, 0.534, 0.131],
+                      [0.349, 0.686, 0.168],
+                      [0.393, 0.769, 0.189]], dtype=np.float32)
+    
+    def __init__(self, look: str = "warm", intensity: float = 0.3):
+        if look not in self.LOOKS:
+            raise ValueError(f"Unknown color grade '{look}' "
+                             f"(expected one of {', '.join(self.LOOKS)})")
+        
+        self.look = look
+        self.intensity = intensity
+        self._vignette = VignetteEffect(0.3)
+        self._luts: Dict[int, np.ndarray] = {}  # By channel count
+    
+    def gains(self) -> np.ndarray:
+        """Per-channel factors (B, G, R) of the warm and cool looks"""
+        i = self.intensity
+        if self.look == "warm":
+            # Increase red/yellow, decrease blue
+            return np.array([1 - i * 0.3, 1 + i * 0.5, 1 + i])
+        return np.array([1 + i, 1 + i * 0.3, 1 - i * 0.3])
+    
+    def lut(self, channels: int) -> np.ndarray:
+        """cv2.LUT table of the warm/cool gains; alpha maps to itself"""
+        lut = self._luts.get(channels)
+        if lut is None:
+            values = np.arange(256, dtype=np.float64)[:, None]
+            lut = np.repeat(values, channels, axis=1)
+            lut[:, :3] *= self.gains()
+            # Truncates like astype(np.uint8)
+            lut = np.clip(lut, 0, 255).astype(np.uint8).reshape(1, 256, channels)
+            self._luts[channels] = lut
+        return lut
+    
+    @classmethod
+    def vintage_matrices(cls, channels: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        cv2.transform matrices of the vintage look: sepia, then reduced
+        contrast (0.9 x + 10); a fourth (alpha) channel passes through
+        
+        The passes stay separate because sepia saturates at 255 before
+        the contrast is reduced.
+        """
+        sepia = np.eye(channels, dtype=np.float32)
+        sepia[:3, :3] = cls.SEPIA
+        
+        contrast = np.zeros((channels, channels + 1), dtype=np.float32)
+        contrast[:channels, :channels] = np.eye(channels)
+        contrast[:3, :3] *= 0.9
+        contrast[:3, channels] = 10
+        return sepia, contrast
+    
+    def process(self, frame: np.ndarray, scratch: ScratchBuffers) -> np.ndarray:
+        """Grade the frame in place"""
+        if self.look == "vintage":
+            sepia, contrast = self.vintage_matrices(frame.shape[2])
+            graded = scratch.get('frame', frame.shape)
+            cv2.transform(frame, sepia, dst=graded)
+            cv2.transform(graded, contrast, dst=frame)
+            # Add slight vignette
+            return self._vignette.process(frame, scratch)
+        
+        cv2.LUT(frame, self.lut(frame.shape[2]), dst=frame)
+        return frame
+    
     @staticmethod
     def warm(image: np.ndarray, intensity: float = 0.3) -> np.ndarray:
         """Apply warm color grade"""
-        # Increase red/yellow, decrease blue
-        result = image.copy().astype(float)
-        result[:, :, 2] *= (1 + intensity)  # Red
-        result[:, :, 1] *= (1 + intensity * 0.5)  # Green
-        result[:, :, 0] *= (1 - intensity * 0.3)  # Blue
-        
-        return np.clip(result, 0, 255).astype(np.uint8)
+        return ColorGrading("warm", intensity).process(image.copy(), ScratchBuffers())
     
     @staticmethod
     def cool(image: np.ndarray, intensity: float = 0.3) -> np.ndarray:
         """Apply cool color grade"""
-        result = image.copy().astype(float)
-        result[:, :, 0] *= (1 + intensity)  # Blue
-        result[:, :, 1] *= (1 + intensity * 0.3)  # Green
-        result[:, :, 2] *= (1 - intensity * 0.3)  # Red
-        
-        return np.clip(result, 0, 255).astype(np.uint8)
+        return ColorGrading("cool", intensity).process(image.copy(), ScratchBuffers())
     
     @staticmethod
     def vintage(image: np.ndarray) -> np.ndarray:
         """Apply vintage film look"""
-        # Sepia tone
-        kernel = np.array([[0.272, 0.534, 0.131],
-                          [0.349, 0.686, 0.168],
-                          [0.393, 0.769, 0.189]])
-        
-        result = cv2.transform(image, kernel)
+        return ColorGrading("vintage").process(image.copy(), ScratchBuffers())
+
+
+class CubeLUTEffect:
+    """
+    Grade with a .cube LUT file (see core.color_lut)
+    
+    1D LUTs run through cv2.LUT; 3D LUTs look every pixel up in the
+    table expanded when the file was loaded.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.is_3d, self.table = load_lut(path)
+        self._lut_1d: Dict[int, np.ndarray] = {}  # By channel count
+    
+    def process(self, frame: np.ndarray, scratch: ScratchBuffers) -> np.ndarray:
+        """Grade the frame in place"""
+        if not self.is_3d:
+            channels = frame.shape[2]
+            lut = self._lut_1d.get(channels)
+            if lut is None:
+                lut = np.repeat(np.arange(256, dtype=np.uint8)[:, None], channels, axis=1)
+                lut[:, :3] = self.table
+                lut = self._lut_1d[channels] = lut.reshape(1, 256, channels)
+            cv2.LUT(frame, lut, dst=frame)
+            return frame
+        
+        height, width = frame.shape[:2]
+        index = scratch.get('lut_index', (height, width), np.uint32)
+        graded = scratch.get('lut_graded', (height, width), np.uint32)
+        
+        if frame.shape[2] == 4 and frame.flags.c_contiguous and sys.byteorder == 'little':
+            # BGRA pixels are their own table index (see core.color_lut)
+            pixels = frame.view(np.uint32)[..., 0]
+            np.bitwise_and(pixels, 0xFFFFFF, out=index)
+            np.take(self.table, index, out=graded, mode='clip')
+            np.bitwise_and(pixels, 0xFF000000, out=pixels)
+            np.bitwise_or(pixels, graded, out=pixels)
+            return frame
+        
+        part = scratch.get('lut_part', (height, width), np.uint32)
+        np.left_shift(frame[..., 2], 16, out=index, dtype=np.uint32)
+        np.left_shift(frame[..., 1], 8, out=part, dtype=np.uint32)
+        np.bitwise_or(index, part, out=index)
+        np.bitwise_or(index, frame[..., 0], out=index, dtype=np.uint32)
+        # mode='clip' lets take() write straight into out
+        np.take(self.table, index, out=graded, mode='clip')
+        np.copyto(_color_channels(frame), graded.view(np.uint8).reshape(height, width, 4)[..., :3])
+        return frame
+
+
+def grading_effect(grade: Optional[str], intensity: float = 0.3):
+    """
+    Effect for a project's grade setting
+    
+    Args:
+        grade: A ColorGrading look ('warm', 'cool', 'vintage'), a .cube
+               file, or None
+        intensity: Strength of the warm and cool looks
+    
+    Returns:
+        The effect, or None without a grade
+    """
+    if not grade:
+        return None
+    if is_lut_file(grade):
+        return CubeLUTEffect(grade)
+    return ColorGrading(grade, intensity)
+
+
+class EffectChain:
+    """
+    Ordered effects applied in place to a stream of frames
+    
+    An effect is any object with process(frame, scratch) that modifies
+    the frame in place. The work arrays are allocated on the first frame
+    and again only when the resolution changes.
+    """
+    
+    def __init__(self, effects: Optional[Sequence] = None):
+        self.effects: List = list(effects or [])
+        self.scratch = ScratchBuffers()
+        self._shape: Optional[Tuple[int, ...]] = None
+    
+    def __len__(self) -> int:
+        return len(self.effects)
+    
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Run every effect on a frame, in order
         
-        # Reduce contrast slightly
-        result = cv2.addWeighted(result, 0.9, result, 0, 10)
+        Args:
+            frame: uint8 BGR or BGRA pixels (e.g. a frame buffer's
+                   NATIVE_RGB32_PIX_FMT pixels), C-contiguous
         
-        # Add slight vignette
-        result = VignetteEffect.apply(result, 0.3)
+        Returns:
+            The same frame
+        """
+        if frame.shape != self._shape:
+            self.scratch.clear()
+            self._shape = frame.shape
         
-        return result
+        for effect in self.effects:
+            effect.process(frame, self.scratch)
+        return frame
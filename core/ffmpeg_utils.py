@@ -0,0 +1,403 @@
+"""
+FFmpeg helpers: raw frame pipe writer, progress-reporting runner,
+probing and concatenation
+"""
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.config import AUDIO_BITRATE, AUDIO_CODEC, VIDEO_CODEC
+
+
+# Byte order of QImage.Format_RGB32 / ARGB32 pixels in memory
+NATIVE_RGB32_PIX_FMT = "bgra" if sys.byteorder == "little" else "argb"
+
+
+# Transparent overlay formats: name -> file extension ('' = image
+# sequence, written by core.image_sequence rather than FFmpeg)
+ALPHA_FORMATS = {
+    "prores": ".mov",
+    "webm": ".webm",
+    "png": "",
+    "tiff": "",
+}
+
+
+# Audio codecs each output container takes as they are (stream copy);
+# other sources are re-encoded with AUDIO_CODEC
+AUDIO_COPY_CODECS = {
+    ".mp4": {"aac", "mp3", "alac", "ac3", "eac3"},
+    ".m4v": {"aac", "mp3", "alac", "ac3", "eac3"},
+    ".mov": {"aac", "mp3", "alac", "ac3", "pcm_s16le", "pcm_s24le", "pcm_f32le"},
+    ".mkv": {"aac", "mp3", "alac", "ac3", "eac3", "flac", "opus", "vorbis",
+             "pcm_s16le", "pcm_s24le", "pcm_f32le"},
+    ".webm": {"opus", "vorbis"},
+}
+
+
+def alpha_output_args(alpha_format: str, crf: int) -> List[str]:
+    """
+    FFmpeg output arguments for premultiplied BGRA frames with alpha
+    
+    The encoders expect straight alpha, so colours are unpremultiplied
+    on the way in.
+    """
+    args = ['-vf', 'unpremultiply=inplace=1']
+    
+    if alpha_format == "prores":
+        args += ['-c:v', 'prores_ks', '-profile:v', '4444',
+                 '-pix_fmt', 'yuva444p10le', '-vendor', 'apl0']
+    elif alpha_format == "webm":
+        # VP9 CRF spans 0-63 (x264's 18 maps to 31); -b:v 0 selects
+        # constant quality mode
+        args += ['-c:v', 'libvpx-vp9', '-pix_fmt', 'yuva420p',
+                 '-crf', str(min(63, crf + 13)), '-b:v', '0', '-row-mt', '1']
+    else:
+        raise ValueError(f"Unknown overlay format '{alpha_format}'")
+    
+    return args
+
+
+def drain_stderr(process: subprocess.Popen, tail: deque) -> threading.Thread:
+    """Keep the last lines of a process's stderr in tail (background thread)"""
+    def drain():
+        for line in iter(process.stderr.readline, b''):
+            tail.append(line.decode('utf-8', errors='replace').rstrip())
+    
+    thread = threading.Thread(target=drain, daemon=True)
+    thread.start()
+    return thread
+
+
+class FFmpegPipeWriter:
+    """
+    Streams raw frames into an FFmpeg process via stdin
+    
+    Frames are written in the painter's native pixel format, so no
+    colour conversion happens in Python - FFmpeg does it while encoding.
+    output_path may be None if output_args already name the outputs
+    (several outputs from one stream, see core.renditions). extra_inputs
+    are added after the frame stream, which is always input 0; with
+    audio=True the outputs may take their audio from them.
+    """
+    
+    def __init__(self, output_path: Optional[str], width: int, height: int, fps: float,
+                 pix_fmt: str = NATIVE_RGB32_PIX_FMT, crf: int = 18,
+                 preset: str = "medium", codec: str = VIDEO_CODEC,
+                 output_args: Optional[List[str]] = None,
+                 extra_inputs: Optional[List[str]] = None, audio: bool = False):
+        self.output_path = output_path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.pix_fmt = pix_fmt
+        self.frames_written = 0
+        self.duplicates_written = 0
+        self._last_frame: Optional[np.ndarray] = None
+        
+        if output_args is None:
+            output_args = [
+                '-c:v', codec,
+                '-preset', preset,
+                '-crf', str(crf),
+                '-pix_fmt', 'yuv420p',
+            ]
+        
+        self.cmd = [
+            'ffmpeg',
+            '-y',
+            '-loglevel', 'error',
+            '-f', 'rawvideo',
+            '-pix_fmt', pix_fmt,
+            '-s', f'{width}x{height}',
+            '-r', str(fps),
+            '-i', 'pipe:0',
+            *(extra_inputs or []),
+            *([] if audio else ['-an']),
+            *output_args
+        ]
+        if output_path is not None:
+            self.cmd.append(output_path)
+        
+        self.process = subprocess.Popen(
+            self.cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+        
+        # Drain stderr in the background so FFmpeg never blocks on it
+        self._stderr_tail = deque(maxlen=50)
+        self._stderr_thread = drain_stderr(self.process, self._stderr_tail)
+    
+    @property
+    def error_output(self) -> str:
+        """Last lines FFmpeg wrote to stderr"""
+        return '\n'.join(self._stderr_tail)
+    
+    def isOpened(self) -> bool:
+        """True while FFmpeg accepts frames"""
+        return self.process.poll() is None
+    
+    def write(self, frame: np.ndarray):
+        """Write one frame (C-contiguous, matching pix_fmt)"""
+        # memoryview avoids a bytes copy of the frame
+        self.process.stdin.write(memoryview(frame).cast('B'))
+        self.frames_written += 1
+        self._last_frame = frame
+    
+    def write_duplicate(self):
+        """
+        Repeat the last frame
+        
+        The caller must not have modified the last frame's memory since.
+        Identical frames encode to skip blocks, so this costs little more
+        than the pipe write.
+        """
+        self.write(self._last_frame)
+        self.duplicates_written += 1
+    
+    def release(self, timeout: Optional[float] = None) -> bool:
+        """
+        Finish the stream and wait for FFmpeg to exit
+        
+        With a timeout, FFmpeg still running after that many seconds (e.g.
+        still reading a looping audio input) is told to stop and finishes
+        the output as on Ctrl+C.
+        """
+        try:
+            self.process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        
+        try:
+            returncode = self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.terminate()
+            # FFmpeg exits with 255 after finishing on a termination signal
+            returncode = 0 if self.process.wait() == 255 else self.process.returncode
+        self._stderr_thread.join(timeout=5)
+        return returncode == 0
+    
+    def kill(self):
+        """Abort encoding immediately"""
+        if self.process.poll() is None:
+            self.process.kill()
+        self.release()
+
+
+class FFmpegProcess:
+    """
+    FFmpeg run with a machine-readable progress stream
+    
+    FFmpeg writes blocks of key=value lines to stdout (-progress pipe:1),
+    each ending with a 'progress' key. wait() parses them as they arrive
+    and hands every block to on_progress, e.g.
+    {'frame': '1500', 'fps': '240.0', 'out_time_us': '50000000',
+     'speed': '8.01x', 'progress': 'continue'}
+    """
+    
+    def __init__(self, args: List[str],
+                 on_progress: Optional[Callable[[Dict[str, str]], None]] = None):
+        self.on_progress = on_progress
+        self.terminated = False
+        self.cmd = [
+            'ffmpeg',
+            '-y',
+            '-nostats',
+            '-loglevel', 'error',
+            '-progress', 'pipe:1',
+            *args
+        ]
+        
+        self.process = subprocess.Popen(
+            self.cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        
+        self._stderr_tail = deque(maxlen=50)
+        self._stderr_thread = drain_stderr(self.process, self._stderr_tail)
+    
+    @property
+    def error_output(self) -> str:
+        """Last lines FFmpeg wrote to stderr"""
+        return '\n'.join(self._stderr_tail)
+    
+    def wait(self) -> int:
+        """Parse progress until FFmpeg exits; returns its exit code"""
+        block: Dict[str, str] = {}
+        
+        for raw in iter(self.process.stdout.readline, b''):
+            line = raw.decode('utf-8', errors='replace').strip()
+            key, sep, value = line.partition('=')
+            if not sep:
+                continue
+            
+            block[key] = value
+            if key == 'progress':
+                if self.on_progress:
+                    self.on_progress(block)
+                block = {}
+        
+        returncode = self.process.wait()
+        self._stderr_thread.join(timeout=5)
+        return returncode
+    
+    def terminate(self, timeout: float = 5.0):
+        """Stop FFmpeg, killing it if it doesn't exit in time"""
+        if self.process.poll() is not None:
+            return  # Already finished - its result stands
+        
+        self.terminated = True
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def progress_seconds(block: Dict[str, str]) -> float:
+    """Output position of a progress block in seconds"""
+    # out_time_ms is in microseconds as well (historic FFmpeg naming)
+    for key in ('out_time_us', 'out_time_ms'):
+        try:
+            return max(0, int(block[key])) / 1_000_000
+        except (KeyError, ValueError):
+            continue
+    return 0.0
+
+
+def probe_frame_count(video_path: str) -> Optional[int]:
+    """
+    Count the video frames of a file with ffprobe
+    
+    Returns:
+        Frame count, or None if ffprobe is unavailable or the file is
+        unreadable
+    """
+    cmd = [
+        'ffprobe',
+        '-v', 'error',
+        '-select_streams', 'v:0',
+        '-count_packets',
+        '-show_entries', 'stream=nb_read_packets',
+        '-of', 'csv=p=0',
+        video_path
+    ]
+    
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return None
+    
+    if result.returncode != 0:
+        return None
+    
+    try:
+        return int(result.stdout.strip().split(',')[0])
+    except ValueError:
+        return None
+
+
+def probe_audio_codec(media_path: str) -> Optional[str]:
+    """
+    Codec of the first audio stream of a file, e.g. 'aac' or 'pcm_s16le'
+    
+    Uses ffprobe, or the stream listing of 'ffmpeg -i' where only FFmpeg
+    is installed.
+    
+    Returns:
+        Codec name, or None if the file has no audio or can't be read
+    """
+    cmd = [
+        'ffprobe',
+        '-v', 'error',
+        '-select_streams', 'a:0',
+        '-show_entries', 'stream=codec_name',
+        '-of', 'csv=p=0',
+        media_path
+    ]
+    
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+    except FileNotFoundError:
+        return _probe_audio_codec_ffmpeg(media_path)
+    except subprocess.TimeoutExpired:
+        return None
+    
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip().split(',')[0] or None
+
+
+def _probe_audio_codec_ffmpeg(media_path: str) -> Optional[str]:
+    # Without an output FFmpeg lists the inputs' streams and exits with 1,
+    # e.g. "Stream #0:0: Audio: aac (LC) (mp4a / 0x6134706D), 44100 Hz"
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-i', media_path],
+                                capture_output=True, text=True, timeout=30)
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return None
+    
+    match = re.search(r"Stream #\d+:\d+.*?: Audio: (\w+)", result.stderr)
+    return match.group(1) if match else None
+
+
+def audio_output_args(source_codec: Optional[str], output_path: str,
+                      copy: bool = True, codec: str = AUDIO_CODEC,
+                      bitrate: str = AUDIO_BITRATE) -> List[str]:
+    """
+    Audio encoding arguments for muxing into output_path
+    
+    The source audio is stream-copied (no generation loss, no encoding
+    time) if copy is set and the output container takes its codec;
+    otherwise it is encoded with codec at bitrate.
+    """
+    extension = os.path.splitext(output_path)[1].lower()
+    if copy and source_codec in AUDIO_COPY_CODECS.get(extension, ()):
+        return ['-c:a', 'copy']
+    return ['-c:a', codec, '-b:a', bitrate]
+
+
+def concat_videos(video_paths: List[str], output_path: str) -> Tuple[bool, str]:
+    """
+    Join encoded segments without re-encoding (concat demuxer)
+    
+    All segments must share codec, resolution and frame rate.
+    
+    Returns:
+        (success, FFmpeg error output)
+    """
+    # The concat demuxer reads its inputs from a list file
+    fd, list_path = tempfile.mkstemp(suffix='.txt', prefix='concat_',
+                                     dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for path in video_paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        
+        cmd = [
+            'ffmpeg',
+            '-y',
+            '-loglevel', 'error',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', list_path,
+            '-c', 'copy',
+            output_path
+        ]
+        
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        return result.returncode == 0, result.stderr
+    finally:
+        os.remove(list_path)
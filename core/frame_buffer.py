@@ -0,0 +1,77 @@
+"""
+Preallocated frame buffers for the export pipeline
+"""
+import numpy as np
+from typing import List, Optional
+from PyQt6.QtGui import QImage
+
+
+class FrameBuffer:
+    """
+    Single preallocated frame
+    
+    The QImage wraps the NumPy array permanently, so painting into
+    the image writes straight into the array without any copies.
+    Format_RGB32 is Qt's native raster format; in memory it is laid out
+    as BGRA on little-endian machines, which FFmpeg reads directly.
+    Transparent frames (alpha=True) use Format_ARGB32_Premultiplied, the
+    native format with alpha - same layout, colours premultiplied.
+    """
+    
+    def __init__(self, width: int, height: int, alpha: bool = False,
+                 pixels: Optional[np.ndarray] = None):
+        self.width = width
+        self.height = height
+        self.alpha = alpha
+        
+        # 4 bytes per pixel, alpha byte fixed at 0xFF unless alpha is set.
+        # pixels may be existing memory to paint into (e.g. a shared
+        # memory slot, see core.shared_frames)
+        if pixels is None:
+            pixels = np.zeros((height, width, 4), dtype=np.uint8)
+        elif pixels.shape != (height, width, 4) or not pixels.flags.c_contiguous:
+            raise ValueError("Frame buffer memory must be C-contiguous height x width x 4")
+        self.pixels = pixels
+        
+        # Pass the raw address so Qt paints into our memory instead of
+        # detaching a private copy. QImage does not own the memory, so
+        # self.pixels must outlive it.
+        image_format = (QImage.Format.Format_ARGB32_Premultiplied if alpha
+                        else QImage.Format.Format_RGB32)
+        self.image = QImage(self.pixels.ctypes.data, width, height, width * 4,
+                            image_format)
+
+
+class FrameBufferRing:
+    """
+    Small ring of preallocated frame buffers
+    
+    Frames are handed out round-robin, so a buffer is only reused
+    once the following slots have been consumed by the writer.
+    """
+    
+    def __init__(self, width: int, height: int, size: int = 3, alpha: bool = False):
+        if size < 1:
+            raise ValueError("Frame buffer ring needs at least one slot")
+        
+        self.width = width
+        self.height = height
+        self.alpha = alpha
+        self.buffers: List[FrameBuffer] = [
+            FrameBuffer(width, height, alpha) for _ in range(size)
+        ]
+        self._index = 0
+    
+    def __len__(self) -> int:
+        return len(self.buffers)
+    
+    def next(self) -> FrameBuffer:
+        """Get the next buffer in the ring"""
+        buffer = self.buffers[self._index]
+        self._index = (self._index + 1) % len(self.buffers)
+        return buffer
+    
+    @property
+    def nbytes(self) -> int:
+        """Total memory held by the ring in bytes"""
+        return sum(b.pixels.nbytes for b in self.buffers)
@@ -0,0 +1,119 @@
+"""
+Headless (offscreen) rendering support shared by the CLI tools
+"""
+import contextlib
+import json
+import os
+import sys
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+_application = None
+
+
+def setup_headless_environment():
+    """
+    Configure Qt and SDL for machines without a display or sound card
+    
+    Must run before PyQt6 or pygame are imported.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+
+def ensure_application():
+    """
+    Create the offscreen QApplication once per process
+    
+    The instance is kept in a module global - Qt aborts if it is
+    garbage collected while fonts or painters are still in use.
+    """
+    global _application
+    from PyQt6.QtWidgets import QApplication
+    
+    if _application is None:
+        _application = QApplication.instance() or QApplication([sys.argv[0]])
+        _application.setApplicationName("VisualiserStudio")
+    return _application
+
+
+class JsonLineReporter:
+    """Writes exporter events to a stream as JSON lines"""
+    
+    def __init__(self, stream=None, **extra):
+        self.stream = stream or sys.stdout
+        self.extra = extra
+    
+    def emit(self, event: str, **fields):
+        """Write one event"""
+        record = {"event": event, **self.extra, **fields}
+        self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+    
+    def connect(self, exporter):
+        """Forward all exporter signals"""
+        exporter.status.connect(lambda message: self.emit("status", message=message))
+        exporter.progress.connect(lambda value: self.emit("progress", value=value))
+        exporter.telemetry.connect(lambda sample: self.emit("telemetry", **sample))
+        exporter.error.connect(lambda message: self.emit("error", message=message))
+        exporter.finished.connect(
+            lambda output: self.emit("finished", output=output, report=exporter.report)
+        )
+
+
+def resolve_project_paths(project, project_path: str):
+    """Make media paths relative to the project file absolute"""
+    base_dir = os.path.dirname(os.path.abspath(project_path))
+    
+    for attr in ('audio_path', 'background_path', 'logo_path', 'lyrics_path'):
+        path = getattr(project, attr)
+        if path and not os.path.isabs(path):
+            setattr(project, attr, os.path.join(base_dir, path))
+
+
+def load_project(project_path: str):
+    """Load a project file with media paths made absolute"""
+    from models.project_state import ProjectState
+    
+    project = ProjectState.load_from_file(project_path)
+    resolve_project_paths(project, project_path)
+    return project
+
+
+def prepare_render(project) -> Tuple[object, Optional[np.ndarray]]:
+    """
+    Load audio, lyrics and background and snapshot the project for rendering
+    
+    Requires ensure_application() to have been called.
+    
+    Returns:
+        (scene snapshot, background)
+    """
+    from models.audio_processor import AudioProcessor
+    from models.lyrics_parser import LyricsParser
+    from core.scene_snapshot import SceneSnapshot
+    from core.video_exporter import load_background_image
+    
+    if not project.audio_path:
+        raise ValueError("Project has no audio file")
+    
+    # Library code reports problems with print() - keep stdout clean
+    # for machine-readable output
+    with contextlib.redirect_stdout(sys.stderr):
+        audio_processor = AudioProcessor()
+        if not audio_processor.load_audio(project.audio_path):
+            raise ValueError(f"Failed to load audio: {project.audio_path}")
+        
+        lyrics_parser = None
+        if project.lyrics_path:
+            lyrics_parser = LyricsParser()
+            if not lyrics_parser.load_from_file(project.lyrics_path):
+                lyrics_parser = None
+    
+    scene = SceneSnapshot.capture(project, audio_processor, lyrics_parser)
+    background = load_background_image(project.background_path, project.resolution)
+    
+    return scene, background
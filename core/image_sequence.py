@@ -0,0 +1,201 @@
+"""
+Image sequence output (PNG/TIFF) written by a thread pool
+
+Compressing a 1080p PNG takes longer than painting the frame, so files
+are encoded by several cv2.imwrite threads (OpenCV releases the GIL
+while encoding). The number of frames waiting to be written is bounded,
+so a slow disk can't make memory grow without limit.
+
+Every file is written under a temporary name and renamed once complete:
+an existing frame file is always a finished frame, which lets an
+interrupted export resume by rendering only the missing frames. The
+directory's sequence.json records the render fingerprint of its frames,
+so frames of other settings are never mixed in.
+"""
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from core.segments import read_json, write_json_atomic
+
+
+SEQUENCE_FORMATS = ("png", "tiff")
+
+# TIFF compression schemes (libtiff ids)
+TIFF_COMPRESSION_NONE = 1
+TIFF_COMPRESSION_LZW = 5
+
+# Render fingerprint of the frames in a sequence directory
+SEQUENCE_MANIFEST = "sequence.json"
+
+
+def frame_filename(index: int, extension: str) -> str:
+    """File name of a frame, numbered by its position in the song"""
+    return f"frame_{index:06d}.{extension}"
+
+
+def open_sequence(directory: str, fingerprint: str, extension: str) -> bool:
+    """
+    Claim a sequence directory for frames of a render fingerprint
+    
+    Frames recorded under another fingerprint (the project or settings
+    changed) are deleted. Frame files without a manifest are not ours to
+    delete, but never reused either - they are overwritten.
+    
+    Returns:
+        True if the existing frames match the fingerprint and can be reused
+    """
+    manifest_path = os.path.join(directory, SEQUENCE_MANIFEST)
+    manifest = read_json(manifest_path)
+    reusable = (isinstance(manifest, dict)
+                and manifest.get('fingerprint') == fingerprint
+                and manifest.get('extension') == extension)
+    
+    if isinstance(manifest, dict) and not reusable:
+        stale = re.compile(rf"frame_\d+\.{re.escape(str(manifest.get('extension')))}$")
+        for filename in os.listdir(directory):
+            if stale.match(filename):
+                os.remove(os.path.join(directory, filename))
+    
+    os.makedirs(directory, exist_ok=True)
+    write_json_atomic(manifest_path, {'fingerprint': fingerprint, 'extension': extension})
+    return reusable
+
+
+def missing_ranges(directory: str, first_frame: int, end_frame: int,
+                   extension: str) -> List[Tuple[int, int]]:
+    """
+    Ranges [start, end) of frames without a finished file
+    
+    Leftover temporary files of an interrupted export are removed.
+    """
+    existing = set()
+    if os.path.isdir(directory):
+        for filename in os.listdir(directory):
+            if '.partial.' in filename:
+                os.remove(os.path.join(directory, filename))
+            else:
+                existing.add(filename)
+    
+    ranges = []
+    start = None
+    for index in range(first_frame, end_frame):
+        if frame_filename(index, extension) in existing:
+            if start is not None:
+                ranges.append((start, index))
+                start = None
+        elif start is None:
+            start = index
+    
+    if start is not None:
+        ranges.append((start, end_frame))
+    return ranges
+
+
+class ImageSequenceWriter:
+    """
+    Writes frames as numbered image files using a pool of threads
+    
+    Same interface as FFmpegPipeWriter, so the export loop can use
+    either. Frames are BGRA (NATIVE_RGB32_PIX_FMT); with alpha=True they
+    are premultiplied, as painted into Format_ARGB32_Premultiplied.
+    """
+    
+    def __init__(self, directory: str, start_number: int = 0, extension: str = "png",
+                 alpha: bool = False, compression: int = 3,
+                 workers: Optional[int] = None, max_in_flight: Optional[int] = None):
+        if extension not in SEQUENCE_FORMATS:
+            raise ValueError(f"Unknown image sequence format '{extension}'")
+        
+        self.directory = directory
+        self.extension = extension
+        self.alpha = alpha
+        self.index = start_number
+        self.frames_written = 0
+        self.duplicates_written = 0
+        
+        if extension == "png":
+            self.params = [cv2.IMWRITE_PNG_COMPRESSION, max(0, min(9, compression))]
+        else:
+            scheme = TIFF_COMPRESSION_LZW if compression > 0 else TIFF_COMPRESSION_NONE
+            self.params = [cv2.IMWRITE_TIFF_COMPRESSION, scheme]
+        
+        workers = workers or os.cpu_count() or 1
+        self.workers = workers
+        self.max_in_flight = max_in_flight or workers * 2
+        
+        os.makedirs(directory, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix="imwrite")
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._errors = deque(maxlen=50)
+        self._last_image: Optional[np.ndarray] = None
+    
+    @property
+    def error_output(self) -> str:
+        """Errors of failed writes"""
+        return '\n'.join(self._errors)
+    
+    def isOpened(self) -> bool:
+        """True while no write has failed"""
+        return not self._errors
+    
+    def frame_path(self, index: int) -> str:
+        return os.path.join(self.directory, frame_filename(index, self.extension))
+    
+    def write(self, frame: np.ndarray):
+        """Queue one frame; blocks while max_in_flight frames are pending"""
+        # The conversion also copies the frame out of the (reused) ring buffer
+        if self.alpha:
+            image = cv2.cvtColor(frame, cv2.COLOR_mRGBA2RGBA)  # Straight alpha
+        else:
+            image = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+        
+        self._submit(image)
+        self._last_image = image
+    
+    def write_duplicate(self):
+        """Repeat the last frame (files are immutable, so no copy is needed)"""
+        self._submit(self._last_image)
+        self.duplicates_written += 1
+    
+    def release(self) -> bool:
+        """Wait for all pending files; True if every write succeeded"""
+        self._executor.shutdown(wait=True)
+        return not self._errors
+    
+    def kill(self):
+        """Drop pending frames; files already written are kept"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _submit(self, image: np.ndarray):
+        if self._errors:
+            raise OSError(f"Writing image sequence failed: {self._errors[-1]}")
+        
+        self._slots.acquire()
+        path = self.frame_path(self.index)
+        self.index += 1
+        self.frames_written += 1
+        
+        future = self._executor.submit(self._save, image, path)
+        future.add_done_callback(lambda _: self._slots.release())
+    
+    def _save(self, image: np.ndarray, path: str):
+        # Keep the real extension last - cv2 picks the encoder from it
+        base, ext = os.path.splitext(path)
+        partial = f"{base}.partial{ext}"
+        
+        try:
+            if not cv2.imwrite(partial, image, self.params):
+                raise OSError("encoder returned failure")
+            os.replace(partial, path)
+        except Exception as e:
+            self._errors.append(f"{os.path.basename(path)}: {e}")
+            if os.path.exists(partial):
+                os.remove(partial)
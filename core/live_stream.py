@@ -0,0 +1,363 @@
+"""
+Live streaming: render a playlist in real time into an FFmpeg output
+
+Frames are painted by the export render core and piped to FFmpeg, which
+reads the audio itself at its native rate (-re) and sends both to a
+UDP/SRT/RTMP endpoint or a file. Video and audio share one timeline
+(the playlist position), so they stay in sync through their timestamps.
+
+The output runs at a constant frame rate. FramePacer holds the
+rendering to the real-time clock: when ahead it waits, when it falls
+more than max_lag frames behind it repeats the last frame for every
+missed tick and skips rendering those frames, so the stream never
+stalls. Counters of rendered, duplicated and dropped frames are
+reported while streaming.
+"""
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.ffmpeg_utils import FFmpegPipeWriter, NATIVE_RGB32_PIX_FMT
+from core.scene_snapshot import SceneSnapshot
+from core.video_exporter import VideoExporter, load_background_image
+from models.audio_processor import AudioProcessor
+from models.lyrics_parser import LyricsParser
+from models.project_state import ProjectState
+from utils.config import (AUDIO_BITRATE, AUDIO_CODEC, LIVE_KEYFRAME_SECONDS,
+                          LIVE_MAX_LAG_FRAMES, LIVE_PRESET, LIVE_VIDEO_BITRATE,
+                          VIDEO_CODEC)
+
+
+# Seconds FFmpeg may take to finish after the last frame before it is stopped
+LIVE_FINISH_TIMEOUT = 3.0
+
+# Container formats of network outputs (files use their extension)
+LIVE_PROTOCOL_FORMATS = {
+    "udp://": "mpegts",
+    "srt://": "mpegts",
+    "tcp://": "mpegts",
+    "rtmp://": "flv",
+    "rtmps://": "flv",
+}
+
+
+def live_output_args(url: str, fps: int, preset: str = LIVE_PRESET,
+                     video_bitrate: int = LIVE_VIDEO_BITRATE,
+                     duration: Optional[float] = None) -> List[str]:
+    """
+    FFmpeg output arguments for a live stream
+    
+    Constant bitrate-capped, low-latency x264 with a keyframe every
+    LIVE_KEYFRAME_SECONDS so viewers can join quickly. Video is input 0,
+    audio input 1.
+    
+    There is no -shortest: with a real-time (-re) audio input it makes
+    FFmpeg hold back the frame pipe for seconds while its queues fill.
+    The stream ends after duration, or when the streamer stops FFmpeg.
+    """
+    args = [
+        '-map', '0:v:0',
+        '-map', '1:a:0',
+        '-c:v', VIDEO_CODEC,
+        '-preset', preset,
+        '-tune', 'zerolatency',
+        '-b:v', f'{video_bitrate}k',
+        '-maxrate', f'{video_bitrate}k',
+        '-bufsize', f'{video_bitrate * 2}k',
+        '-g', str(max(1, int(round(fps * LIVE_KEYFRAME_SECONDS)))),
+        '-pix_fmt', 'yuv420p',
+        '-c:a', AUDIO_CODEC,
+        '-b:a', AUDIO_BITRATE,
+    ]
+    if duration is not None:
+        args += ['-t', f'{duration:.3f}']
+    
+    for prefix, container in LIVE_PROTOCOL_FORMATS.items():
+        if url.startswith(prefix):
+            args += ['-f', container]
+            break
+    
+    return args + [url]
+
+
+class FramePacer:
+    """
+    Holds a constant output frame rate against a real-time clock
+    
+    Output frame (tick) n is due at start + n / fps. Usage per frame:
+    
+        missed = pacer.wait()        # sleeps while ahead
+        for _ in range(missed): ...  # repeat the last frame
+        pacer.skip(missed)
+        ... render and write the frame for pacer.position ...
+        pacer.frame_done()
+    """
+    
+    def __init__(self, fps: float, max_lag: int = LIVE_MAX_LAG_FRAMES,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.fps = fps
+        self.max_lag = max(0, max_lag)
+        self.clock = clock
+        self.sleep = sleep
+        self.start()
+    
+    def start(self):
+        """Start the clock at tick 0 and reset the counters"""
+        self.started = self.clock()
+        self.tick = 0
+        self.rendered = 0
+        self.duplicated = 0
+        self.dropped = 0
+        self.max_lag_seconds = 0.0
+    
+    @property
+    def position(self) -> float:
+        """Stream time of the current tick in seconds"""
+        return self.tick / self.fps
+    
+    @property
+    def lag(self) -> float:
+        """Seconds the current tick is overdue (negative while ahead)"""
+        return self.clock() - self.started - self.position
+    
+    def wait(self) -> int:
+        """
+        Wait until the current tick is due
+        
+        Returns:
+            Ticks to fill with the previous frame - 0 unless rendering
+            fell more than max_lag frames behind
+        """
+        lag = self.lag
+        if lag < 0:
+            self.sleep(-lag)
+            return 0
+        
+        self.max_lag_seconds = max(self.max_lag_seconds, lag)
+        behind = int(lag * self.fps)
+        if behind <= self.max_lag or self.rendered == 0:
+            return 0
+        return behind
+    
+    def skip(self, ticks: int):
+        """Account ticks that were filled with duplicates instead of rendered"""
+        self.tick += ticks
+        self.duplicated += ticks
+        self.dropped += ticks
+    
+    def frame_done(self):
+        """Account one rendered frame"""
+        self.tick += 1
+        self.rendered += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters for status reports"""
+        elapsed = self.clock() - self.started
+        return {
+            'position': round(self.position, 2),
+            'frames': self.tick,
+            'rendered': self.rendered,
+            'duplicated': self.duplicated,
+            'dropped': self.dropped,
+            'fps': round(self.tick / elapsed, 2) if elapsed > 0 else 0.0,
+            'lag_ms': round(max(0.0, self.lag) * 1000, 1),
+            'max_lag_ms': round(self.max_lag_seconds * 1000, 1),
+        }
+
+
+class LiveStreamer:
+    """
+    Streams a project over a playlist of audio tracks in real time
+    
+    Every track is rendered with the project's layout. loop repeats the
+    playlist forever; otherwise the stream ends after the last track (or
+    after duration seconds, if given). The playlist is passed to FFmpeg
+    through its concat demuxer, so the tracks should share a format
+    (e.g. all MP3 at one sample rate).
+    """
+    
+    def __init__(self, project, tracks: List[str], output: str, loop: bool = False,
+                 duration: Optional[float] = None, preset: str = LIVE_PRESET,
+                 video_bitrate: int = LIVE_VIDEO_BITRATE,
+                 max_lag: int = LIVE_MAX_LAG_FRAMES, stats_interval: float = 5.0,
+                 on_event: Optional[Callable[..., None]] = None):
+        self.project = project
+        # Without tracks or project audio run() reports there is nothing to stream
+        self.tracks = [os.path.abspath(track) for track in tracks or [project.audio_path]
+                       if track]
+        self.output = output
+        self.loop = loop
+        self.duration = duration
+        self.preset = preset
+        self.video_bitrate = video_bitrate
+        self.max_lag = max_lag
+        self.stats_interval = stats_interval
+        self.on_event = on_event
+        
+        self.fps = project.fps
+        self.pacer = FramePacer(self.fps, max_lag)
+        self.is_stopped = False
+        self._background: Optional[np.ndarray] = None
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="track-loader")
+    
+    def emit(self, event: str, **fields):
+        if self.on_event:
+            self.on_event(event, **fields)
+    
+    def stop(self):
+        """End the stream after the current frame"""
+        self.is_stopped = True
+    
+    def run(self) -> bool:
+        """Stream until the playlist ends or stop() is called; True on success"""
+        if not self.tracks:
+            self.emit("error", message="Nothing to stream - no audio tracks")
+            return False
+        
+        with tempfile.TemporaryDirectory(prefix="vs_live_") as directory:
+            playlist = os.path.join(directory, "playlist.txt")
+            with open(playlist, 'w', encoding='utf-8') as f:
+                for track in self.tracks:
+                    escaped = track.replace("'", "'\\''")
+                    f.write(f"file '{escaped}'\n")
+            
+            try:
+                return self._stream(playlist)
+            finally:
+                self._loader.shutdown(wait=False, cancel_futures=True)
+    
+    def _stream(self, playlist: str) -> bool:
+        width, height = self.project.resolution
+        
+        self._track_index = 0
+        self._track_start = 0.0
+        self._track = self._render_core(self._load_track(0).result())
+        self._next_track_audio = self._load_track(1)
+        
+        audio_input = ['-re', '-f', 'concat', '-safe', '0']
+        if self.loop:
+            audio_input += ['-stream_loop', '-1']
+        writer = FFmpegPipeWriter(
+            None, width, height, self.fps,
+            pix_fmt=NATIVE_RGB32_PIX_FMT,
+            output_args=live_output_args(self.output, self.fps, self.preset,
+                                         self.video_bitrate, self.duration),
+            extra_inputs=audio_input + ['-i', playlist],
+            audio=True
+        )
+        
+        self.emit("status", message=f"Streaming {width}x{height} @ {self.fps} fps "
+                                    f"to {self.output}")
+        self.emit("track", index=0, path=self.tracks[0])
+        
+        pacer = self.pacer
+        pacer.start()
+        last_stats = time.monotonic()
+        try:
+            while not self.is_stopped:
+                if self.duration is not None and pacer.position >= self.duration:
+                    break
+                
+                # Behind schedule: repeat the last frame for the missed ticks
+                missed = pacer.wait()
+                if self.duration is not None:
+                    missed = min(missed, int(self.duration * self.fps) - pacer.tick)
+                if missed > 0:
+                    for _ in range(missed):
+                        writer.write_duplicate()
+                    pacer.skip(missed)
+                
+                track_time = pacer.position - self._track_start
+                if track_time >= self._track.audio_processor.duration:
+                    if not self._next_track():
+                        break  # End of the playlist
+                    continue
+                
+                self._track.update_nodes(track_time)
+                writer.write(self._track.paint_frame(width, height))
+                pacer.frame_done()
+                
+                if time.monotonic() - last_stats >= self.stats_interval:
+                    last_stats = time.monotonic()
+                    self.emit("stats", **pacer.stats())
+        except (BrokenPipeError, OSError):
+            writer.kill()
+            self.emit("error", message=f"FFmpeg error: {writer.error_output}")
+            return False
+        except KeyboardInterrupt:
+            self.emit("status", message="Stopped")
+        
+        # The audio input may run on (looping playlist, stopped early)
+        if not writer.release(timeout=LIVE_FINISH_TIMEOUT):
+            self.emit("error", message=f"FFmpeg error: {writer.error_output}")
+            return False
+        
+        self.emit("finished", output=self.output, **pacer.stats())
+        return True
+    
+    def _next_track(self) -> bool:
+        """Switch to the next playlist track; False at the end of the playlist"""
+        self._track_start += self._track.audio_processor.duration
+        self._track_index += 1
+        if self._track_index == len(self.tracks):
+            if not self.loop:
+                return False
+            self._track_index = 0
+        
+        self._track = self._render_core(self._next_track_audio.result())
+        self._next_track_audio = self._load_track(self._track_index + 1)
+        self.emit("track", index=self._track_index, path=self.tracks[self._track_index])
+        return True
+    
+    def _load_track(self, index: int) -> Future:
+        """
+        Decode a playlist track on the loader thread
+        
+        Decoding a song takes seconds - far longer than a frame - so the
+        next track is loaded while the current one plays.
+        """
+        return self._loader.submit(self._load_audio, self.tracks[index % len(self.tracks)])
+    
+    def _load_audio(self, path: str) -> Tuple[ProjectState, AudioProcessor,
+                                              Optional[LyricsParser]]:
+        project = ProjectState.from_dict(self.project.to_dict())
+        if os.path.abspath(project.audio_path or '') != path:
+            # The project's lyrics belong to its own track
+            project.audio_path = path
+            project.lyrics_path = None
+        
+        # Library code reports problems with print() - keep stdout clean
+        with contextlib.redirect_stdout(sys.stderr):
+            audio_processor = AudioProcessor()
+            if not audio_processor.load_audio(path):
+                raise ValueError(f"Failed to load audio: {path}")
+            
+            lyrics_parser = None
+            if project.lyrics_path:
+                lyrics_parser = LyricsParser()
+                if not lyrics_parser.load_from_file(project.lyrics_path):
+                    lyrics_parser = None
+        
+        return project, audio_processor, lyrics_parser
+    
+    def _render_core(self, loaded: Tuple[ProjectState, AudioProcessor,
+                                         Optional[LyricsParser]]) -> VideoExporter:
+        """Export render core for a loaded track (built on the streaming thread)"""
+        project, audio_processor, lyrics_parser = loaded
+        
+        if self._background is None and project.background_path:
+            self._background = load_background_image(project.background_path,
+                                                     project.resolution)
+        
+        scene = SceneSnapshot.capture(project, audio_processor, lyrics_parser)
+        exporter = VideoExporter(scene, "", self._background)
+        exporter.write_report = False
+        exporter.prepare_buffers(*project.resolution)
+        return exporter
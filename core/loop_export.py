@@ -0,0 +1,159 @@
+"""
+Short looping clips: palette-optimized GIF and animated WebP
+
+Teasers are a few seconds long and small, so the clip is rendered at
+reduced size and frame rate into one preallocated buffer in memory.
+A GIF is then encoded from that buffer in two FFmpeg passes, so the
+frames are painted only once:
+
+    buffer -> palettegen                    -> palette.png (256 colours,
+                                               from every frame)
+    buffer + palette.png -> paletteuse      -> clip.gif (dithered)
+
+One global palette keeps colours stable across the loop instead of
+flickering between per-frame palettes. WebP is true colour and is
+encoded in a single pass.
+"""
+import os
+import tempfile
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from core.ffmpeg_utils import FFmpegPipeWriter, NATIVE_RGB32_PIX_FMT
+
+
+LOOP_FORMATS = {"gif": ".gif", "webp": ".webp"}
+
+DITHER_MODES = ("sierra2_4a", "floyd_steinberg", "bayer", "none")
+
+
+def loop_resolution(resolution: Tuple[int, int], width: int) -> Tuple[int, int]:
+    """Size of a loop at most width pixels wide, keeping the aspect ratio"""
+    source_width, source_height = resolution
+    if source_width <= width:
+        return int(source_width), int(source_height)
+    
+    height = source_height * width / source_width
+    return max(2, int(round(width / 2)) * 2), max(2, int(round(height / 2)) * 2)
+
+
+class LoopFrameBuffer:
+    """
+    Every frame of a clip, preallocated in one block
+    
+    The size is known up front (frames x width x height), so a clip that
+    would need more than max_bytes is refused before rendering starts.
+    """
+    
+    def __init__(self, frame_count: int, width: int, height: int, max_bytes: int):
+        nbytes = frame_count * width * height * 4
+        if nbytes > max_bytes:
+            raise ValueError(
+                f"Loop needs {nbytes / (1024 * 1024):.0f} MB of frame memory "
+                f"(limit {max_bytes / (1024 * 1024):.0f} MB) - shorten the range "
+                f"or reduce the size"
+            )
+        
+        self.width = width
+        self.height = height
+        self.frames = np.empty((frame_count, height, width, 4), dtype=np.uint8)
+        self.count = 0
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    @property
+    def nbytes(self) -> int:
+        return self.frames.nbytes
+    
+    def append(self, frame: np.ndarray):
+        """Copy a frame (NATIVE_RGB32_PIX_FMT) into the next slot"""
+        np.copyto(self.frames[self.count], frame)
+        self.count += 1
+    
+    def repeat(self):
+        """Append a copy of the last frame"""
+        self.append(self.frames[self.count - 1])
+
+
+def palettegen_args(colors: int = 256) -> List[str]:
+    """FFmpeg output arguments writing one palette image for all frames"""
+    return ['-vf', f'palettegen=max_colors={colors}:stats_mode=full', '-update', '1']
+
+
+def paletteuse_args(dither: str = "sierra2_4a") -> List[str]:
+    """FFmpeg output arguments mapping frames (input 0) onto a palette (input 1)"""
+    if dither not in DITHER_MODES:
+        raise ValueError(f"Unknown dither mode '{dither}' "
+                         f"(expected one of {', '.join(DITHER_MODES)})")
+    
+    options = f"dither={dither}"
+    if dither == "bayer":
+        options += ":bayer_scale=3"
+    # Only re-encode the changed rectangle of each frame
+    return ['-lavfi', f'[0:v][1:v]paletteuse={options}:diff_mode=rectangle', '-loop', '0']
+
+
+def webp_args(quality: int = 75) -> List[str]:
+    """FFmpeg output arguments for a looping lossy WebP"""
+    return ['-c:v', 'libwebp_anim', '-lossless', '0', '-q:v', str(quality),
+            '-pix_fmt', 'yuv420p', '-loop', '0']
+
+
+def encode_loop(buffer: LoopFrameBuffer, fps: float, output_path: str,
+                loop_format: str, dither: str = "sierra2_4a", colors: int = 256,
+                quality: int = 75,
+                on_progress: Optional[Callable[[float], None]] = None,
+                should_stop: Optional[Callable[[], bool]] = None) -> Tuple[bool, str]:
+    """
+    Encode buffered frames as a looping GIF or WebP
+    
+    on_progress receives the encoded fraction (0-1); should_stop is polled
+    between frames to cancel.
+    
+    Returns:
+        (success, FFmpeg error output)
+    """
+    if loop_format not in LOOP_FORMATS:
+        raise ValueError(f"Unknown loop format '{loop_format}'")
+    
+    if loop_format == "webp":
+        passes = [(output_path, webp_args(quality), None)]
+    else:
+        fd, palette_path = tempfile.mkstemp(
+            suffix='.png', prefix='palette_',
+            dir=os.path.dirname(os.path.abspath(output_path))
+        )
+        os.close(fd)
+        passes = [(palette_path, palettegen_args(colors), None),
+                  (output_path, paletteuse_args(dither), ['-i', palette_path])]
+    
+    try:
+        total = len(buffer) * len(passes)
+        done = 0
+        for path, output_args, extra_inputs in passes:
+            writer = FFmpegPipeWriter(path, buffer.width, buffer.height, fps,
+                                      pix_fmt=NATIVE_RGB32_PIX_FMT,
+                                      output_args=output_args,
+                                      extra_inputs=extra_inputs)
+            try:
+                for frame in buffer.frames[:len(buffer)]:
+                    if should_stop and should_stop():
+                        writer.kill()
+                        return False, "Cancelled"
+                    writer.write(frame)
+                    done += 1
+                    if on_progress:
+                        on_progress(done / total)
+            except BrokenPipeError:
+                writer.kill()
+                return False, writer.error_output
+            
+            if not writer.release():
+                return False, writer.error_output
+        
+        return True, ""
+    finally:
+        if loop_format == "gif" and os.path.exists(palette_path):
+            os.remove(palette_path)
@@ -0,0 +1,205 @@
+"""
+Render graph: the frame description executed by preview and export
+
+A project compiles into render nodes in paint order (back to front).
+Every frame runs the same two steps, wherever it is shown:
+
+    key = graph.update(time_pos, duration, frame_interval)
+                        step the time-dependent nodes, collect frame keys
+    graph.paint(painter)
+                        paint the visible nodes in design space
+
+Nodes carry their element's time dependence: static nodes (text) are
+never stepped and their frame key is computed once. After an update,
+changed_nodes() lists the nodes whose look changed - the only ones that
+need repainting. Fonts and gradient colours come from one ResourceCache
+per graph instead of being rebuilt by every element on every paint.
+"""
+import time
+from typing import Callable, Hashable, List, Optional, Tuple
+
+from PyQt6.QtGui import QPainter
+
+from core.render_resources import ResourceCache
+from elements.base_element import DraggableElement
+from elements.factory import build_elements
+from models.audio_processor import AudioProcessor
+from models.lyrics_parser import LyricsParser
+from models.project_state import ProjectState
+
+
+# Stage timer of the exporter's telemetry: add(stage, seconds)
+StageTimer = Callable[[str, float], None]
+
+
+class RenderNode:
+    """
+    One element of a render graph, positioned in design space
+    
+    In an export the wrapped element is private to the snapshot and
+    never part of a scene, so it is never selected and nothing else
+    moves or repaints it. In the preview it is the scene's own item.
+    """
+    
+    def __init__(self, element: DraggableElement):
+        self.element = element
+        self.state = element.state
+        self.time_dependent = element.time_dependent
+        
+        # Label for telemetry, e.g. 'visualizer.bars' or 'lyrics'
+        self.kind = self.state.element_type.value
+        visualizer_type = getattr(getattr(element, 'settings', None), 'visualizer_type', None)
+        if visualizer_type is not None:
+            self.kind += f".{visualizer_type.value}"
+        
+        # Frame key after the last update, and whether it changed
+        self.key: Optional[Hashable] = None
+        self.changed = True
+        self._static_key: Optional[Tuple[float, Hashable]] = None
+    
+    @property
+    def visible(self) -> bool:
+        return self.state.visible
+    
+    @property
+    def z_index(self) -> int:
+        return self.state.z_index
+    
+    def set_antialiasing(self, enabled: bool):
+        self.element.antialiasing = enabled
+    
+    def set_time(self, time_pos: float, duration: float, frame_interval: float,
+                 scale: float = 1.0):
+        """Move the node to a time position, quantized to scale"""
+        self.element.set_render_time(time_pos, duration, frame_interval)
+        self.element.quantize(scale)
+    
+    def frame_key(self, scale: float = 1.0) -> Optional[Hashable]:
+        """Key of the node's current look (see DraggableElement.frame_key)"""
+        if self.time_dependent:
+            return self.element.frame_key(scale)
+        
+        if self._static_key is None or self._static_key[0] != scale:
+            self._static_key = (scale, self.element.frame_key(scale))
+        return self._static_key[1]
+    
+    def update_key(self, scale: float = 1.0) -> Optional[Hashable]:
+        """Refresh the frame key and the changed flag"""
+        key = self.frame_key(scale)
+        self.changed = key is None or key != self.key
+        self.key = key
+        return key
+    
+    def invalidate(self):
+        """Forget cached keys after the element was edited"""
+        self.time_dependent = self.element.time_dependent
+        self.key = None
+        self.changed = True
+        self._static_key = None
+    
+    def paint(self, painter: QPainter):
+        """Paint at the node's position (painter is in design space)"""
+        painter.save()
+        painter.translate(self.state.x, self.state.y)
+        self.element.paint(painter, None, None)
+        painter.restore()
+
+
+class RenderGraph:
+    """
+    Render nodes in paint order, sharing one resource cache
+    
+    Nodes are kept sorted by z-index; call invalidate() after elements
+    were reordered or edited.
+    """
+    
+    def __init__(self, nodes: Optional[List[RenderNode]] = None,
+                 resources: Optional[ResourceCache] = None):
+        self.resources = resources or ResourceCache()
+        self.nodes: List[RenderNode] = []
+        for node in nodes or []:
+            self._attach(node)
+        self.invalidate()
+    
+    @classmethod
+    def compile(cls, project: ProjectState, audio_processor: AudioProcessor,
+                lyrics_parser: Optional[LyricsParser] = None) -> 'RenderGraph':
+        """Build the elements of a project and their render nodes"""
+        elements = build_elements(project, audio_processor, lyrics_parser)
+        return cls([RenderNode(element) for element in elements])
+    
+    @property
+    def time_dependent(self) -> bool:
+        """True if any visible node changes over time"""
+        return any(node.time_dependent for node in self.nodes if node.visible)
+    
+    def add(self, element: DraggableElement) -> RenderNode:
+        node = RenderNode(element)
+        self._attach(node)
+        self.invalidate()
+        return node
+    
+    def remove(self, element: DraggableElement):
+        self.nodes = [node for node in self.nodes if node.element is not element]
+    
+    def clear(self):
+        self.nodes = []
+    
+    def invalidate(self):
+        """Re-sort the nodes and forget cached keys (after edits)"""
+        self.nodes.sort(key=lambda node: node.z_index)
+        for node in self.nodes:
+            node.invalidate()
+    
+    def set_antialiasing(self, enabled: bool):
+        for node in self.nodes:
+            node.set_antialiasing(enabled)
+    
+    def update(self, time_pos: float, duration: float, frame_interval: float,
+               scale: float = 1.0, timer: Optional[StageTimer] = None) -> Optional[Tuple]:
+        """
+        Move the visible nodes to a time position
+        
+        scale is the number of output pixels per design unit; timer
+        receives 'update/<kind>' stage timings.
+        
+        Returns:
+            Key of the resulting frame (equal keys mean identical pixels),
+            or None if a node can't tell
+        """
+        clock = time.perf_counter
+        keys = []
+        for node in self.nodes:
+            if not node.visible:
+                continue
+            
+            started = clock()
+            if node.time_dependent:
+                node.set_time(time_pos, duration, frame_interval, scale)
+            keys.append(node.update_key(scale))
+            if timer is not None:
+                timer(f"update/{node.kind}", clock() - started)
+        
+        if any(key is None for key in keys):
+            return None
+        return tuple(keys)
+    
+    def changed_nodes(self) -> List[RenderNode]:
+        """Visible nodes whose look changed in the last update()"""
+        return [node for node in self.nodes if node.visible and node.changed]
+    
+    def paint(self, painter: QPainter, timer: Optional[StageTimer] = None):
+        """Paint the visible nodes back to front (painter is in design space)"""
+        clock = time.perf_counter
+        for node in self.nodes:
+            if not node.visible:
+                continue
+            
+            started = clock()
+            node.paint(painter)
+            if timer is not None:
+                timer(f"paint/{node.kind}", clock() - started)
+    
+    def _attach(self, node: RenderNode):
+        node.element.resources = self.resources
+        self.nodes.append(node)
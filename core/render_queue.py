@@ -0,0 +1,328 @@
+"""
+Batch render queue: many videos from one template project
+
+A manifest names a template project and a list of jobs, each of which
+substitutes audio, lyrics, title text or background:
+
+    {
+      "template": "template.json",
+      "output_dir": "renders",
+      "workers": 2,
+      "retries": 1,
+      "preset": "medium",
+      "jobs": [
+        {"name": "track01", "audio": "01.mp3", "lyrics": "01.lrc", "title": "First Song"},
+        {"name": "track02", "audio": "02.mp3", "title": "Second Song", "output": "custom.mp4"}
+      ]
+    }
+
+Relative paths are resolved against the manifest's directory. Jobs run
+in a pool of long-lived worker processes; each worker creates its
+offscreen QApplication once, so Qt's font database and glyph caches are
+reused by every job that worker renders.
+"""
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+from core.headless import (setup_headless_environment, ensure_application,
+                           load_project, prepare_render, JsonLineReporter)
+
+
+@dataclass
+class RenderJob:
+    """Single video to render from the template"""
+    name: str
+    output_path: str
+    audio_path: Optional[str] = None
+    lyrics_path: Optional[str] = None
+    title: Optional[str] = None
+    background_path: Optional[str] = None
+    
+    def apply_to(self, project):
+        """Substitute this job's media and title into a template project"""
+        if self.audio_path:
+            project.audio_path = self.audio_path
+        if self.lyrics_path:
+            project.lyrics_path = self.lyrics_path
+        if self.background_path:
+            project.background_path = self.background_path
+        if self.title is not None:
+            project.text_settings.content = self.title
+
+
+@dataclass
+class JobResult:
+    """Outcome of a render job (after all attempts)"""
+    name: str
+    output_path: str
+    success: bool
+    attempts: int = 1
+    frames: int = 0
+    wall_time: float = 0.0
+    log_path: str = ""
+    error: str = ""
+    
+    @property
+    def fps(self) -> float:
+        """Rendered frames per second of wall time"""
+        return self.frames / self.wall_time if self.wall_time > 0 else 0.0
+    
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['wall_time'] = round(self.wall_time, 3)
+        data['fps'] = round(self.fps, 2)
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'JobResult':
+        # fps is derived, not a field
+        return cls(**{k: v for k, v in data.items() if k != 'fps'})
+
+
+@dataclass
+class RenderManifest:
+    """Batch of jobs sharing one template project"""
+    template_path: str
+    output_dir: str
+    jobs: List[RenderJob] = field(default_factory=list)
+    workers: int = 2
+    retries: int = 1
+    preset: str = "medium"
+    
+    @classmethod
+    def load_from_file(cls, filepath: str) -> 'RenderManifest':
+        """Load manifest from JSON file"""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        base_dir = os.path.dirname(os.path.abspath(filepath))
+        
+        def resolve(path: Optional[str]) -> Optional[str]:
+            if path and not os.path.isabs(path):
+                return os.path.join(base_dir, path)
+            return path
+        
+        output_dir = resolve(data.get('output_dir', 'renders'))
+        
+        jobs = []
+        for i, job in enumerate(data.get('jobs', [])):
+            name = job.get('name', f"job{i + 1:03d}")
+            output = job.get('output', f"{name}.mp4")
+            if not os.path.isabs(output):
+                output = os.path.join(output_dir, output)
+            
+            jobs.append(RenderJob(
+                name=name,
+                output_path=output,
+                audio_path=resolve(job.get('audio')),
+                lyrics_path=resolve(job.get('lyrics')),
+                title=job.get('title'),
+                background_path=resolve(job.get('background')),
+            ))
+        
+        return cls(
+            template_path=resolve(data['template']),
+            output_dir=output_dir,
+            jobs=jobs,
+            workers=data.get('workers', 2),
+            retries=data.get('retries', 1),
+            preset=data.get('preset', 'medium'),
+        )
+
+
+def init_worker():
+    """Process pool initializer - one offscreen Qt context per worker"""
+    setup_headless_environment()
+    ensure_application()
+
+
+def render_job(template_path: str, job: RenderJob, preset: str,
+               log_path: str, attempt: int) -> Dict[str, Any]:
+    """
+    Render one job inside a worker process
+    
+    Exporter events are appended to the job's log file as JSON lines.
+    
+    Returns:
+        JobResult as a dictionary
+    """
+    from core.video_exporter import VideoExporter
+    
+    start = time.perf_counter()
+    errors: List[str] = []
+    frames = 0
+    
+    with open(log_path, 'a', encoding='utf-8') as log:
+        reporter = JsonLineReporter(log, job=job.name, attempt=attempt)
+        reporter.emit("started", template=template_path)
+        
+        try:
+            ensure_application()
+            
+            project = load_project(template_path)
+            job.apply_to(project)
+            scene, background = prepare_render(project)
+            
+            os.makedirs(os.path.dirname(job.output_path) or '.', exist_ok=True)
+            
+            exporter = VideoExporter(
+                scene, job.output_path, background, preset=preset
+            )
+            reporter.connect(exporter)
+            exporter.error.connect(errors.append)
+            exporter.run()
+            
+            frames = exporter.report.get('frames', 0)
+        except Exception as e:
+            errors.append(str(e))
+            reporter.emit("error", message=str(e))
+    
+    return JobResult(
+        name=job.name,
+        output_path=job.output_path,
+        success=not errors,
+        attempts=attempt,
+        frames=frames,
+        wall_time=time.perf_counter() - start,
+        log_path=log_path,
+        error="; ".join(errors),
+    ).to_dict()
+
+
+class RenderQueue:
+    """
+    Runs a manifest's jobs across a pool of worker processes
+    
+    Failed jobs are retried up to manifest.retries times. If a worker
+    process dies, the pool is recreated and the jobs that were in flight
+    are requeued and run one at a time: only the job that crashes a
+    worker on its own is charged an attempt.
+    """
+    
+    def __init__(self, manifest: RenderManifest):
+        self.manifest = manifest
+        self.results: List[JobResult] = []
+        self.wall_time = 0.0
+    
+    def _create_pool(self) -> ProcessPoolExecutor:
+        # Spawn (not fork) so each worker starts with a clean Qt state
+        return ProcessPoolExecutor(
+            max_workers=max(1, self.manifest.workers),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_worker
+        )
+    
+    def _submit(self, pool: ProcessPoolExecutor, pending: Dict, job: RenderJob, attempt: int):
+        future = pool.submit(render_job, self.manifest.template_path, job,
+                             self.manifest.preset, self.log_path(job), attempt)
+        pending[future] = (job, attempt)
+    
+    def log_path(self, job: RenderJob) -> str:
+        """Per-job log file"""
+        return os.path.join(self.manifest.output_dir, 'logs', f"{job.name}.log")
+    
+    def run(self, on_result: Optional[Callable[[JobResult], None]] = None) -> List[JobResult]:
+        """
+        Render all jobs
+        
+        Args:
+            on_result: Called with each job's final result as it completes
+        
+        Returns:
+            Final result of every job
+        """
+        manifest = self.manifest
+        os.makedirs(os.path.join(manifest.output_dir, 'logs'), exist_ok=True)
+        
+        self.results = []
+        start = time.perf_counter()
+        
+        queue = deque((job, 1) for job in manifest.jobs)
+        # Jobs that were in flight when a worker crashed: which one crashed
+        # is unknown, so they run one at a time until it shows itself
+        suspects = deque()
+        pending = {}
+        workers = max(1, manifest.workers)
+        pool = self._create_pool()
+        
+        try:
+            while queue or suspects or pending:
+                if suspects:
+                    if not pending:
+                        self._submit(pool, pending, *suspects.popleft())
+                else:
+                    while queue and len(pending) < workers:
+                        self._submit(pool, pending, *queue.popleft())
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                # A crash with a single job in flight was that job's
+                alone = len(pending) == 1
+                pool_broken = False
+                
+                for future in done:
+                    job, attempt = pending.pop(future)
+                    try:
+                        result = JobResult.from_dict(future.result())
+                    except BrokenProcessPool:
+                        pool_broken = True
+                        if not alone:
+                            # Requeued without counting an attempt
+                            suspects.append((job, attempt))
+                            continue
+                        result = JobResult(job.name, job.output_path, False, attempt,
+                                           log_path=self.log_path(job),
+                                           error="Worker process crashed")
+                    except Exception as e:
+                        result = JobResult(job.name, job.output_path, False, attempt,
+                                           log_path=self.log_path(job), error=str(e))
+                    
+                    if not result.success and attempt <= manifest.retries:
+                        queue.append((job, attempt + 1))
+                    else:
+                        self.results.append(result)
+                        if on_result:
+                            on_result(result)
+                
+                if pool_broken:
+                    # Jobs still in flight died with the pool
+                    suspects.extend(pending.values())
+                    pending.clear()
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = self._create_pool()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        
+        self.wall_time = time.perf_counter() - start
+        return self.results
+    
+    def summary(self) -> Dict[str, Any]:
+        """Throughput summary of the last run"""
+        total_frames = sum(r.frames for r in self.results if r.success)
+        
+        return {
+            'jobs': len(self.results),
+            'succeeded': sum(1 for r in self.results if r.success),
+            'failed': sum(1 for r in self.results if not r.success),
+            'workers': self.manifest.workers,
+            'wall_time': round(self.wall_time, 2),
+            'total_frames': total_frames,
+            'throughput_fps': round(total_frames / self.wall_time, 2) if self.wall_time > 0 else 0.0,
+            'results': [r.to_dict() for r in self.results],
+        }
+    
+    def save_summary(self, filepath: Optional[str] = None) -> str:
+        """Write the summary as JSON (default: <output_dir>/summary.json)"""
+        if filepath is None:
+            filepath = os.path.join(self.manifest.output_dir, 'summary.json')
+        
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+        
+        return filepath
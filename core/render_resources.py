@@ -0,0 +1,98 @@
+"""
+Paint resources shared by the nodes of a render graph
+
+Elements used to rebuild their fonts and gradient colours for every
+paint. The cache builds each one once per graph; everything it returns
+is either immutable or a fresh copy, so callers may modify it.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor, QFont, QPixmap
+
+from utils.config import GRADIENTS
+
+
+def element_font(family: str, size: int, bold: bool = False) -> QFont:
+    """
+    Font for text drawn by elements
+    
+    Full hinting makes each glyph's rasterization independent of the
+    other font sizes drawn before it, so rendered frames are repeatable.
+    """
+    font = QFont(family, size)
+    font.setBold(bold)
+    font.setHintingPreference(QFont.HintingPreference.PreferFullHinting)
+    return font
+
+
+class ResourceCache:
+    """Fonts, gradient colours and scaled pixmaps, built on first use"""
+    
+    def __init__(self):
+        self._fonts: Dict[Tuple[str, int, bool], QFont] = {}
+        # Per gradient name: (colour stops the entries were made from,
+        # position -> RGB)
+        self._gradients: Dict[str, Tuple[List, Dict[float, Tuple[int, int, int]]]] = {}
+        self._pixmaps: Dict[Tuple[str, int, int], QPixmap] = {}
+    
+    def font(self, family: str, size: int, bold: bool = False) -> QFont:
+        """Element font (see element_font); QPainter.setFont copies it"""
+        key = (family, size, bold)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = element_font(family, size, bold)
+        return font
+    
+    def gradient_color(self, name: str, position: float) -> QColor:
+        """Colour of a named gradient at position (0-1)"""
+        stops = GRADIENTS.get(name, GRADIENTS["Ocean"])
+        cached = self._gradients.get(name)
+        # Custom gradients can be redefined under the same name
+        if cached is None or cached[0] is not stops:
+            cached = self._gradients[name] = (stops, {})
+        
+        rgb = cached[1].get(position)
+        if rgb is None:
+            rgb = cached[1][position] = interpolate_gradient(stops, position)
+        return QColor(*rgb)
+    
+    def pixmap(self, path: str, width: int, height: int) -> Optional[QPixmap]:
+        """Image scaled to cover width x height, or None if it can't be read"""
+        key = (path, width, height)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            source = QPixmap(path)
+            if source.isNull():
+                return None
+            pixmap = self._pixmaps[key] = source.scaled(
+                width, height,
+                Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                Qt.TransformationMode.SmoothTransformation
+            )
+        return pixmap
+    
+    def clear(self):
+        self._fonts.clear()
+        self._gradients.clear()
+        self._pixmaps.clear()
+
+
+def interpolate_gradient(stops: List[Tuple[int, int, int]],
+                         position: float) -> Tuple[int, int, int]:
+    """RGB at position (0-1) between evenly spaced colour stops"""
+    num_colors = len(stops)
+    segment = position * (num_colors - 1)
+    idx = int(segment)
+    t = segment - idx
+    
+    # Clamp index
+    idx = max(0, min(idx, num_colors - 2))
+    
+    # Linear interpolation between two colors
+    c1 = stops[idx]
+    c2 = stops[idx + 1]
+    
+    return (int(c1[0] + (c2[0] - c1[0]) * t),
+            int(c1[1] + (c2[1] - c1[1]) * t),
+            int(c1[2] + (c2[2] - c1[2]) * t))
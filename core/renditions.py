@@ -0,0 +1,192 @@
+"""
+Output renditions: several encodes from one render pass
+
+Frames are painted once at the master resolution and streamed into a
+single FFmpeg process, which splits the stream and scales, crops and
+encodes every rendition in parallel:
+
+    rawvideo -> split -> master encode           -> out.mp4
+                      -> crop/scale -> encode    -> out_720p.mp4
+                      -> crop/scale -> encode    -> out_vertical.mp4
+
+Rendering costs the same as a single export; each extra rendition only
+adds its encoder.
+"""
+import os
+import re
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from utils.config import RENDITION_PRESETS, VIDEO_CODEC
+
+
+FIT_MODES = ("crop", "pad")
+
+
+@dataclass
+class Rendition:
+    """
+    Additional output of an export
+    
+    fit decides how a different aspect ratio is handled: 'crop' cuts the
+    centre out of the master frame (e.g. a 9:16 crop of a 16:9 video),
+    'pad' fits the whole frame and letterboxes it. crf and preset default
+    to the export's own settings.
+    """
+    name: str
+    width: int
+    height: int
+    crf: Optional[int] = None
+    preset: Optional[str] = None
+    fit: str = "crop"
+    
+    def output_path(self, master_path: str) -> str:
+        """Output file next to the master, e.g. song_720p.mp4"""
+        base, ext = os.path.splitext(master_path)
+        return f"{base}_{self.name}{ext}"
+    
+    def scaled(self, scale: float) -> 'Rendition':
+        """Copy with its size scaled (draft exports), keeping even dimensions"""
+        if scale == 1.0:
+            return Rendition(**self.to_dict())
+        
+        data = self.to_dict()
+        data['width'] = max(2, int(round(self.width * scale / 2)) * 2)
+        data['height'] = max(2, int(round(self.height * scale / 2)) * 2)
+        return Rendition(**data)
+    
+    def filter_chain(self, source_size: Tuple[int, int]) -> str:
+        """FFmpeg filters turning a master frame into this rendition"""
+        source_width, source_height = source_size
+        filters = []
+        
+        if self.fit == "pad":
+            # Fit inside, then letterbox
+            scale = min(self.width / source_width, self.height / source_height)
+            width = max(2, int(source_width * scale) // 2 * 2)
+            height = max(2, int(source_height * scale) // 2 * 2)
+            filters.append(f"scale={width}:{height}:flags=lanczos")
+            if (width, height) != (self.width, self.height):
+                filters.append(f"pad={self.width}:{self.height}:(ow-iw)/2:(oh-ih)/2")
+        else:
+            # Crop the centre to the target aspect first, so the scaler
+            # only touches pixels that end up in the output
+            crop_width = min(source_width,
+                             int(round(source_height * self.width / self.height)))
+            crop_height = min(source_height,
+                              int(round(source_width * self.height / self.width)))
+            if (crop_width, crop_height) != (source_width, source_height):
+                filters.append(f"crop={crop_width}:{crop_height}")
+            if (crop_width, crop_height) != (self.width, self.height):
+                filters.append(f"scale={self.width}:{self.height}:flags=lanczos")
+        
+        filters.append("format=yuv420p")
+        return ",".join(filters)
+    
+    def to_dict(self) -> Dict:
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Rendition':
+        return cls(**data)
+
+
+def preset_rendition(name: str) -> Rendition:
+    """Rendition from RENDITION_PRESETS"""
+    try:
+        width, height, fit = RENDITION_PRESETS[name]
+    except KeyError:
+        raise ValueError(f"Unknown rendition '{name}' "
+                         f"(presets: {', '.join(RENDITION_PRESETS)})")
+    return Rendition(name, width, height, fit=fit)
+
+
+def parse_rendition(text: str) -> Rendition:
+    """
+    Parse a rendition spec
+    
+    Either a preset name ('720p') or NAME=WIDTHxHEIGHT, both optionally
+    followed by :key=value options, e.g.
+        vertical:crf=23
+        story=1080x1920:fit=pad:preset=fast
+    """
+    head, *options = text.split(":")
+    
+    if "=" in head:
+        name, size = head.split("=", 1)
+        match = re.fullmatch(r"(\d+)x(\d+)", size.strip().lower())
+        if not match:
+            raise ValueError(f"Invalid rendition size '{size}', expected WIDTHxHEIGHT")
+        rendition = Rendition(name.strip(), int(match.group(1)), int(match.group(2)))
+    else:
+        rendition = preset_rendition(head.strip())
+    
+    for option in options:
+        key, sep, value = option.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid rendition option '{option}', expected key=value")
+        if key == "crf":
+            rendition.crf = int(value)
+        elif key == "preset":
+            rendition.preset = value
+        elif key == "fit":
+            rendition.fit = value
+        else:
+            raise ValueError(f"Unknown rendition option '{key}'")
+    
+    validate_renditions([rendition])
+    return rendition
+
+
+def validate_renditions(renditions: Sequence[Rendition]):
+    """Raise ValueError for unusable or clashing renditions"""
+    names = set()
+    for rendition in renditions:
+        if not re.fullmatch(r"[A-Za-z0-9_-]+", rendition.name):
+            raise ValueError(f"Invalid rendition name '{rendition.name}' "
+                             f"(letters, digits, '-' and '_' only)")
+        if rendition.name in names:
+            raise ValueError(f"Duplicate rendition '{rendition.name}'")
+        if rendition.width % 2 or rendition.height % 2 or rendition.width <= 0 \
+                or rendition.height <= 0:
+            raise ValueError(f"Rendition '{rendition.name}' needs a positive, even size")
+        if rendition.fit not in FIT_MODES:
+            raise ValueError(f"Invalid fit '{rendition.fit}' "
+                             f"(expected {' or '.join(FIT_MODES)})")
+        names.add(rendition.name)
+
+
+def rendition_output_args(source_size: Tuple[int, int], crf: int, preset: str,
+                          master_path: str,
+                          renditions: Sequence[Tuple[Rendition, str]],
+                          codec: str = VIDEO_CODEC) -> List[str]:
+    """
+    FFmpeg output arguments writing the master and every rendition
+    
+    renditions pairs each Rendition with its output file. The result
+    names all outputs, so it is used with FFmpegPipeWriter(None, ...).
+    """
+    labels = [f"[r{i}]" for i in range(len(renditions) + 1)]
+    graph = [f"[0:v]split={len(labels)}{''.join(labels)}",
+             f"{labels[0]}format=yuv420p[out0]"]
+    for i, (rendition, _) in enumerate(renditions, start=1):
+        graph.append(f"{labels[i]}{rendition.filter_chain(source_size)}[out{i}]")
+    
+    args = ['-filter_complex', ';'.join(graph)]
+    
+    outputs = [(master_path, crf, preset)] + [
+        (path,
+         rendition.crf if rendition.crf is not None else crf,
+         rendition.preset or preset)
+        for rendition, path in renditions
+    ]
+    for i, (path, output_crf, output_preset) in enumerate(outputs):
+        args += [
+            '-map', f'[out{i}]',
+            '-c:v', codec,
+            '-preset', output_preset,
+            '-crf', str(output_crf),
+            path
+        ]
+    
+    return args
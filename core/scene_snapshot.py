@@ -0,0 +1,52 @@
+"""
+Scene snapshots for rendering off the GUI thread
+
+An export never touches the live preview: when it starts, the project
+is copied and compiled into a render graph - elements built from the
+copy that never join a QGraphicsScene. The user can keep editing and
+previewing while the export thread paints its own nodes.
+"""
+from typing import List, Optional
+
+from core.render_graph import RenderGraph, RenderNode
+from models.project_state import ProjectState
+from models.audio_processor import AudioProcessor
+from models.lyrics_parser import LyricsParser
+
+
+class SceneSnapshot:
+    """
+    Frozen copy of a project and its audio, ready to render
+    
+    Later edits to the project, its elements or the loaded audio do not
+    reach the snapshot.
+    """
+    
+    def __init__(self, project: ProjectState, audio_processor: AudioProcessor,
+                 graph: Optional[RenderGraph] = None):
+        self.project = project
+        self.audio_processor = audio_processor
+        self.graph = graph or RenderGraph()
+    
+    @property
+    def nodes(self) -> List[RenderNode]:
+        return self.graph.nodes
+    
+    @classmethod
+    def capture(cls, project: ProjectState, audio_processor: AudioProcessor,
+                lyrics_parser: Optional[LyricsParser] = None) -> 'SceneSnapshot':
+        """
+        Snapshot a project and compile its render graph
+        
+        Must run on the thread that owns the project (the GUI thread) -
+        everything after that only uses the copies.
+        """
+        project = ProjectState.from_dict(project.to_dict())
+        audio_processor = audio_processor.snapshot()
+        
+        graph = RenderGraph.compile(project, audio_processor, lyrics_parser)
+        return cls(project, audio_processor, graph)
+    
+    def render_order(self) -> List[RenderNode]:
+        """Nodes sorted back to front"""
+        return self.graph.nodes
@@ -0,0 +1,281 @@
+"""
+Timeline segments and export checkpoints
+
+Long exports are rendered as fixed-length encoded segments that are
+joined without re-encoding at the end. A checkpoint manifest records
+which segments are complete, so an interrupted export can resume and
+only re-render what is missing.
+
+Checkpoint directory layout:
+    manifest.json               Render fingerprint and completed segments
+    chunk_00003.mp4             Verified segment
+    chunk_00004.partial.mp4     Segment being rendered (discarded on resume)
+    video.mp4                   Joined segments, before the audio is added
+
+Only files a checkpoint manifest names are ever deleted: a directory
+without one is refused rather than cleared.
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+from core.ffmpeg_utils import probe_frame_count
+
+
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class Chunk:
+    """Range of frames rendered as one segment"""
+    index: int
+    start_frame: int
+    end_frame: int
+    attempt: int = 1
+    
+    @property
+    def name(self) -> str:
+        return f"chunk_{self.index:05d}"
+    
+    @property
+    def task_name(self) -> str:
+        """Name of this attempt's task, claim, result and segment files"""
+        return f"{self.name}.a{self.attempt}"
+    
+    @property
+    def frame_count(self) -> int:
+        return self.end_frame - self.start_frame
+    
+    def to_dict(self) -> Dict:
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Chunk':
+        return cls(**data)
+
+
+def plan_chunks(total_frames: int, fps: int, chunk_seconds: float,
+                start_frame: int = 0) -> List[Chunk]:
+    """Split [start_frame, total_frames) into chunks of chunk_seconds"""
+    chunk_frames = max(1, int(round(chunk_seconds * fps)))
+    
+    return [
+        Chunk(index, start, min(start + chunk_frames, total_frames))
+        for index, start in enumerate(range(start_frame, total_frames, chunk_frames))
+    ]
+
+
+def write_json_atomic(path: str, data: Dict):
+    """Write JSON so readers never see a partial file"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_json(path: str) -> Optional[Dict]:
+    """Read JSON, or None if missing or not (yet) readable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def verify_segment(segment_path: str, frame_count: int) -> bool:
+    """Check a segment exists and holds exactly frame_count frames"""
+    if not os.path.exists(segment_path) or os.path.getsize(segment_path) == 0:
+        return False
+    
+    frames = probe_frame_count(segment_path)
+    if frames is None:
+        # No ffprobe - fall back to the size check above
+        return True
+    return frames == frame_count
+
+
+def render_fingerprint(settings: Dict[str, Any], media_paths: List[Optional[str]]) -> str:
+    """
+    Hash everything that affects the rendered pixels
+    
+    Media files are identified by path, size and modification time, so
+    replacing the audio or background invalidates old segments.
+    """
+    media = []
+    for path in media_paths:
+        if not path:
+            continue
+        try:
+            stat = os.stat(path)
+            media.append([os.path.abspath(path), stat.st_size, int(stat.st_mtime)])
+        except OSError:
+            media.append([path, None, None])
+    
+    payload = json.dumps({'settings': settings, 'media': media},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SegmentCheckpoint:
+    """
+    Manifest of completed segments for one export
+    
+    Segments are rendered to a partial file and only recorded once they
+    are complete, so a crash never leaves a half-written segment that
+    looks finished.
+    """
+    
+    def __init__(self, directory: str, extension: str = '.mp4'):
+        self.directory = os.path.abspath(directory)
+        self.extension = extension  # Container of the segment files
+        self.manifest_path = os.path.join(self.directory, 'manifest.json')
+        self.fingerprint: Optional[str] = None
+        self.segments: Dict[int, Dict[str, Any]] = {}
+        self._plan: List[Dict] = []
+    
+    def open(self, fingerprint: str, chunks: List[Chunk]) -> int:
+        """
+        Start or resume a checkpointed export
+        
+        Previous segments are kept only if the fingerprint and segment
+        plan match and the file still verifies.
+        
+        Returns:
+            Number of segments that can be reused
+        """
+        plan = [c.to_dict() for c in chunks]
+        manifest = self._read_manifest()
+        
+        if (manifest is None or manifest.get('version') != MANIFEST_VERSION
+                or manifest.get('fingerprint') != fingerprint
+                or manifest.get('chunks') != plan):
+            # Nothing reusable - delete the old checkpoint's files
+            if manifest is not None:
+                self._discard(manifest)
+            manifest = {}
+        
+        os.makedirs(self.directory, exist_ok=True)
+        self.fingerprint = fingerprint
+        self.segments = {}
+        
+        by_index = {c.index: c for c in chunks}
+        for key, entry in manifest.get('segments', {}).items():
+            chunk = by_index.get(int(key))
+            if chunk is not None and self._verify(chunk, entry):
+                self.segments[chunk.index] = entry
+        
+        # Leftovers of an interrupted segment
+        for chunk in chunks:
+            _remove(self.partial_path(chunk))
+        
+        self._plan = plan
+        self._save()
+        return len(self.segments)
+    
+    def segment_path(self, chunk: Chunk) -> str:
+        return os.path.join(self.directory, f"{chunk.name}{self.extension}")
+    
+    def partial_path(self, chunk: Chunk) -> str:
+        return os.path.join(self.directory, f"{chunk.name}.partial{self.extension}")
+    
+    def joined_path(self) -> str:
+        return os.path.join(self.directory, f"video{self.extension}")
+    
+    def is_complete(self, chunk: Chunk) -> bool:
+        return chunk.index in self.segments
+    
+    def complete(self, chunk: Chunk) -> bool:
+        """
+        Promote a chunk's partial file to a finished segment
+        
+        Returns:
+            False if the rendered segment failed verification
+        """
+        partial = self.partial_path(chunk)
+        if not verify_segment(partial, chunk.frame_count):
+            return False
+        
+        path = self.segment_path(chunk)
+        os.replace(partial, path)
+        self.segments[chunk.index] = {
+            'file': os.path.basename(path),
+            'size': os.path.getsize(path),
+            'frames': chunk.frame_count,
+        }
+        self._save()
+        return True
+    
+    def remove(self):
+        """Delete the checkpoint's files (e.g. once the export succeeded)"""
+        manifest = self._read_manifest()
+        if manifest is not None:
+            self._discard(manifest)
+    
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        """
+        Manifest of the checkpoint in the directory
+        
+        Returns:
+            The manifest, or None if there is no directory or it is empty
+        
+        Raises:
+            ValueError: The directory holds files but no checkpoint manifest
+        """
+        if not os.path.isdir(self.directory):
+            return None
+        
+        manifest = read_json(self.manifest_path)
+        if isinstance(manifest, dict) and 'fingerprint' in manifest and 'segments' in manifest:
+            return manifest
+        
+        if os.listdir(self.directory):
+            raise ValueError(f"'{self.directory}' exists and is not an export checkpoint - "
+                             f"move it or choose another output name")
+        return None
+    
+    def _discard(self, manifest: Dict[str, Any]):
+        """Delete the files a manifest accounts for, then the empty directory"""
+        extension = manifest.get('extension', self.extension)
+        paths = [os.path.join(self.directory, os.path.basename(entry.get('file', '')))
+                 for entry in manifest.get('segments', {}).values()]
+        for data in manifest.get('chunks', []):
+            name = Chunk.from_dict(data).name
+            paths.append(os.path.join(self.directory, f"{name}{extension}"))
+            paths.append(os.path.join(self.directory, f"{name}.partial{extension}"))
+        paths.append(os.path.join(self.directory, f"video{extension}"))
+        paths.append(self.manifest_path)
+        
+        for path in paths:
+            if os.path.isfile(path):
+                _remove(path)
+        try:
+            os.rmdir(self.directory)
+        except OSError:
+            pass  # Holds files that aren't ours
+    
+    def _verify(self, chunk: Chunk, entry: Dict[str, Any]) -> bool:
+        path = self.segment_path(chunk)
+        try:
+            if os.path.getsize(path) != entry.get('size'):
+                return False
+        except OSError:
+            return False
+        return verify_segment(path, chunk.frame_count)
+    
+    def _save(self):
+        write_json_atomic(self.manifest_path, {
+            'version': MANIFEST_VERSION,
+            'fingerprint': self.fingerprint,
+            'extension': self.extension,
+            'chunks': self._plan,
+            'segments': {str(i): entry for i, entry in sorted(self.segments.items())},
+        })
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
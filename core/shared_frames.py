@@ -0,0 +1,269 @@
+"""
+Shared-memory frame transport for parallel rendering
+
+Render worker processes paint frames while the export thread streams
+them to FFmpeg. Pickling frames between processes would copy 8 MB per
+1080p frame (33 MB at 4K) twice, so frames never travel through a pipe:
+
+    SharedFramePool   one shared memory block split into fixed-size
+                      slots; every process wraps the slots in QImages
+    tasks queue       (frame index, slot) - paint this frame into this slot
+    done queue        (frame index, slot, stage timings) - frame is ready
+
+Only slot indices and a few timings are pickled. The export thread hands
+out a task only for a free slot, in frame order, so the frame it waits
+for next always has a slot and the workers can't deadlock. Finished
+frames are written to FFmpeg straight from shared memory.
+"""
+import contextlib
+import multiprocessing
+import queue
+import sys
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from core.frame_buffer import FrameBuffer
+from core.headless import setup_headless_environment, ensure_application
+
+
+class SharedFramePool:
+    """
+    Fixed-size frame slots in one shared memory block
+    
+    The creating process owns the block and unlinks it in close();
+    other processes attach() by handle.
+    """
+    
+    def __init__(self, width: int, height: int, slots: int, alpha: bool = False,
+                 name: Optional[str] = None):
+        if slots < 1:
+            raise ValueError("Shared frame pool needs at least one slot")
+        
+        self.width = width
+        self.height = height
+        self.slots = slots
+        self.alpha = alpha
+        self.frame_bytes = width * height * 4
+        
+        self.owner = name is None
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True,
+                                                     size=self.frame_bytes * slots)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        
+        self._pixels = np.ndarray((slots, height, width, 4), dtype=np.uint8,
+                                  buffer=self.memory.buf)
+        self._buffers: Dict[int, FrameBuffer] = {}
+    
+    @property
+    def handle(self) -> Dict[str, Any]:
+        """Picklable description for attach()"""
+        return {'name': self.memory.name, 'width': self.width, 'height': self.height,
+                'slots': self.slots, 'alpha': self.alpha}
+    
+    @classmethod
+    def attach(cls, handle: Dict[str, Any]) -> 'SharedFramePool':
+        """Open a pool created by another process"""
+        return cls(handle['width'], handle['height'], handle['slots'],
+                   handle['alpha'], name=handle['name'])
+    
+    @property
+    def nbytes(self) -> int:
+        return self.frame_bytes * self.slots
+    
+    def pixels(self, slot: int) -> np.ndarray:
+        """Pixels of a slot (NATIVE_RGB32_PIX_FMT), a view into shared memory"""
+        return self._pixels[slot]
+    
+    def buffer(self, slot: int) -> FrameBuffer:
+        """FrameBuffer painting into a slot (created once per process)"""
+        buffer = self._buffers.get(slot)
+        if buffer is None:
+            buffer = FrameBuffer(self.width, self.height, self.alpha,
+                                 pixels=self._pixels[slot])
+            self._buffers[slot] = buffer
+        return buffer
+    
+    def close(self):
+        """Release this process's mapping; the owner also frees the block"""
+        # Views must go before the mapping can be closed
+        self._buffers.clear()
+        self._pixels = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def render_worker(handle: Dict[str, Any], settings: Dict[str, Any],
+                  tasks: multiprocessing.Queue, done: multiprocessing.Queue):
+    """
+    Worker process: paint frames into shared slots until a None task
+    
+    settings (VideoExporter.worker_settings) rebuild the exporter's
+    scene, so frames come out identical to painting them in-process.
+    """
+    setup_headless_environment()
+    ensure_application()
+    
+    from core.scene_snapshot import SceneSnapshot
+    from core.video_exporter import VideoExporter
+    from models.audio_processor import AudioProcessor
+    from models.project_state import ProjectState
+    
+    pool = None
+    try:
+        project = ProjectState.from_dict(settings['project'])
+        # Library code reports problems with print() - keep stdout clean
+        # for the parent's machine-readable output
+        with contextlib.redirect_stdout(sys.stderr):
+            audio_processor = AudioProcessor()
+            if not audio_processor.load_audio(project.audio_path):
+                raise ValueError(f"Failed to load audio: {project.audio_path}")
+        
+        scene = SceneSnapshot.capture(project, audio_processor, settings['lyrics_parser'])
+        exporter = VideoExporter(scene, "", settings['background'],
+                                 draft=settings['draft'],
+                                 supersample=settings['supersample'],
+                                 overlay=settings['overlay'])
+        exporter.write_report = False
+        
+        pool = SharedFramePool.attach(handle)
+        exporter.prepare_buffers(pool.width, pool.height)
+        done.put(('ready', None, None))
+        
+        metrics = exporter.metrics
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            
+            frame_idx, slot = task
+            metrics.stage_seconds = {}
+            exporter.update_nodes(frame_idx / settings['fps'])
+            exporter.paint_frame(pool.width, pool.height, target=pool.buffer(slot))
+            done.put((frame_idx, slot, metrics.stage_seconds))
+    except Exception as e:
+        done.put(('error', None, str(e)))
+    finally:
+        if pool is not None:
+            pool.close()
+
+
+class ParallelFrameRenderer:
+    """
+    Paints frames in worker processes, delivering them in order
+    
+    Usage:
+        renderer = ParallelFrameRenderer(exporter.worker_settings(), w, h, 4)
+        renderer.start()
+        for frame_idx, pixels, stages in renderer.frames(0, total):
+            writer.write(pixels)  # valid until the next frame is requested
+        renderer.close()
+    """
+    
+    def __init__(self, settings: Dict[str, Any], width: int, height: int, workers: int,
+                 slots: Optional[int] = None, alpha: bool = False,
+                 start_timeout: float = 120.0, frame_timeout: float = 60.0):
+        self.settings = settings
+        self.width = width
+        self.height = height
+        self.workers = max(1, workers)
+        # Two frames in flight per worker keeps every worker busy while
+        # the encoder holds one slot
+        self.slots = slots or self.workers * 2 + 1
+        self.alpha = alpha
+        self.start_timeout = start_timeout
+        self.frame_timeout = frame_timeout
+        
+        self.pool: Optional[SharedFramePool] = None
+        self._processes: List[multiprocessing.Process] = []
+        self._context = multiprocessing.get_context('spawn')
+        self._tasks = None
+        self._done = None
+    
+    def start(self):
+        """Create the slots and start the workers; raises if a worker fails to start"""
+        self.pool = SharedFramePool(self.width, self.height, self.slots, self.alpha)
+        self._tasks = self._context.Queue()
+        self._done = self._context.Queue()
+        
+        for index in range(self.workers):
+            process = self._context.Process(
+                target=render_worker,
+                args=(self.pool.handle, self.settings, self._tasks, self._done),
+                name=f"render-worker-{index}",
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+        
+        for _ in range(self.workers):
+            self._receive(self.start_timeout)
+    
+    def frames(self, start_frame: int,
+               end_frame: int) -> Iterator[Tuple[int, np.ndarray, Dict[str, float]]]:
+        """
+        Yield (frame index, pixels, worker stage timings) in frame order
+        
+        The pixels live in a shared slot that is handed back to the
+        workers when the next frame is requested.
+        """
+        free = list(range(self.slots))
+        ready: Dict[int, Tuple[int, Dict[str, float]]] = {}
+        next_task = start_frame
+        
+        while free and next_task < end_frame:
+            self._tasks.put((next_task, free.pop()))
+            next_task += 1
+        
+        for frame_idx in range(start_frame, end_frame):
+            while frame_idx not in ready:
+                done_idx, slot, stages = self._receive(self.frame_timeout)
+                ready[done_idx] = (slot, stages)
+            
+            slot, stages = ready.pop(frame_idx)
+            yield frame_idx, self.pool.pixels(slot), stages
+            
+            # The consumer is done with the slot - reuse it for the next task
+            if next_task < end_frame:
+                self._tasks.put((next_task, slot))
+                next_task += 1
+    
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        for process in self._processes:
+            if process.is_alive():
+                self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._processes = []
+        
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+    
+    def _receive(self, timeout: float) -> Tuple[Any, Any, Any]:
+        """Next message from the workers; raises on worker errors or crashes"""
+        waited = 0.0
+        while True:
+            try:
+                message = self._done.get(timeout=1.0)
+                break
+            except queue.Empty:
+                waited += 1.0
+                dead = [p.name for p in self._processes if not p.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Render worker exited unexpectedly: {', '.join(dead)}")
+                if waited >= timeout:
+                    raise RuntimeError("Timed out waiting for render workers")
+        
+        kind, slot, payload = message
+        if kind == 'error':
+            raise RuntimeError(f"Render worker failed: {payload}")
+        return message
@@ -0,0 +1,119 @@
+"""
+Export telemetry: where render time goes
+
+The exporter times each stage of every frame (updating and painting
+each kind of element, downscaling, writing to the encoder) and keeps a
+rolling frame rate. snapshot() is emitted while exporting; to_dict()
+is the final report.
+"""
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from utils.resources import peak_rss_mb
+
+
+class ExportTelemetry:
+    """
+    Stage timings and throughput of one export
+    
+    Stages are named '<stage>/<element kind>' for per-element work, e.g.
+    'update/visualizer.bars' (spectrum analysis) or 'paint/lyrics'.
+    """
+    
+    def __init__(self, total_frames: int = 0, window: int = 60):
+        self.start(total_frames, window)
+    
+    def start(self, total_frames: int, window: int = 60):
+        """Reset for an export of total_frames frames"""
+        self.total_frames = total_frames
+        self.frames = 0
+        self.stage_seconds: Dict[str, float] = {}
+        self.started = time.perf_counter()
+        self._frame_times = deque(maxlen=max(2, window))
+    
+    def add(self, stage: str, seconds: float):
+        """Account time to a stage"""
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+    
+    def frame_done(self):
+        """Mark one more frame as finished"""
+        self.frames += 1
+        self._frame_times.append(time.perf_counter())
+    
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+    
+    @property
+    def rolling_fps(self) -> float:
+        """Frame rate over the last window of frames"""
+        times = self._frame_times
+        if len(times) < 2 or times[-1] <= times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+    
+    @property
+    def eta(self) -> Optional[float]:
+        """Seconds until all frames are rendered, at the rolling frame rate"""
+        fps = self.rolling_fps
+        if fps <= 0:
+            return None
+        return max(0, self.total_frames - self.frames) / fps
+    
+    def stage_breakdown(self) -> Dict[str, Dict[str, float]]:
+        """Per stage: total seconds, milliseconds per frame and share of stage time"""
+        total = sum(self.stage_seconds.values()) or 1.0
+        frames = max(1, self.frames)
+        
+        return {
+            stage: {
+                'seconds': round(seconds, 4),
+                'ms_per_frame': round(seconds * 1000 / frames, 3),
+                'share': round(seconds / total, 4),
+            }
+            for stage, seconds in sorted(self.stage_seconds.items(),
+                                         key=lambda item: -item[1])
+        }
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Progress sample for the telemetry signal"""
+        eta = self.eta
+        return {
+            'frames': self.frames,
+            'total_frames': self.total_frames,
+            'fps': round(self.rolling_fps, 2),
+            'eta': None if eta is None else round(eta, 1),
+            'elapsed': round(self.elapsed, 1),
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': {stage: data['ms_per_frame']
+                       for stage, data in self.stage_breakdown().items()},
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Final report"""
+        elapsed = self.elapsed
+        return {
+            'frames': self.frames,
+            'wall_seconds': round(elapsed, 3),
+            'average_fps': round(self.frames / elapsed, 2) if elapsed > 0 else 0.0,
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': self.stage_breakdown(),
+        }
+
+
+def format_telemetry(sample: Dict[str, Any], top: int = 3) -> str:
+    """One-line summary of a telemetry sample, e.g. for a log view"""
+    eta = sample.get('eta')
+    eta_text = "--:--" if eta is None else f"{int(eta) // 60}:{int(eta) % 60:02d}"
+    
+    parts = [f"{sample['frames']}/{sample['total_frames']} frames",
+             f"{sample['fps']:.1f} fps", f"ETA {eta_text}"]
+    if sample.get('peak_rss_mb') is not None:
+        parts.append(f"{sample['peak_rss_mb']:.0f} MB")
+    
+    stages = list(sample.get('stages', {}).items())[:top]
+    if stages:
+        parts.append(", ".join(f"{stage} {ms:.1f} ms" for stage, ms in stages))
+    
+    return " | ".join(parts)
@@ -3,16 +3,83 @@ Video export engine using FFmpeg
 """
 import cv2
 import numpy as np
-import subprocess
 import os
-from typing import List, Optional
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from PyQt6.QtCore import QThread, pyqtSignal
-from PyQt6.QtGui import QPainter, QImage
-from PyQt6.QtWidgets import QGraphicsScene
+from PyQt6.QtGui import QPainter, QTransform
 
-from models.project_state import ProjectState
-from models.audio_processor import AudioProcessor
-from elements.base_element import DraggableElement
+from core.color_lut import is_lut_file
+from core.effects import EffectChain, grading_effect
+from core.frame_buffer import FrameBuffer, FrameBufferRing
+from core.ffmpeg_utils import (ALPHA_FORMATS, FFmpegPipeWriter, FFmpegProcess,
+                               NATIVE_RGB32_PIX_FMT, alpha_output_args, audio_output_args,
+                               concat_videos, probe_audio_codec, progress_seconds)
+from core.image_sequence import (SEQUENCE_FORMATS, ImageSequenceWriter, frame_filename,
+                                 missing_ranges, open_sequence)
+from core.loop_export import LOOP_FORMATS, LoopFrameBuffer, encode_loop, loop_resolution
+from core.renditions import Rendition, rendition_output_args, validate_renditions
+from core.render_graph import RenderGraph
+from core.scene_snapshot import SceneSnapshot
+from core.shared_frames import ParallelFrameRenderer
+from core.segments import (SegmentCheckpoint, plan_chunks, render_fingerprint,
+                           write_json_atomic)
+from core.telemetry import ExportTelemetry
+from utils.config import (AUDIO_BITRATE, AUDIO_CODEC, AUDIO_STREAM_COPY,
+                          DEFAULT_WIDTH, DEFAULT_HEIGHT, DRAFT_CRF, DRAFT_FPS,
+                          DRAFT_PRESET, DRAFT_SCALE, IMAGE_SEQUENCE_COMPRESSION,
+                          IMAGE_SEQUENCE_WORKERS, LOOP_DITHER, LOOP_FPS,
+                          LOOP_MAX_BUFFER_MB, LOOP_MAX_SECONDS, LOOP_WEBP_QUALITY,
+                          LOOP_WIDTH, RENDER_WORKERS)
+from utils.resources import peak_rss_mb
+
+
+def load_background_image(path: Optional[str],
+                          resolution: Tuple[int, int]) -> Optional[np.ndarray]:
+    """
+    Load a background image scaled to the export resolution
+    
+    Returns:
+        BGR image, or None if no path is set or loading failed
+    """
+    if not path:
+        return None
+    
+    image = cv2.imread(path)
+    if image is None:
+        return None
+    
+    return cv2.resize(image, tuple(resolution), interpolation=cv2.INTER_LANCZOS4)
+
+
+def design_transform(output_size: Tuple[int, int], supersample: int = 1,
+                     design_size: Tuple[int, int] = (DEFAULT_WIDTH, DEFAULT_HEIGHT)) -> QTransform:
+    """
+    Map layout (design) space onto an output frame
+    
+    Elements are positioned in DEFAULT_WIDTH x DEFAULT_HEIGHT space. The
+    layout is scaled uniformly to fit the output and centred, so other
+    aspect ratios are letterboxed instead of distorted.
+    """
+    width, height = output_size
+    design_width, design_height = design_size
+    
+    scale = min(width / design_width, height / design_height)
+    dx = (width - design_width * scale) / 2
+    dy = (height - design_height * scale) / 2
+    
+    s = scale * supersample
+    return QTransform(s, 0, 0, s, dx * supersample, dy * supersample)
+
+
+def scaled_resolution(resolution: Tuple[int, int], scale: float) -> Tuple[int, int]:
+    """Scale a resolution, keeping even dimensions for yuv420p encoding"""
+    width, height = resolution
+    if scale == 1.0:
+        return int(width), int(height)
+    
+    return (max(2, int(round(width * scale / 2)) * 2),
+            max(2, int(round(height * scale / 2)) * 2))
 
 
 class VideoExporter(QThread):
@@ -25,18 +92,143 @@ class VideoExporter(QThread):
     status = pyqtSignal(str)  # Status message
     finished = pyqtSignal(str)  # Output path
     error = pyqtSignal(str)  # Error message
+    telemetry = pyqtSignal(dict)  # Throughput and stage timings (ExportTelemetry.snapshot)
     
-    def __init__(self, project: ProjectState, audio_processor: AudioProcessor,
-                 elements: List[DraggableElement], output_path: str,
-                 background_image: Optional[np.ndarray] = None):
+    def __init__(self, scene: SceneSnapshot, output_path: str,
+                 background_image: Optional[np.ndarray] = None,
+                 preset: str = "medium", start_time: float = 0.0,
+                 end_time: Optional[float] = None, draft: bool = False,
+                 supersample: int = 1, renditions: Optional[List[Rendition]] = None,
+                 overlay: Optional[str] = None, image_sequence: Optional[str] = None,
+                 loop: Optional[str] = None):
         super().__init__()
-        self.project = project
-        self.audio_processor = audio_processor
-        self.elements = elements
+        # Renders its own copy of the project - the live preview is never
+        # touched from this thread
+        self.scene = scene
+        self.project = scene.project
+        self.audio_processor = scene.audio_processor
         self.output_path = output_path
         self.background_image = background_image
+        self.preset = preset
+        
+        # Export range in seconds (in/out points); None = until the end
+        self.start_time = start_time
+        self.end_time = end_time
+        
+        # Output settings - the layout is mapped onto any resolution by
+        # the design transform, so draft mode can simply render smaller
+        self.draft = draft
+        self.fps = self.project.fps
+        self.crf = self.project.crf
+        self.resolution = scaled_resolution(self.project.resolution, 1.0)
+        self.antialiasing = True
+        if draft:
+            self.fps = min(self.project.fps, DRAFT_FPS)
+            self.crf = max(self.project.crf, DRAFT_CRF)
+            self.preset = DRAFT_PRESET
+            self.resolution = scaled_resolution(self.project.resolution, DRAFT_SCALE)
+            self.antialiasing = False
+        
+        # Frames are painted at supersample x the output size and
+        # downscaled (high-quality masters)
+        self.supersample = max(1, int(supersample))
+        
+        # Transparent overlay export: no background, frames keep their
+        # alpha and are written as ProRes 4444, VP9 WebM or PNG/TIFF sequence
+        if overlay is not None and overlay not in ALPHA_FORMATS:
+            raise ValueError(f"Unknown overlay format '{overlay}'")
+        if overlay and renditions:
+            raise ValueError("Renditions are not supported for overlay exports")
+        self.overlay = overlay
+        if overlay:
+            self.output_path = os.path.splitext(output_path)[0] + ALPHA_FORMATS[overlay]
+        
+        # Colour grade of the finished frames (a look or .cube LUT).
+        # Overlays stay ungraded - their colours are premultiplied by alpha
+        grade = None if overlay else grading_effect(self.project.grade,
+                                                    self.project.grade_intensity)
+        self.effects = EffectChain([grade]) if grade else None
+        
+        # Image sequence export (PNG/TIFF files instead of a video)
+        if overlay in SEQUENCE_FORMATS:
+            image_sequence = overlay
+        if image_sequence is not None and image_sequence not in SEQUENCE_FORMATS:
+            raise ValueError(f"Unknown image sequence format '{image_sequence}'")
+        if image_sequence and renditions:
+            raise ValueError("Renditions are not supported for image sequences")
+        self.image_sequence = image_sequence
+        if image_sequence:
+            # Frames are written into a directory named like the file
+            self.output_path = os.path.splitext(output_path)[0]
+        self.sequence_compression = IMAGE_SEQUENCE_COMPRESSION
+        self.sequence_workers = IMAGE_SEQUENCE_WORKERS or None  # None = CPU count
+        self.sequence_max_in_flight: Optional[int] = None  # None = 2 per worker
+        
+        # Short looping GIF/WebP: the range (at most LOOP_MAX_SECONDS
+        # without one) at reduced size and frame rate
+        if loop is not None and loop not in LOOP_FORMATS:
+            raise ValueError(f"Unknown loop format '{loop}'")
+        if loop and (overlay or image_sequence or renditions):
+            raise ValueError("Loops can't be combined with overlays, image sequences "
+                             "or renditions")
+        self.loop = loop
+        if loop:
+            self.output_path = os.path.splitext(output_path)[0] + LOOP_FORMATS[loop]
+            self.fps = min(self.fps, LOOP_FPS)
+            self.resolution = loop_resolution(self.resolution, LOOP_WIDTH)
+            if self.end_time is None:
+                self.end_time = self.start_time + LOOP_MAX_SECONDS
+        self.loop_dither = LOOP_DITHER
+        self.loop_colors = 256
+        self.loop_quality = LOOP_WEBP_QUALITY
+        self.loop_max_buffer_mb = LOOP_MAX_BUFFER_MB
+        
+        # Extra outputs encoded from the same frames as the master
+        self.renditions = list(renditions or [])
+        validate_renditions(self.renditions)
+        if draft:
+            self.renditions = [r.scaled(DRAFT_SCALE) for r in self.renditions]
+            for rendition in self.renditions:
+                rendition.crf = self.crf
+                rendition.preset = self.preset
+        
+        # Audio of the final video: compatible source audio is copied,
+        # anything else encoded with audio_codec at audio_bitrate
+        self.audio_copy = AUDIO_STREAM_COPY
+        self.audio_codec = AUDIO_CODEC
+        self.audio_bitrate = AUDIO_BITRATE
         
         self.is_cancelled = False
+        self._ffmpeg: Optional[FFmpegProcess] = None  # Running mux process
+        
+        # Segment checkpoints: an interrupted export resumes from the
+        # last finished segment
+        self.segment_seconds = 30.0
+        self.resume = True
+        
+        # Preallocated frame buffers (created when rendering starts)
+        self.buffer_ring: Optional[FrameBufferRing] = None
+        self.buffer_ring_size = 3
+        self.output_ring: Optional[FrameBufferRing] = None  # Supersampling only
+        
+        # Worker processes painting into shared memory (0 = paint on
+        # this thread); started once and reused by every segment
+        self.render_workers = RENDER_WORKERS
+        self._renderer: Optional[ParallelFrameRenderer] = None
+        
+        # Reuse the previous frame when nothing visible changed
+        self.skip_duplicates = True
+        self._transform = QTransform()
+        self._background_pixels: Optional[np.ndarray] = None
+        self.graph: RenderGraph = scene.graph
+        
+        # Export report (frame count, memory usage, ...), written next to
+        # the output when the export finishes
+        self.report: Dict[str, Any] = {}
+        self.write_report = True
+        
+        # Stage timings and throughput of the frames rendered
+        self.metrics = ExportTelemetry()
     
     def run(self):
         """Main export process"""
@@ -45,181 +237,734 @@ class VideoExporter(QThread):
             
             # Calculate total frames
             duration = self.audio_processor.duration
-            fps = self.project.fps
+            fps = self.fps
             total_frames = int(duration * fps)
             
             if total_frames == 0:
                 self.error.emit("Invalid duration or FPS")
                 return
             
-            # Create temporary video file (without audio)
-            temp_video = self.output_path.replace('.mp4', '_temp.mp4')
+            first_frame, end_frame = self.frame_range(total_frames)
+            if end_frame <= first_frame:
+                self.error.emit("Export range is empty")
+                return
             
-            self.status.emit("Rendering frames...")
-            success = self.render_frames(temp_video, total_frames, fps)
+            if self.draft:
+                width, height = self.resolution
+                self.status.emit(f"Draft export: {width}x{height} @ {fps} fps")
             
-            if not success or self.is_cancelled:
-                self.cleanup_temp_files(temp_video)
+            if self.image_sequence:
+                self.export_image_sequence(first_frame, end_frame, total_frames)
                 return
             
-            # Combine video with audio using FFmpeg
-            self.status.emit("Encoding final video...")
-            success = self.combine_audio_video(temp_video)
-            
-            if not success:
-                self.error.emit("Failed to combine audio and video")
-                self.cleanup_temp_files(temp_video)
+            if self.loop:
+                self.export_loop(first_frame, end_frame)
                 return
             
+            # Every output (master first) keeps its own checkpoint
+            outputs = self.outputs()
+            if self.renditions:
+                names = ", ".join(r.name for r in self.renditions)
+                self.status.emit(f"Renditions: {names} (one render pass)")
+            
+            # Render the range as checkpointed segments (without audio)
+            chunks = plan_chunks(end_frame, fps, self.segment_seconds, first_frame)
+            checkpoints = []
+            for rendition, path in outputs:
+                checkpoint = SegmentCheckpoint(self.segments_dir(path),
+                                               ALPHA_FORMATS.get(self.overlay, '.mp4'))
+                if not self.resume:
+                    checkpoint.remove()
+                checkpoint.open(self.render_fingerprint(total_frames, rendition), chunks)
+                checkpoints.append(checkpoint)
+            
+            # A segment is only skipped if every output has it
+            pending = [c for c in chunks
+                       if not all(cp.is_complete(c) for cp in checkpoints)]
+            reused = len(chunks) - len(pending)
+            self.metrics.start(sum(c.frame_count for c in pending))
+            self.report['segments'] = len(chunks)
+            self.report['segments_reused'] = reused
+            if reused:
+                self.status.emit(f"Resuming export: {reused}/{len(chunks)} segments done")
+            
+            self.status.emit("Rendering frames...")
+            for chunk in pending:
+                success = self.render_frames(
+                    checkpoints[0].partial_path(chunk),
+                    chunk.end_frame, fps, chunk.start_frame,
+                    progress_range=(first_frame, end_frame),
+                    renditions=[(rendition, checkpoint.partial_path(chunk))
+                                for (rendition, _), checkpoint
+                                in zip(outputs[1:], checkpoints[1:])]
+                )
+                
+                if self.is_cancelled:
+                    self.status.emit("Export cancelled - finished segments are "
+                                     "kept for resuming")
+                    return
+                if not success:
+                    return
+                for checkpoint in checkpoints:
+                    if not checkpoint.complete(chunk):
+                        self.error.emit(f"Segment {chunk.index} failed verification")
+                        return
+            
+            self.report['frames'] = end_frame - first_frame
+            self.report['range'] = [first_frame / fps, end_frame / fps]
+            
+            for (rendition, output_path), checkpoint in zip(outputs, checkpoints):
+                label = f" ({rendition.name})" if rendition else ""
+                
+                # Join segments without re-encoding
+                self.status.emit(f"Joining segments{label}...")
+                temp_video = checkpoint.joined_path()
+                success, stderr = concat_videos(
+                    [checkpoint.segment_path(c) for c in chunks], temp_video
+                )
+                
+                if not success:
+                    self.error.emit(f"FFmpeg error: {stderr}")
+                    return
+                
+                if self.overlay:
+                    # Overlays carry no audio - they are composited into an
+                    # edit that already has it
+                    os.replace(temp_video, output_path)
+                    self.progress.emit(100)
+                    continue
+                
+                # Combine video with audio using FFmpeg
+                self.status.emit(f"Encoding final video{label}...")
+                success = self.combine_audio_video(temp_video, first_frame / fps,
+                                                   (end_frame - first_frame) / fps,
+                                                   output_path)
+                
+                if self.is_cancelled:
+                    self.cleanup_temp_files(temp_video)
+                    self.status.emit("Export cancelled - finished segments are "
+                                     "kept for resuming")
+                    return
+                
+                if not success:
+                    self.error.emit("Failed to combine audio and video")
+                    self.cleanup_temp_files(temp_video)
+                    return
+            
             # Cleanup
-            self.cleanup_temp_files(temp_video)
+            for checkpoint in checkpoints:
+                checkpoint.remove()
             
-            self.status.emit("Export complete!")
-            self.finished.emit(self.output_path)
+            self.report['outputs'] = [path for _, path in outputs]
+            if self.renditions:
+                for _, path in outputs[1:]:
+                    self.status.emit(f"Rendition written: {path}")
             
+            self.finish_export()
+        
         except Exception as e:
             self.error.emit(f"Export failed: {str(e)}")
+        finally:
+            self.stop_render_workers()
+    
+    def finish_export(self):
+        """Report memory usage and timings and announce the finished export"""
+        self.report['peak_rss_mb'] = peak_rss_mb()
+        if self.report['peak_rss_mb'] is not None:
+            self.status.emit(f"Peak memory: {self.report['peak_rss_mb']:.0f} MB")
+        
+        self.report['telemetry'] = self.metrics.to_dict()
+        if self.write_report:
+            try:
+                write_json_atomic(self.report_path, self.report)
+                self.status.emit(f"Report: {self.report_path}")
+            except OSError as e:
+                self.status.emit(f"Could not write report: {e}")
+        
+        self.status.emit("Export complete!")
+        self.finished.emit(self.output_path)
+    
+    def export_image_sequence(self, first_frame: int, end_frame: int, total_frames: int):
+        """
+        Render the range as numbered image files
+        
+        Files are named after their frame number in the song
+        (frame_000000.png, ...), so a range export slots into a full one.
+        When resuming, frames that already have a file are skipped - if
+        they were rendered with the same fingerprint.
+        """
+        if not self.resume and os.path.isdir(self.output_path):
+            for index in range(first_frame, end_frame):
+                self.cleanup_temp_files(os.path.join(
+                    self.output_path, frame_filename(index, self.image_sequence)))
+        
+        reusable = open_sequence(self.output_path, self.render_fingerprint(total_frames),
+                                 self.image_sequence)
+        ranges = missing_ranges(self.output_path, first_frame, end_frame,
+                                self.image_sequence)
+        if not reusable:
+            # Frames of unknown or other settings are rendered again
+            ranges = [(first_frame, end_frame)]
+        missing = sum(end - start for start, end in ranges)
+        self.metrics.start(missing)
+        
+        self.report['frames_reused'] = end_frame - first_frame - missing
+        if self.report['frames_reused']:
+            self.status.emit(f"Resuming export: {self.report['frames_reused']}/"
+                             f"{end_frame - first_frame} frames done")
+        
+        self.status.emit("Rendering frames...")
+        for start, end in ranges:
+            success = self.render_frames(self.output_path, end, self.fps, start,
+                                         progress_range=(first_frame, end_frame))
+            
+            if self.is_cancelled:
+                self.status.emit("Export cancelled - finished frames are "
+                                 "kept for resuming")
+                return
+            if not success:
+                return
+        
+        # render_frames() reports the frames of each missing range
+        self.report['frames'] = end_frame - first_frame
+        self.report['range'] = [first_frame / self.fps, end_frame / self.fps]
+        
+        self.progress.emit(100)
+        self.finish_export()
+    
+    def export_loop(self, first_frame: int, end_frame: int):
+        """
+        Render the range into memory and encode a looping GIF or WebP
+        
+        Loops are short, so there are no segment checkpoints - the whole
+        clip is rendered again if interrupted.
+        """
+        width, height = self.resolution
+        fps = self.fps
+        
+        try:
+            buffer = LoopFrameBuffer(end_frame - first_frame, width, height,
+                                     self.loop_max_buffer_mb * 1024 * 1024)
+        except ValueError as e:
+            self.error.emit(str(e))
+            return
+        
+        self.prepare_buffers(width, height)
+        self.metrics.start(end_frame - first_frame)
+        self.report['frames'] = end_frame - first_frame
+        self.report['range'] = [first_frame / fps, end_frame / fps]
+        self.report['resolution'] = [width, height]
+        self.report['loop_buffer_mb'] = buffer.nbytes / (1024 * 1024)
+        
+        self.status.emit(f"Rendering {end_frame - first_frame} frames "
+                         f"({width}x{height} @ {fps} fps)...")
+        metrics = self.metrics
+        clock = time.perf_counter
+        previous_key = None
+        duplicates = 0
+        for frame_idx in range(first_frame, end_frame):
+            if self.is_cancelled:
+                self.status.emit("Export cancelled")
+                return
+            
+            key = self.update_nodes(frame_idx / fps)
+            if self.skip_duplicates and key is not None and key == previous_key:
+                started = clock()
+                buffer.repeat()
+                duplicates += 1
+            else:
+                frame = self.paint_frame(width, height)
+                started = clock()
+                buffer.append(frame)
+            metrics.add('write', clock() - started)
+            previous_key = key
+            metrics.frame_done()
+            self.report_frame_progress(frame_idx, fps, first_frame, end_frame)
+        self.report['duplicate_frames'] = duplicates
+        
+        self.status.emit("Building palette and encoding GIF..." if self.loop == "gif"
+                         else "Encoding WebP...")
+        started = clock()
+        success, stderr = encode_loop(
+            buffer, fps, self.output_path, self.loop,
+            dither=self.loop_dither, colors=self.loop_colors, quality=self.loop_quality,
+            on_progress=lambda fraction: self.progress.emit(90 + int(fraction * 10)),
+            should_stop=lambda: self.is_cancelled
+        )
+        metrics.add('encode', clock() - started)
+        
+        if self.is_cancelled:
+            self.cleanup_temp_files(self.output_path)
+            self.status.emit("Export cancelled")
+            return
+        if not success:
+            self.cleanup_temp_files(self.output_path)
+            self.error.emit(f"FFmpeg error: {stderr}")
+            return
+        
+        self.progress.emit(100)
+        self.finish_export()
     
-    def render_frames(self, temp_video: str, total_frames: int, fps: int) -> bool:
-        """Render all frames to temporary video"""
+    @property
+    def checkpoint_dir(self) -> str:
+        """Directory holding the finished segments of this export"""
+        return self.segments_dir(self.output_path)
+    
+    @property
+    def report_path(self) -> str:
+        """JSON report written next to the output"""
+        return os.path.splitext(self.output_path)[0] + '.report.json'
+    
+    @staticmethod
+    def segments_dir(output_path: str) -> str:
+        """Checkpoint directory of one output file"""
+        return os.path.splitext(output_path)[0] + '_segments'
+    
+    def outputs(self) -> List[Tuple[Optional[Rendition], str]]:
+        """Output files of this export: the master (None), then each rendition"""
+        return [(None, self.output_path)] + [
+            (rendition, rendition.output_path(self.output_path))
+            for rendition in self.renditions
+        ]
+    
+    def frame_range(self, total_frames: int) -> Tuple[int, int]:
+        """First and end (exclusive) frame of the export range"""
+        first = int(round(self.start_time * self.fps))
+        first = max(0, min(first, total_frames))
+        
+        if self.end_time is None:
+            return first, total_frames
+        
+        end = int(round(self.end_time * self.fps))
+        return first, max(first, min(end, total_frames))
+    
+    def render_fingerprint(self, total_frames: int,
+                           rendition: Optional[Rendition] = None) -> str:
+        """Identify the render settings, so stale segments are never reused"""
+        settings = {
+            'rendition': rendition.to_dict() if rendition else None,
+            'project': self.project.to_dict(),
+            'preset': self.preset,
+            'total_frames': total_frames,
+            'resolution': list(self.resolution),
+            'fps': self.fps,
+            'crf': self.crf,
+            'supersample': self.supersample,
+            'antialiasing': self.antialiasing,
+            'overlay': self.overlay,
+            'image_sequence': self.image_sequence,
+        }
+        media = [self.project.audio_path, self.project.background_path,
+                 self.project.lyrics_path, self.project.logo_path]
+        if is_lut_file(self.project.grade):
+            media.append(self.project.grade)
+        return render_fingerprint(settings, media)
+    
+    def render_frames(self, temp_video: str, total_frames: int, fps: int,
+                      start_frame: int = 0,
+                      progress_range: Optional[Tuple[int, int]] = None,
+                      renditions: Sequence[Tuple[Rendition, str]] = ()) -> bool:
+        """
+        Render frames [start_frame, total_frames) to a video file (no audio)
+        
+        Rendering a sub-range produces a segment that can later be
+        concatenated with the other segments of the timeline. Progress is
+        reported against progress_range (first, end frame of the whole
+        export) if given, otherwise against this range. renditions pairs
+        extra outputs with their files; they are encoded from the same
+        frames by the same FFmpeg process.
+        """
+        writer = None
+        if progress_range is None:
+            progress_range = (start_frame, total_frames)
+        progress_first, progress_end = progress_range
+        
         try:
-            width, height = self.project.resolution
+            width, height = self.resolution
             
-            # Create video writer
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            writer = cv2.VideoWriter(temp_video, fourcc, fps, (width, height))
+            # Stream frames to FFmpeg in the painter's native pixel format
+            if self.image_sequence:
+                # temp_video is the sequence directory
+                writer = ImageSequenceWriter(
+                    temp_video, start_frame, self.image_sequence,
+                    alpha=bool(self.overlay),
+                    compression=self.sequence_compression,
+                    workers=self.sequence_workers,
+                    max_in_flight=self.sequence_max_in_flight
+                )
+            elif self.overlay:
+                writer = FFmpegPipeWriter(
+                    temp_video, width, height, fps,
+                    pix_fmt=NATIVE_RGB32_PIX_FMT,
+                    output_args=alpha_output_args(self.overlay, self.crf)
+                )
+            elif renditions:
+                writer = FFmpegPipeWriter(
+                    None, width, height, fps,
+                    pix_fmt=NATIVE_RGB32_PIX_FMT,
+                    output_args=rendition_output_args((width, height), self.crf,
+                                                      self.preset, temp_video,
+                                                      renditions)
+                )
+            else:
+                writer = FFmpegPipeWriter(
+                    temp_video, width, height, fps,
+                    pix_fmt=NATIVE_RGB32_PIX_FMT,
+                    crf=self.crf,
+                    preset=self.preset
+                )
             
             if not writer.isOpened():
                 self.error.emit("Failed to create video writer")
                 return False
             
+            self.prepare_buffers(width, height)
+            frame_count = total_frames - start_frame
+            self.report['frames'] = frame_count
+            self.report['resolution'] = [width, height]
+            self.report['supersample'] = self.supersample
+            ring_bytes = self.buffer_ring.nbytes
+            if self.output_ring is not None:
+                ring_bytes += self.output_ring.nbytes
+            self.report['buffer_ring_mb'] = ring_bytes / (1024 * 1024)
+            
+            # Frames painted by worker processes, in order
+            parallel = None
+            if self.render_workers > 0:
+                renderer = self.start_render_workers(width, height)
+                parallel = renderer.frames(start_frame, total_frames)
+                self.report['render_workers'] = renderer.workers
+                self.report['shared_memory_mb'] = renderer.pool.nbytes / (1024 * 1024)
+            
             # Render each frame
-            for frame_idx in range(total_frames):
+            metrics = self.metrics
+            clock = time.perf_counter
+            previous_key = None
+            for frame_idx in range(start_frame, total_frames):
                 if self.is_cancelled:
-                    writer.release()
+                    writer.kill()
                     return False
                 
                 # Calculate time position
                 time_pos = frame_idx / fps
                 
-                # Render frame
-                frame = self.render_frame(time_pos, width, height)
-                
-                # Write frame
-                writer.write(frame)
-                
-                # Update progress
-                progress = int((frame_idx / total_frames) * 90)  # 0-90%
-                self.progress.emit(progress)
+                if parallel is not None:
+                    # Written straight from the shared slot, which goes back
+                    # to the workers on the next frame - so the slot can't
+                    # be resent as a duplicate
+                    started = clock()
+                    _, frame, stages = next(parallel)
+                    metrics.add('wait', clock() - started)
+                    for stage, seconds in stages.items():
+                        metrics.add(stage, seconds)
+                    
+                    started = clock()
+                    writer.write(frame)
+                    metrics.add('write', clock() - started)
+                    metrics.frame_done()
+                    self.report_frame_progress(frame_idx, fps, progress_first, progress_end)
+                    continue
                 
-                # Status update every second
-                if frame_idx % fps == 0:
-                    seconds = int(time_pos)
-                    total_seconds = int(self.audio_processor.duration)
-                    self.status.emit(f"Rendering: {seconds}/{total_seconds}s")
+                # Identical inputs give identical pixels - resend the
+                # previous frame instead of painting it again
+                key = self.update_nodes(time_pos)
+                if (self.skip_duplicates and key is not None and key == previous_key):
+                    started = clock()
+                    writer.write_duplicate()
+                    metrics.add('write', clock() - started)
+                else:
+                    frame = self.paint_frame(width, height)
+                    started = clock()
+                    writer.write(frame)
+                    metrics.add('write', clock() - started)
+                previous_key = key
+                metrics.frame_done()
+                self.report_frame_progress(frame_idx, fps, progress_first, progress_end)
             
-            writer.release()
-            return True
+            self.report['duplicate_frames'] = (self.report.get('duplicate_frames', 0)
+                                               + writer.duplicates_written)
+            
+            if not writer.release():
+                self.error.emit(f"FFmpeg error: {writer.error_output}")
+                return False
             
+            return True
+        
+        except FileNotFoundError:
+            self.error.emit("FFmpeg not found. Please install FFmpeg.")
+            return False
+        except BrokenPipeError:
+            writer.kill()
+            self.error.emit(f"FFmpeg error: {writer.error_output}")
+            return False
         except Exception as e:
+            if writer is not None:
+                writer.kill()
             self.error.emit(f"Frame rendering failed: {str(e)}")
             return False
     
+    def report_frame_progress(self, frame_idx: int, fps: int,
+                              progress_first: int, progress_end: int):
+        """Emit progress (0-90%) and, every second of video, status and telemetry"""
+        progress = int(((frame_idx - progress_first)
+                        / (progress_end - progress_first)) * 90)
+        self.progress.emit(progress)
+        
+        if frame_idx % fps == 0:
+            seconds = int(frame_idx / fps)
+            total_seconds = int(self.audio_processor.duration)
+            self.status.emit(f"Rendering: {seconds}/{total_seconds}s")
+            self.telemetry.emit(self.metrics.snapshot())
+    
+    def worker_settings(self) -> Dict[str, Any]:
+        """What a render worker needs to rebuild this export's scene"""
+        lyrics_parser = next((node.element.lyrics_parser for node in self.scene.nodes
+                              if node.kind == 'lyrics'), None)
+        return {
+            'project': self.project.to_dict(),
+            'lyrics_parser': lyrics_parser,
+            'background': self.background_image,
+            'draft': self.draft,
+            'supersample': self.supersample,
+            'overlay': self.overlay,
+            'fps': self.fps,
+        }
+    
+    def start_render_workers(self, width: int, height: int) -> ParallelFrameRenderer:
+        """Start render_workers worker processes (once per export)"""
+        renderer = self._renderer
+        if renderer is not None and (renderer.width, renderer.height) == (width, height):
+            return renderer
+        
+        self.stop_render_workers()
+        self.status.emit(f"Starting {self.render_workers} render workers...")
+        renderer = ParallelFrameRenderer(self.worker_settings(), width, height,
+                                         self.render_workers, alpha=bool(self.overlay))
+        self._renderer = renderer
+        renderer.start()
+        return renderer
+    
+    def stop_render_workers(self):
+        """Stop the render workers and free their shared memory"""
+        if self._renderer is not None:
+            self._renderer.close()
+            self._renderer = None
+    
+    def prepare_buffers(self, width: int, height: int):
+        """Allocate frame buffers and per-export render data once"""
+        paint_width = width * self.supersample
+        paint_height = height * self.supersample
+        
+        alpha = bool(self.overlay)
+        
+        if (self.buffer_ring is None or self.buffer_ring.width != paint_width
+                or self.buffer_ring.height != paint_height
+                or self.buffer_ring.alpha != alpha):
+            self.buffer_ring = FrameBufferRing(paint_width, paint_height,
+                                               self.buffer_ring_size, alpha)
+        
+        if self.supersample == 1:
+            self.output_ring = None
+        elif (self.output_ring is None or self.output_ring.width != width
+                or self.output_ring.height != height or self.output_ring.alpha != alpha):
+            self.output_ring = FrameBufferRing(width, height, self.buffer_ring_size, alpha)
+        
+        self._transform = design_transform((width, height), self.supersample)
+        
+        # Background is loaded as BGR - expand it once to the 4-byte
+        # layout of the frame buffers
+        if self.background_image is not None and not self.overlay:
+            background = self.background_image
+            if background.shape[:2] != (paint_height, paint_width):
+                interpolation = (cv2.INTER_AREA if background.shape[1] > paint_width
+                                 else cv2.INTER_LANCZOS4)
+                background = cv2.resize(background, (paint_width, paint_height),
+                                        interpolation=interpolation)
+            self._background_pixels = cv2.cvtColor(background, cv2.COLOR_BGR2BGRA)
+        else:
+            self._background_pixels = None
+        
+        self.graph.set_antialiasing(self.antialiasing)
+    
     def render_frame(self, time_pos: float, width: int, height: int) -> np.ndarray:
-        """Render a single frame at given time position"""
-        # Create base frame
-        if self.background_image is not None:
-            frame = self.background_image.copy()
+        """
+        Render a single frame at given time position
+        
+        Returns the painted pixels (NATIVE_RGB32_PIX_FMT layout) as a view
+        into the buffer ring - it is overwritten once the ring wraps
+        around, so consume it before rendering further.
+        """
+        if self.buffer_ring is None:
+            self.prepare_buffers(width, height)
+        
+        self.update_nodes(time_pos)
+        return self.paint_frame(width, height)
+    
+    def update_nodes(self, time_pos: float) -> Optional[Tuple]:
+        """
+        Move all visible render nodes to a time position
+        
+        Returns:
+            Key of the resulting frame (equal keys mean identical pixels),
+            or None if a node can't tell
+        """
+        return self.graph.update(time_pos, self.audio_processor.duration, 1.0 / self.fps,
+                                 scale=self._transform.m11(), timer=self.metrics.add)
+    
+    def paint_frame(self, width: int, height: int,
+                    target: Optional[FrameBuffer] = None) -> np.ndarray:
+        """
+        Paint the render nodes' current state into the next ring buffer
+        
+        target (an output-size buffer, e.g. a shared memory slot)
+        receives the frame instead of the ring.
+        """
+        metrics = self.metrics
+        clock = time.perf_counter
+        started = clock()
+        
+        if target is not None and self.output_ring is None:
+            buffer = target
         else:
-            # Black background
-            frame = np.zeros((height, width, 3), dtype=np.uint8)
+            buffer = self.buffer_ring.next()
         
-        # Create QImage for rendering with Qt
-        qimage = QImage(frame.data, width, height, width * 3, QImage.Format.Format_RGB888)
+        # Reset base frame in place
+        if self._background_pixels is not None:
+            np.copyto(buffer.pixels, self._background_pixels)
+        elif buffer.alpha:
+            # Fully transparent (overlay export)
+            buffer.pixels.fill(0)
+        else:
+            # Black background (opaque)
+            buffer.image.fill(0xFF000000)
         
-        # Create painter
-        painter = QPainter(qimage)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        # Create painter on the permanent QImage wrapper
+        painter = QPainter(buffer.image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, self.antialiasing)
         
-        # Update and render each element
-        from elements.visualizer_element import VisualizerElement
+        # Elements are laid out in design space - map it onto this frame
+        painter.setTransform(self._transform)
         
-        for element in sorted(self.elements, key=lambda e: e.state.z_index):
-            if not element.state.visible:
-                continue
-            
-            # Update visualizer spectrum
-            if isinstance(element, VisualizerElement):
-                element.update_spectrum(time_pos)
-            
-            # Save painter state
-            painter.save()
-            
-            # Translate to element position
-            painter.translate(element.state.x, element.state.y)
-            
-            # Render element
-            element.paint(painter, None, None)
-            
-            # Restore painter state
-            painter.restore()
+        metrics.add('background', clock() - started)
         
-        painter.end()
+        # Render each node at its position
+        self.graph.paint(painter, timer=metrics.add)
         
-        # Convert QImage back to numpy array
-        ptr = qimage.bits()
-        ptr.setsize(height * width * 3)
-        arr = np.frombuffer(ptr, np.uint8).reshape((height, width, 3))
+        painter.end()
         
-        # Convert RGB to BGR for OpenCV
-        frame = cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)
+        if self.output_ring is not None:
+            # Downscale the supersampled frame into the output buffer
+            started = clock()
+            output = target if target is not None else self.output_ring.next()
+            cv2.resize(buffer.pixels, (width, height), dst=output.pixels,
+                       interpolation=cv2.INTER_AREA)
+            metrics.add('downscale', clock() - started)
+            pixels = output.pixels
+        else:
+            # No colour conversion - FFmpeg reads the painter's format directly
+            pixels = buffer.pixels
         
-        return frame
+        if self.effects is not None:
+            started = clock()
+            self.effects.apply(pixels)
+            metrics.add('grade', clock() - started)
+        return pixels
     
-    def combine_audio_video(self, temp_video: str) -> bool:
-        """Combine temporary video with audio using FFmpeg"""
+    def combine_audio_video(self, temp_video: str, start_time: float = 0.0,
+                            duration: Optional[float] = None,
+                            output_path: Optional[str] = None) -> bool:
+        """
+        Combine temporary video with audio using FFmpeg
+        
+        start_time is the position of the video's first frame in the
+        audio, for range exports. duration (seconds of video) is used for
+        progress reporting. Writes to output_path (default: the export's
+        output path).
+        """
+        if output_path is None:
+            output_path = self.output_path
+        if duration is None:
+            duration = self.audio_processor.duration - start_time
+        
+        def on_progress(block: Dict[str, str]):
+            seconds = progress_seconds(block)
+            if duration > 0:
+                self.progress.emit(90 + int(min(1.0, seconds / duration) * 10))  # 90-100%
+            
+            # fps stays N/A when the video stream is only copied
+            details = [block.get('speed', 'N/A').strip()]
+            fps = block.get('fps', 'N/A')
+            if fps not in ('N/A', '0.00'):
+                details.insert(0, f"{fps} fps")
+            self.status.emit(f"Encoding final video: {seconds:.0f}/{duration:.0f}s "
+                             f"({', '.join(details)})")
+        
         try:
-            # FFmpeg command
-            cmd = [
-                'ffmpeg',
-                '-y',  # Overwrite output
+            audio_args = self.audio_args(start_time, output_path)
+            if self.report['audio']['copied']:
+                self.status.emit(f"Copying {self.report['audio']['codec']} audio "
+                                 f"without re-encoding")
+            
+            # FFmpeg arguments
+            args = [
                 '-i', temp_video,  # Video input
+                '-ss', f'{start_time:.6f}',  # Audio offset (range exports)
                 '-i', self.project.audio_path,  # Audio input
-                '-c:v', 'libx264',  # Video codec
-                '-preset', 'medium',  # Encoding preset
-                '-crf', str(self.project.crf),  # Quality
-                '-c:a', 'aac',  # Audio codec
-                '-b:a', '320k',  # Audio bitrate
+                '-map', '0:v:0',  # Rendered video (not e.g. MP3 cover art)
+                '-map', '1:a:0',  # Song audio
+                '-c:v', 'copy',  # Video is already encoded while rendering
+                *audio_args,
                 '-shortest',  # End at shortest stream
-                self.output_path
+                output_path
             ]
             
-            # Run FFmpeg
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
-            
-            # Wait for completion
-            stdout, stderr = process.communicate()
+            # Run FFmpeg, parsing its progress stream as it arrives
+            self._ffmpeg = FFmpegProcess(args, on_progress)
+            if self.is_cancelled:
+                self._ffmpeg.terminate()
+            returncode = self._ffmpeg.wait()
             
-            # Update progress
-            self.progress.emit(100)
+            if self._ffmpeg.terminated:
+                # Cancelled - don't leave a truncated file behind
+                self.cleanup_temp_files(output_path)
+                return False
             
-            if process.returncode != 0:
-                self.error.emit(f"FFmpeg error: {stderr}")
+            if returncode != 0:
+                self.error.emit(f"FFmpeg error: {self._ffmpeg.error_output}")
                 return False
             
+            self.progress.emit(100)
             return True
-            
+        
         except FileNotFoundError:
             self.error.emit("FFmpeg not found. Please install FFmpeg.")
             return False
         except Exception as e:
             self.error.emit(f"Audio/Video combination failed: {str(e)}")
             return False
+        finally:
+            self._ffmpeg = None
+    
+    def audio_args(self, start_time: float, output_path: str) -> List[str]:
+        """
+        Audio arguments of the mux, recorded in the report
+        
+        Stream copy cuts on packet boundaries (about 23 ms for AAC), so
+        range exports that start inside the song are always re-encoded
+        to keep audio and video in sync.
+        """
+        source_codec = probe_audio_codec(self.project.audio_path)
+        copy = self.audio_copy and start_time == 0
+        args = audio_output_args(source_codec, output_path, copy,
+                                 self.audio_codec, self.audio_bitrate)
+        
+        copied = args == ['-c:a', 'copy']
+        self.report['audio'] = {
+            'source_codec': source_codec,
+            'copied': copied,
+            'codec': source_codec if copied else self.audio_codec,
+        }
+        return args
     
     def cleanup_temp_files(self, temp_video: str):
         """Clean up temporary files"""
@@ -230,5 +975,9 @@ class VideoExporter(QThread):
             pass
     
     def cancel(self):
-        """Cancel export"""
+        """Cancel export, stopping a running FFmpeg process"""
         self.is_cancelled = True
+        
+        ffmpeg = self._ffmpeg
+        if ffmpeg is not None:
+            ffmpeg.terminate()
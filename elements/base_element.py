@@ -4,9 +4,10 @@ Base draggable and resizable element
 from enum import Enum
 from PyQt6.QtWidgets import QGraphicsItem, QGraphicsRectItem
 from PyQt6.QtCore import Qt, QRectF, QPointF
-from PyQt6.QtGui import QPen, QBrush, QColor, QPainter
-from typing import Optional
+from PyQt6.QtGui import QPen, QBrush, QColor, QPainter, QFont
+from typing import Hashable, Optional
 
+from core.render_resources import ResourceCache, element_font
 from models.project_state import ElementState
 from utils.config import RESIZE_HANDLE_SIZE, MIN_ELEMENT_SIZE
 
@@ -35,6 +36,10 @@ class DraggableElement(QGraphicsItem):
     - Visual selection indicator
     """
     
+    # Whether paint() depends on the time position (set_render_time);
+    # render graphs never step static elements
+    time_dependent = False
+    
     def __init__(self, state: ElementState):
         super().__init__()
         self.state = state
@@ -54,6 +59,12 @@ class DraggableElement(QGraphicsItem):
         self.handle_brush = QBrush(QColor(255, 255, 255))
         self.handle_pen = QPen(QColor(0, 0, 0), 1)
         
+        # Render quality (turned off for draft exports)
+        self.antialiasing = True
+        
+        # Fonts and colours; replaced by the render graph's shared cache
+        self.resources = ResourceCache()
+    
     def boundingRect(self) -> QRectF:
         """Define the bounding rectangle"""
         return QRectF(0, 0, self.state.width, self.state.height)
@@ -72,6 +83,35 @@ class DraggableElement(QGraphicsItem):
             # Draw resize handles
             self._draw_resize_handles(painter)
     
+    def set_render_time(self, time_pos: float, duration: float, frame_interval: float):
+        """
+        Update time-dependent state before painting a frame
+        
+        Override in elements that change over time.
+        """
+        pass
+    
+    def quantize(self, scale: float = 1.0):
+        """
+        Round time-dependent state to output precision after
+        set_render_time, so frame_key() describes exactly what is painted
+        
+        scale is the number of output pixels per layout unit.
+        """
+        pass
+    
+    def frame_key(self, scale: float = 1.0) -> Optional[Hashable]:
+        """
+        Values that fully determine what paint() draws
+        
+        Two frames with equal keys for every element are identical, so
+        the exporter can reuse the previous frame. scale is the number of
+        output pixels per layout unit, for quantizing to display
+        precision (state itself is rounded by quantize(); this only
+        reads it). Returns None if unknown (always repaint).
+        """
+        return None
+    
     def _draw_resize_handles(self, painter: QPainter):
         """Draw 8 resize handles"""
         painter.setBrush(self.handle_brush)
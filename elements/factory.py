@@ -0,0 +1,52 @@
+"""
+Build element instances from saved project state
+"""
+from typing import List, Optional
+
+from elements.base_element import DraggableElement
+from elements.visualizer_element import VisualizerElement
+from elements.text_element import TextElement
+from elements.progress_element import ProgressBarElement
+from elements.lyrics_element import LyricsElement
+from models.project_state import ProjectState, ElementState
+from models.audio_processor import AudioProcessor
+from models.lyrics_parser import LyricsParser
+from utils.config import ElementType
+
+
+def create_element(state: ElementState, project: ProjectState,
+                   audio_processor: AudioProcessor,
+                   lyrics_parser: Optional[LyricsParser] = None) -> Optional[DraggableElement]:
+    """
+    Create the element matching a saved element state
+    
+    Returns:
+        The element, or None if the type can't be built (e.g. lyrics
+        without a loaded lyrics file)
+    """
+    if state.element_type == ElementType.VISUALIZER:
+        return VisualizerElement(state, project.visualizer_settings, audio_processor,
+                                 seed=project.seed)
+    elif state.element_type == ElementType.TEXT:
+        return TextElement(state, project.text_settings)
+    elif state.element_type == ElementType.PROGRESS_BAR:
+        return ProgressBarElement(state, state.properties.get('style', 'solid'))
+    elif state.element_type == ElementType.LYRICS and lyrics_parser is not None:
+        element = LyricsElement(state, lyrics_parser)
+        element.set_display_mode(state.properties.get('mode', 'single'))
+        return element
+    
+    return None
+
+
+def build_elements(project: ProjectState, audio_processor: AudioProcessor,
+                   lyrics_parser: Optional[LyricsParser] = None) -> List[DraggableElement]:
+    """Create all elements of a project in z-order"""
+    elements = []
+    
+    for state in project.elements:
+        element = create_element(state, project, audio_processor, lyrics_parser)
+        if element is not None:
+            elements.append(element)
+    
+    return elements
@@ -1,7 +1,8 @@
 """
 Lyrics element with LRC synchronization
 """
-from PyQt6.QtGui import QPainter, QFont, QColor, QPen, QFontMetrics
+from typing import Hashable, Optional
+from PyQt6.QtGui import QPainter, QColor, QPen, QFontMetrics
 from PyQt6.QtCore import Qt, QRectF
 
 from elements.base_element import DraggableElement
@@ -14,6 +15,8 @@ class LyricsElement(DraggableElement):
     Synchronized lyrics display element
     """
     
+    time_dependent = True
+    
     def __init__(self, state: ElementState, lyrics_parser: LyricsParser):
         super().__init__(state)
         self.lyrics_parser = lyrics_parser
@@ -39,8 +42,8 @@ class LyricsElement(DraggableElement):
     
     def paint(self, painter: QPainter, option, widget):
         """Render the lyrics"""
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, self.antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing, self.antialiasing)
         
         if self.mode == "single":
             self._draw_single_line(painter)
@@ -60,8 +63,7 @@ class LyricsElement(DraggableElement):
             return
         
         # Setup font
-        font = QFont(self.font_family, self.font_size)
-        font.setBold(self.bold)
+        font = self.resources.font(self.font_family, self.font_size, self.bold)
         painter.setFont(font)
         
         # Setup color
@@ -81,8 +83,7 @@ class LyricsElement(DraggableElement):
             return
         
         # Setup font
-        font = QFont(self.font_family, self.font_size)
-        font.setBold(self.bold)
+        font = self.resources.font(self.font_family, self.font_size, self.bold)
         painter.setFont(font)
         
         # Calculate progress within current line
@@ -108,8 +109,7 @@ class LyricsElement(DraggableElement):
             return
         
         # Setup font
-        font = QFont(self.font_family, self.font_size)
-        font.setBold(self.bold)
+        font = self.resources.font(self.font_family, self.font_size, self.bold)
         painter.setFont(font)
         
         # Calculate line spacing
@@ -136,6 +136,22 @@ class LyricsElement(DraggableElement):
             rect = QRectF(0, y, self.state.width, line_height)
             painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
     
+    def set_render_time(self, time_pos: float, duration: float, frame_interval: float):
+        """Follow the export position"""
+        self.update_time(time_pos)
+    
+    def frame_key(self, scale: float = 1.0) -> Optional[Hashable]:
+        """Lyric line(s) currently shown"""
+        if self.mode == "window":
+            lines = self.lyrics_parser.get_lyric_window(
+                self.current_time,
+                self.window_lines_before,
+                self.window_lines_after
+            )
+            return (self.mode, tuple(lines))
+        
+        return (self.mode, self.lyrics_parser.get_current_lyric(self.current_time))
+    
     def update_time(self, time_pos: float):
         """Update current time position"""
         self.current_time = time_pos
@@ -1,6 +1,7 @@
 """
 Progress bar element showing playback position
 """
+from typing import Hashable, Optional
 from PyQt6.QtGui import QPainter, QColor, QPen, QBrush
 from PyQt6.QtCore import Qt, QRectF
 
@@ -13,6 +14,8 @@ class ProgressBarElement(DraggableElement):
     Progress bar showing current playback position
     """
     
+    time_dependent = True
+    
     def __init__(self, state: ElementState, style: str = "solid"):
         super().__init__(state)
         self.style = style
@@ -25,7 +28,7 @@ class ProgressBarElement(DraggableElement):
     
     def paint(self, painter: QPainter, option, widget):
         """Render the progress bar"""
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, self.antialiasing)
         
         width = self.state.width
         height = self.state.height
@@ -116,6 +119,14 @@ class ProgressBarElement(DraggableElement):
             
             x += dash_length + gap_length
     
+    def set_render_time(self, time_pos: float, duration: float, frame_interval: float):
+        """Follow the export position"""
+        self.update_progress(time_pos, duration)
+    
+    def frame_key(self, scale: float = 1.0) -> Optional[Hashable]:
+        """Fill position in output pixels"""
+        return (self.style, int(self.progress * self.state.width * scale))
+    
     def update_progress(self, current_time: float, total_time: float):
         """Update progress based on time"""
         if total_time > 0:
@@ -1,10 +1,11 @@
 """
 Text element for titles and labels
 """
-from PyQt6.QtGui import QPainter, QFont, QColor, QPen
+from typing import Hashable, Optional
+from PyQt6.QtGui import QPainter, QColor, QPen
 from PyQt6.QtCore import Qt, QRectF
 
-from elements.base_element import DraggableElement
+from elements.base_element import DraggableElement, element_font
 from models.project_state import ElementState, TextSettings
 
 
@@ -16,15 +17,15 @@ class TextElement(DraggableElement):
     def __init__(self, state: ElementState, settings: TextSettings):
         super().__init__(state)
         self.settings = settings
-        
+    
     def paint(self, painter: QPainter, option, widget):
         """Render the text"""
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, self.antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing, self.antialiasing)
         
         # Setup font
-        font = QFont(self.settings.font_family, self.settings.font_size)
-        font.setBold(self.settings.bold)
+        font = self.resources.font(self.settings.font_family, self.settings.font_size,
+                                   self.settings.bold)
         painter.setFont(font)
         
         # Setup color
@@ -39,13 +40,17 @@ class TextElement(DraggableElement):
         # Draw selection border and handles if selected
         super().paint(painter, option, widget)
     
+    def frame_key(self, scale: float = 1.0) -> Optional[Hashable]:
+        """Static text never changes during an export"""
+        return ()
+    
     def update_size_from_text(self):
         """Auto-adjust element size based on text content"""
         # Create a temporary painter to measure text
         from PyQt6.QtGui import QFontMetrics
         
-        font = QFont(self.settings.font_family, self.settings.font_size)
-        font.setBold(self.settings.bold)
+        font = element_font(self.settings.font_family, self.settings.font_size,
+                            self.settings.bold)
         metrics = QFontMetrics(font)
         
         # Calculate required size
@@ -1,6 +1,9 @@
 """
 Audio processing and FFT analysis
 """
+import copy
+import math
+from collections import OrderedDict
 import numpy as np
 import librosa
 import soundfile as sf
@@ -8,6 +11,14 @@ from typing import Optional, Tuple
 import pygame
 
 
+# Smoothing history is cut off once older frames weigh less than this
+SMOOTHING_CUTOFF = 1e-3
+MAX_SMOOTHING_FRAMES = 90
+
+# Spectra kept by the least-recently-used cache (a few pre-roll windows)
+SPECTRUM_CACHE_SIZE = 1024
+
+
 class AudioProcessor:
     """
     Handles audio loading, FFT analysis, and playback
@@ -24,16 +35,16 @@ class AudioProcessor:
         self.is_playing = False
         self.playback_start_time = 0.0
         
-        # Cache for spectrum data
-        self._spectrum_cache = {}
-        
+        # Cache for spectrum data (least recently used are dropped)
+        self._spectrum_cache: OrderedDict = OrderedDict()
+    
     def load_audio(self, filepath: str) -> bool:
         """
         Load audio file and prepare for processing
         
         Args:
             filepath: Path to audio file (MP3, WAV, etc)
-            
+        
         Returns:
             True if successful, False otherwise
         """
@@ -50,7 +61,7 @@ class AudioProcessor:
             self._spectrum_cache.clear()
             
             return True
-            
+        
         except Exception as e:
             print(f"Error loading audio: {e}")
             return False
@@ -62,20 +73,24 @@ class AudioProcessor:
         Args:
             time_pos: Time position in seconds
             num_bands: Number of frequency bands to return
-            
+        
         Returns:
             Array of normalized levels (0-1) for each frequency band
         """
         if self.audio is None:
             return np.zeros(num_bands)
         
-        # Check cache
-        cache_key = (int(time_pos * 100), num_bands)
-        if cache_key in self._spectrum_cache:
-            return self._spectrum_cache[cache_key]
-        
         # Get audio window
-        sample_idx = int(time_pos * self.sample_rate)
+        sample_idx = int(round(time_pos * self.sample_rate))
+        
+        # Cache by sample position, so the result never depends on
+        # which nearby time was requested first
+        cache_key = (sample_idx, num_bands)
+        cached = self._spectrum_cache.get(cache_key)
+        if cached is not None:
+            self._spectrum_cache.move_to_end(cache_key)
+            return cached
+        
         window_size = 2048
         
         # Extract window with bounds checking
@@ -114,9 +129,52 @@ class AudioProcessor:
         
         # Cache result
         self._spectrum_cache[cache_key] = bands
+        if len(self._spectrum_cache) > SPECTRUM_CACHE_SIZE:
+            self._spectrum_cache.popitem(last=False)
         
         return bands
     
+    def get_smoothed_spectrum(self, time_pos: float, num_bands: int,
+                              smoothness: float, frame_interval: float) -> np.ndarray:
+        """
+        Get the smoothed spectrum at a time position
+        
+        Equivalent to blending each frame's spectrum into the previous
+        result (weight `smoothness` on the new frame), but computed from a
+        fixed pre-roll window of earlier frames. The result depends only
+        on the arguments, so frames rendered out of order, in chunks or
+        after a resume are identical to a sequential render.
+        
+        Args:
+            time_pos: Time position in seconds
+            num_bands: Number of frequency bands to return
+            smoothness: Weight of the newest frame (0-1]
+            frame_interval: Seconds between frames (1 / fps)
+        
+        Returns:
+            Array of normalized levels (0-1) for each frequency band
+        """
+        if smoothness >= 1.0:
+            return self.get_spectrum(time_pos, num_bands)
+        if smoothness <= 0.0:
+            return np.zeros(num_bands)
+        
+        decay = 1.0 - smoothness
+        window = math.ceil(math.log(SMOOTHING_CUTOFF) / math.log(decay))
+        window = max(1, min(window, MAX_SMOOTHING_FRAMES))
+        
+        result = np.zeros(num_bands)
+        weight = smoothness
+        for k in range(window):
+            t = time_pos - k * frame_interval
+            # Before the start the history is silent, like a fresh render
+            if t < 0:
+                break
+            result += self.get_spectrum(t, num_bands) * weight
+            weight *= decay
+        
+        return result
+    
     def play(self, start_time: float = 0.0):
         """Start audio playback from specified time"""
         if self.filepath is None:
@@ -141,6 +199,19 @@ class AudioProcessor:
         pygame.mixer.music.stop()
         self.is_playing = False
     
+    def snapshot(self) -> 'AudioProcessor':
+        """
+        Copy for analysis on another thread (e.g. an export)
+        
+        The samples are shared - they are replaced, never modified, when
+        new audio is loaded. The copy has its own spectrum cache and is
+        not used for playback.
+        """
+        clone = copy.copy(self)
+        clone._spectrum_cache = OrderedDict()
+        clone.is_playing = False
+        return clone
+    
     def get_playback_position(self) -> float:
         """Get current playback position in seconds"""
         if not self.is_playing:
@@ -96,13 +96,21 @@ class ProjectState:
     fps: int = 30
     crf: int = 18
     
+    # Seed for procedural randomness, so re-renders are identical
+    seed: int = 0
+    
+    # Colour grade of exported frames: a look ('warm', 'cool',
+    # 'vintage'), a .cube LUT file, or None
+    grade: Optional[str] = None
+    grade_intensity: float = 0.3
+    
     # Global settings
     visualizer_settings: VisualizerSettings = field(default_factory=VisualizerSettings)
     text_settings: TextSettings = field(default_factory=TextSettings)
     
-    def save_to_file(self, filepath: str):
-        """Save project to JSON file"""
-        data = {
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for JSON serialization"""
+        return {
             'audio_path': self.audio_path,
             'background_path': self.background_path,
             'logo_path': self.logo_path,
@@ -111,9 +119,16 @@ class ProjectState:
             'resolution': list(self.resolution),
             'fps': self.fps,
             'crf': self.crf,
+            'seed': self.seed,
+            'grade': self.grade,
+            'grade_intensity': self.grade_intensity,
             'visualizer_settings': self.visualizer_settings.to_dict(),
             'text_settings': self.text_settings.to_dict(),
         }
+    
+    def save_to_file(self, filepath: str):
+        """Save project to JSON file"""
+        data = self.to_dict()
         
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
@@ -124,6 +139,11 @@ class ProjectState:
         with open(filepath, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
+        return cls.from_dict(data)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ProjectState':
+        """Create from dictionary (fresh copies of all nested state)"""
         project = cls(
             audio_path=data.get('audio_path'),
             background_path=data.get('background_path'),
@@ -132,6 +152,9 @@ class ProjectState:
             resolution=tuple(data.get('resolution', [1920, 1080])),
             fps=data.get('fps', 30),
             crf=data.get('crf', 18),
+            seed=data.get('seed', 0),
+            grade=data.get('grade'),
+            grade_intensity=data.get('grade_intensity', 0.3),
         )
         
         # Load elements
@@ -70,6 +70,43 @@ DEFAULT_CRF = 18
 VIDEO_CODEC = "libx264"
 AUDIO_CODEC = "aac"
 AUDIO_BITRATE = "320k"
+AUDIO_STREAM_COPY = True  # Mux compatible source audio as is instead of re-encoding
+
+# Draft (proxy) exports for quick previews
+DRAFT_SCALE = 0.5
+DRAFT_FPS = 15
+DRAFT_CRF = 28
+DRAFT_PRESET = "ultrafast"
+
+# Extra outputs encoded from the same render pass: (width, height, fit)
+RENDITION_PRESETS = {
+    "1080p": (1920, 1080, "crop"),
+    "720p": (1280, 720, "crop"),
+    "vertical": (1080, 1920, "crop"),
+    "square": (1080, 1080, "crop"),
+}
+
+# Image sequence exports (PNG/TIFF)
+IMAGE_SEQUENCE_COMPRESSION = 3  # PNG zlib level 0-9; TIFF: 0 = none, else LZW
+IMAGE_SEQUENCE_WORKERS = 0  # Writer threads, 0 = one per CPU core
+
+# Parallel rendering: frames painted by worker processes into shared
+# memory and encoded by the export thread
+RENDER_WORKERS = 0  # Worker processes, 0 = paint on the export thread
+
+# Short looping clips (GIF/WebP teasers)
+LOOP_WIDTH = 480  # Maximum width in pixels
+LOOP_FPS = 15
+LOOP_MAX_SECONDS = 15.0  # Length when no range is set
+LOOP_MAX_BUFFER_MB = 1024  # Frames are held in memory until encoded
+LOOP_DITHER = "sierra2_4a"
+LOOP_WEBP_QUALITY = 75
+
+# Live streaming (real-time output to UDP/SRT/RTMP or a file)
+LIVE_PRESET = "veryfast"
+LIVE_VIDEO_BITRATE = 6000  # kbit/s
+LIVE_KEYFRAME_SECONDS = 2.0
+LIVE_MAX_LAG_FRAMES = 3  # Lag absorbed before frames are dropped
 
 # Grid Settings
 GRID_SIZES = [5, 10, 25, 50]
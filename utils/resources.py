@@ -0,0 +1,61 @@
+"""
+Process resource usage helpers
+"""
+import sys
+from typing import Optional
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Get peak resident set size of the current process in MB
+    
+    Returns:
+        Peak RSS in megabytes, or None if unavailable on this platform
+    """
+    if sys.platform == "win32":
+        return _peak_rss_windows()
+    
+    try:
+        import resource
+    except ImportError:
+        return None
+    
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _peak_rss_windows() -> Optional[float]:
+    """Peak working set size via the Win32 process status API"""
+    try:
+        import ctypes
+        from ctypes import wintypes
+        
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+        
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        ok = ctypes.windll.psapi.GetProcessMemoryInfo(
+            handle, ctypes.byref(counters), counters.cb
+        )
+        if not ok:
+            return None
+        return counters.PeakWorkingSetSize / (1024 * 1024)
+    except Exception:
+        return None
@@ -3,11 +3,13 @@ Export dialog with progress tracking
 """
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                               QProgressBar, QPushButton, QGroupBox, QComboBox,
-                              QSpinBox, QTextEdit)
+                              QSpinBox, QTextEdit, QCheckBox, QDoubleSpinBox)
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont
 
 from models.project_state import ProjectState
+from core.telemetry import format_telemetry
+from utils.config import RENDITION_PRESETS
 
 
 class ExportDialog(QDialog):
@@ -16,6 +18,7 @@ class ExportDialog(QDialog):
     """
     
     export_requested = pyqtSignal(dict)  # Export settings
+    cancel_requested = pyqtSignal()
     
     def __init__(self, project: ProjectState, parent=None):
         super().__init__(parent)
@@ -23,7 +26,6 @@ class ExportDialog(QDialog):
         self.is_exporting = False
         
         self.setWindowTitle("Export Video")
-        self.setModal(True)
         self.resize(500, 400)
         
         self.setup_ui()
@@ -98,6 +100,77 @@ class ExportDialog(QDialog):
         preset_row.addStretch()
         settings_layout.addLayout(preset_row)
         
+        # Export range (in/out points)
+        range_row = QHBoxLayout()
+        self.range_check = QCheckBox("Range:")
+        self.range_check.setToolTip("Export only part of the song")
+        range_row.addWidget(self.range_check)
+        
+        self.start_spin = QDoubleSpinBox()
+        self.start_spin.setRange(0, 24 * 3600)
+        self.start_spin.setDecimals(1)
+        self.start_spin.setSuffix(" s")
+        range_row.addWidget(self.start_spin)
+        
+        range_row.addWidget(QLabel("to"))
+        self.end_spin = QDoubleSpinBox()
+        self.end_spin.setRange(0, 24 * 3600)
+        self.end_spin.setDecimals(1)
+        self.end_spin.setValue(10)
+        self.end_spin.setSuffix(" s")
+        range_row.addWidget(self.end_spin)
+        range_row.addStretch()
+        
+        self.range_check.toggled.connect(self.start_spin.setEnabled)
+        self.range_check.toggled.connect(self.end_spin.setEnabled)
+        self.start_spin.setEnabled(False)
+        self.end_spin.setEnabled(False)
+        settings_layout.addLayout(range_row)
+        
+        # Draft mode
+        self.draft_check = QCheckBox("Draft preview (half size, 15 fps, fast encoding)")
+        self.draft_check.setToolTip("Quick low-quality export for reviewing timing and layout")
+        settings_layout.addWidget(self.draft_check)
+        
+        # Supersampling
+        self.supersample_check = QCheckBox("High-quality master (2x supersampling, slower)")
+        self.supersample_check.setToolTip("Paint at twice the resolution and downscale for smoother edges")
+        settings_layout.addWidget(self.supersample_check)
+        
+        # Output type
+        output_row = QHBoxLayout()
+        output_row.addWidget(QLabel("Output:"))
+        self.output_combo = QComboBox()
+        # Item data: (overlay format, image sequence format, loop format)
+        self.output_combo.addItem("MP4 video", (None, None, None))
+        self.output_combo.addItem("Image sequence - PNG", (None, "png", None))
+        self.output_combo.addItem("Image sequence - TIFF", (None, "tiff", None))
+        self.output_combo.addItem("Transparent overlay - ProRes 4444 (.mov)", ("prores", None, None))
+        self.output_combo.addItem("Transparent overlay - WebM VP9 (.webm)", ("webm", None, None))
+        self.output_combo.addItem("Transparent overlay - PNG sequence", ("png", None, None))
+        self.output_combo.addItem("Looping GIF (range, 480 px)", (None, None, "gif"))
+        self.output_combo.addItem("Looping WebP (range, 480 px)", (None, None, "webp"))
+        self.output_combo.setToolTip("Overlays leave out the background and audio, "
+                                     "for compositing in a video editor. Loops cover "
+                                     "the range (or the first 15 s) without audio")
+        output_row.addWidget(self.output_combo)
+        output_row.addStretch()
+        settings_layout.addLayout(output_row)
+        
+        # Renditions encoded from the same render pass
+        renditions_row = QHBoxLayout()
+        renditions_row.addWidget(QLabel("Also export:"))
+        self.rendition_checks = {}
+        for name, (width, height, _) in RENDITION_PRESETS.items():
+            check = QCheckBox(name)
+            check.setToolTip(f"{width}x{height}, saved next to the main video as "
+                             f"<name>_{name}.mp4 (frames are rendered only once)")
+            self.rendition_checks[name] = check
+            renditions_row.addWidget(check)
+        renditions_row.addStretch()
+        settings_layout.addLayout(renditions_row)
+        self.output_combo.currentIndexChanged.connect(self.update_rendition_checks)
+        
         settings_group.setLayout(settings_layout)
         layout.addWidget(settings_group)
         
@@ -158,6 +231,14 @@ class ExportDialog(QDialog):
             text = "(Lower Quality)"
         self.quality_label.setText(text)
     
+    def update_rendition_checks(self):
+        """Renditions are only available for MP4 video"""
+        enabled = self.output_combo.currentData() == (None, None, None)
+        for check in self.rendition_checks.values():
+            check.setEnabled(enabled)
+            if not enabled:
+                check.setChecked(False)
+    
     def start_export(self):
         """Start export process"""
         if self.is_exporting:
@@ -181,9 +262,22 @@ class ExportDialog(QDialog):
             'resolution': resolution,
             'fps': self.fps_spin.value(),
             'crf': self.quality_spin.value(),
-            'preset': self.preset_combo.currentText()
+            'preset': self.preset_combo.currentText(),
+            'start_time': 0.0,
+            'end_time': None,
+            'draft': self.draft_check.isChecked(),
+            'supersample': 2 if self.supersample_check.isChecked() else 1,
+            'renditions': [name for name, check in self.rendition_checks.items()
+                           if check.isChecked()],
+            'overlay': self.output_combo.currentData()[0],
+            'image_sequence': self.output_combo.currentData()[1],
+            'loop': self.output_combo.currentData()[2]
         }
         
+        if self.range_check.isChecked():
+            settings['start_time'] = self.start_spin.value()
+            settings['end_time'] = self.end_spin.value()
+        
         # Show progress
         self.progress_group.setVisible(True)
         self.export_button.setEnabled(False)
@@ -201,6 +295,10 @@ class ExportDialog(QDialog):
         self.status_label.setText(status)
         self.add_log(status)
     
+    def update_telemetry(self, sample: dict):
+        """Log throughput, ETA and the slowest render stages"""
+        self.add_log(format_telemetry(sample))
+    
     def add_log(self, message: str):
         """Add message to log"""
         self.log_text.append(message)
@@ -215,6 +313,13 @@ class ExportDialog(QDialog):
         self.export_button.clicked.disconnect()
         self.export_button.clicked.connect(self.accept)
     
+    def reject(self):
+        """Close the dialog, cancelling a running export first"""
+        if self.is_exporting:
+            self.is_exporting = False
+            self.cancel_requested.emit()
+        super().reject()
+    
     def export_error(self, error: str):
         """Handle export error"""
         self.is_exporting = False
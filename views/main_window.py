@@ -33,6 +33,10 @@ class MainWindow(QMainWindow):
         # Track current project file
         self.current_project_path = None
         
+        # Running export (renders a snapshot, editing continues meanwhile)
+        self.video_exporter = None
+        self.export_dialog = None
+        
         # Setup UI
         self.setup_ui()
         self.create_menu_bar()
@@ -248,7 +252,8 @@ class MainWindow(QMainWindow):
         element = VisualizerElement(
             state,
             self.project.visualizer_settings,
-            self.audio_processor
+            self.audio_processor,
+            seed=self.project.seed
         )
         
         # Add to project and preview
@@ -284,6 +289,7 @@ class MainWindow(QMainWindow):
             if isinstance(element, VisualizerElement):
                 element.settings = self.project.visualizer_settings
                 element.update()
+        self.preview_widget.graph.invalidate()
     
     def update_text_elements(self):
         """Update all text elements with new settings"""
@@ -292,6 +298,7 @@ class MainWindow(QMainWindow):
                 element.settings = self.project.text_settings
                 element.update_size_from_text()
                 element.update()
+        self.preview_widget.graph.invalidate()
     
     def clear_all_elements(self):
         """Clear all elements from canvas"""
@@ -380,26 +387,23 @@ class MainWindow(QMainWindow):
     
     def rebuild_elements(self):
         """Rebuild all elements from project state"""
+        from elements.factory import build_elements
+        
         self.preview_widget.clear_elements()
         
-        for state in self.project.elements:
-            if state.element_type == ElementType.VISUALIZER:
-                element = VisualizerElement(
-                    state,
-                    self.project.visualizer_settings,
-                    self.audio_processor
-                )
-                self.preview_widget.add_element(element)
-            elif state.element_type == ElementType.TEXT:
-                element = TextElement(state, self.project.text_settings)
-                self.preview_widget.add_element(element)
+        for element in build_elements(self.project, self.audio_processor):
+            self.preview_widget.add_element(element)
     
     def export_video(self):
         """Export video"""
-        if not self.audio_processor.audio:
+        if self.audio_processor.audio is None:
             QMessageBox.warning(self, "Error", "Please load an audio file first")
             return
         
+        if self.video_exporter is not None and self.video_exporter.isRunning():
+            QMessageBox.information(self, "Export", "An export is already running")
+            return
+        
         if len(self.preview_widget.elements) == 0:
             reply = QMessageBox.question(
                 self,
@@ -426,10 +430,14 @@ class MainWindow(QMainWindow):
         
         # Show export dialog
         from views.export_dialog import ExportDialog
-        from core.video_exporter import VideoExporter
-        import cv2
+        from core.video_exporter import VideoExporter, load_background_image
+        from core.renditions import preset_rendition
+        from core.scene_snapshot import SceneSnapshot
         
+        # Not modal - the project can be edited and previewed while the
+        # export renders its own snapshot
         dialog = ExportDialog(self.project, self)
+        self.export_dialog = dialog
         
         # Connect export
         def on_export_requested(settings):
@@ -439,36 +447,40 @@ class MainWindow(QMainWindow):
             self.project.crf = settings['crf']
             
             # Get background image if exists
-            background = None
-            if self.project.background_path:
-                bg_img = cv2.imread(self.project.background_path)
-                if bg_img is not None:
-                    background = cv2.resize(
-                        bg_img, 
-                        self.project.resolution,
-                        interpolation=cv2.INTER_LANCZOS4
-                    )
+            background = load_background_image(
+                self.project.background_path,
+                self.project.resolution
+            )
             
-            # Create exporter
+            # Create exporter on a snapshot - later edits don't affect it
             self.video_exporter = VideoExporter(
-                self.project,
-                self.audio_processor,
-                self.preview_widget.elements,
+                SceneSnapshot.capture(self.project, self.audio_processor),
                 filepath,
-                background
+                background,
+                preset=settings['preset'],
+                start_time=settings['start_time'],
+                end_time=settings['end_time'],
+                draft=settings['draft'],
+                supersample=settings['supersample'],
+                renditions=[preset_rendition(name) for name in settings['renditions']],
+                overlay=settings['overlay'],
+                image_sequence=settings['image_sequence'],
+                loop=settings['loop']
             )
             
             # Connect signals
             self.video_exporter.progress.connect(dialog.update_progress)
             self.video_exporter.status.connect(dialog.update_status)
+            self.video_exporter.telemetry.connect(dialog.update_telemetry)
             self.video_exporter.finished.connect(dialog.export_finished)
             self.video_exporter.error.connect(dialog.export_error)
+            dialog.cancel_requested.connect(self.video_exporter.cancel)
             
             # Start export
             self.video_exporter.start()
         
         dialog.export_requested.connect(on_export_requested)
-        dialog.exec()
+        dialog.show()
     
     def undo(self):
         """Undo last action"""
@@ -7,6 +7,8 @@ from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QRectF
 from PyQt6.QtGui import QPainter, QPixmap, QBrush, QColor
 from typing import Optional, List
 
+from core.render_graph import RenderGraph
+from core.render_resources import ResourceCache
 from models.audio_processor import AudioProcessor
 from models.project_state import ProjectState
 from elements.base_element import DraggableElement
@@ -25,15 +27,13 @@ class PreviewScene(QGraphicsScene):
         
         # Background image
         self.background_pixmap: Optional[QPixmap] = None
+        self.resources = ResourceCache()
     
     def set_background(self, image_path: Optional[str]):
         """Set background image"""
         if image_path:
-            self.background_pixmap = QPixmap(image_path).scaled(
-                int(self.width()), 
-                int(self.height()),
-                Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-                Qt.TransformationMode.SmoothTransformation
+            self.background_pixmap = self.resources.pixmap(
+                image_path, int(self.width()), int(self.height())
             )
         else:
             self.background_pixmap = None
@@ -63,8 +63,9 @@ class PreviewWidget(QWidget):
         self.is_playing = False
         self.current_time = 0.0
         
-        # Elements
+        # Elements, and the render graph stepping them (shared with export)
         self.elements: List[DraggableElement] = []
+        self.graph = RenderGraph()
         
         # Setup UI
         self.setup_ui()
@@ -84,6 +85,7 @@ class PreviewWidget(QWidget):
             self.project.resolution[0],
             self.project.resolution[1]
         )
+        self.scene.resources = self.graph.resources
         
         self.view = QGraphicsView(self.scene)
         self.view.setRenderHint(QPainter.RenderHint.Antialiasing)
@@ -133,6 +135,7 @@ class PreviewWidget(QWidget):
     def add_element(self, element: DraggableElement):
         """Add element to preview"""
         self.elements.append(element)
+        self.graph.add(element)
         self.scene.addItem(element)
         element.setPos(element.state.x, element.state.y)
         element.setZValue(element.state.z_index)
@@ -142,6 +145,7 @@ class PreviewWidget(QWidget):
         for element in self.elements:
             self.scene.removeItem(element)
         self.elements.clear()
+        self.graph.clear()
     
     def set_background(self, image_path: Optional[str]):
         """Set background image"""
@@ -219,13 +223,16 @@ class PreviewWidget(QWidget):
         self.time_changed.emit(self.current_time)
     
     def update_elements(self):
-        """Update all elements for current time"""
-        from elements.visualizer_element import VisualizerElement
+        """Step the render graph to the current time and repaint what changed"""
+        # Snap the playback clock to the preview frame grid, so the
+        # smoothing pre-roll of each frame reuses the previous frames'
+        # cached spectra
+        frame_interval = 1.0 / PREVIEW_FPS
+        time_pos = round(self.current_time / frame_interval) * frame_interval
+        self.graph.update(time_pos, self.audio_processor.duration, frame_interval)
         
-        for element in self.elements:
-            if isinstance(element, VisualizerElement):
-                element.update_spectrum(self.current_time)
-                element.update()
+        for node in self.graph.changed_nodes():
+            node.element.update()
     
     def update_timeline(self):
         """Update timeline slider and label"""
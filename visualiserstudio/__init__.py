@@ -0,0 +1,5 @@
+"""
+VisualiserStudio command-line interface
+
+Run with ``python -m visualiserstudio <command>`` from the project root.
+"""
@@ -0,0 +1,391 @@
+"""
+Headless command-line tools
+
+Commands:
+    render      Export a saved project to video without opening the GUI
+    batch       Render many videos from a template project (job manifest)
+    distribute  Split a project into chunks rendered by worker processes
+    worker      Render chunks from a shared work directory
+    stream      Stream a playlist live to UDP/SRT/RTMP in real time
+
+Progress is written to stdout as JSON lines, one event per line:
+    {"event": "status", "message": "Rendering frames..."}
+    {"event": "progress", "value": 42}
+    {"event": "telemetry", "fps": 61.2, "eta": 83.0, "stages": {...}, ...}
+    {"event": "finished", "output": "out.mp4", "report": {...}}
+    {"event": "error", "message": "..."}
+"""
+import argparse
+import os
+from typing import List, Optional, Tuple
+
+from core.headless import (setup_headless_environment, ensure_application,
+                           load_project, prepare_render, JsonLineReporter)
+from utils.config import LIVE_MAX_LAG_FRAMES, LIVE_PRESET, LIVE_VIDEO_BITRATE
+
+
+def parse_resolution(text: str) -> Tuple[int, int]:
+    """Parse 'WIDTHxHEIGHT'"""
+    try:
+        width, height = text.lower().split("x")
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid resolution '{text}', expected WIDTHxHEIGHT")
+
+
+def parse_timecode(text: str) -> float:
+    """Parse seconds ('83.5') or minutes:seconds ('1:23.5')"""
+    try:
+        seconds = 0.0
+        for part in text.split(":"):
+            seconds = seconds * 60 + float(part)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid time '{text}', expected SECONDS or MM:SS")
+    
+    if seconds < 0:
+        raise argparse.ArgumentTypeError(f"Invalid time '{text}', must not be negative")
+    return seconds
+
+
+def parse_rendition_arg(text: str):
+    """Parse a --rendition spec (see core.renditions.parse_rendition)"""
+    from core.renditions import parse_rendition
+    
+    try:
+        return parse_rendition(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_grade(text: str) -> str:
+    """Parse a colour grade: a look name or a .cube LUT file"""
+    from core.color_lut import is_lut_file, load_lut
+    from core.effects import ColorGrading
+    
+    if text in ColorGrading.LOOKS:
+        return text
+    if not is_lut_file(text):
+        raise argparse.ArgumentTypeError(
+            f"Invalid grade '{text}', expected {', '.join(ColorGrading.LOOKS)} or a .cube file")
+    
+    path = os.path.abspath(text)
+    try:
+        load_lut(path)
+    except (OSError, ValueError) as e:
+        raise argparse.ArgumentTypeError(f"Can't load LUT '{text}': {e}")
+    return path
+
+
+def apply_render_overrides(project, args: argparse.Namespace):
+    """Apply command-line overrides to a loaded project"""
+    if getattr(args, 'resolution', None):
+        project.resolution = args.resolution
+    if getattr(args, 'fps', None):
+        project.fps = args.fps
+    if getattr(args, 'crf', None) is not None:
+        project.crf = args.crf
+    if getattr(args, 'grade', None):
+        project.grade = args.grade
+    if getattr(args, 'grade_intensity', None) is not None:
+        project.grade_intensity = args.grade_intensity
+
+
+def cmd_render(args: argparse.Namespace) -> int:
+    """Render a project file to video"""
+    reporter = JsonLineReporter()
+    
+    try:
+        ensure_application()
+        from core.video_exporter import VideoExporter
+        
+        project = load_project(args.project)
+        apply_render_overrides(project, args)
+        scene, background = prepare_render(project)
+    except Exception as e:
+        reporter.emit("error", message=f"Failed to load project: {e}")
+        return 1
+    
+    # The exporter rejects conflicting overlay, sequence, loop and rendition options
+    try:
+        exporter = VideoExporter(
+            scene,
+            os.path.abspath(args.output),
+            background,
+            preset=args.preset,
+            start_time=args.start,
+            end_time=args.end,
+            draft=args.draft,
+            supersample=args.supersample,
+            renditions=args.rendition,
+            overlay=args.overlay,
+            image_sequence=args.sequence,
+            loop=args.loop
+        )
+    except ValueError as e:
+        reporter.emit("error", message=f"Invalid render settings: {e}")
+        return 1
+    
+    exporter.segment_seconds = args.segment_seconds
+    if args.compression is not None:
+        exporter.sequence_compression = args.compression
+    if args.writers:
+        exporter.sequence_workers = args.writers
+    if args.dither:
+        exporter.loop_dither = args.dither
+    if args.render_workers is not None:
+        exporter.render_workers = args.render_workers
+    exporter.resume = not args.fresh
+    exporter.audio_copy = not args.reencode_audio
+    if args.audio_bitrate:
+        exporter.audio_bitrate = args.audio_bitrate
+    reporter.connect(exporter)
+    
+    failed = []
+    exporter.error.connect(failed.append)
+    
+    # Run synchronously - signals are delivered directly on this thread
+    exporter.run()
+    
+    return 1 if failed else 0
+
+
+def cmd_batch(args: argparse.Namespace) -> int:
+    """Render all jobs of a batch manifest"""
+    from core.render_queue import RenderManifest, RenderQueue
+    
+    reporter = JsonLineReporter()
+    
+    try:
+        manifest = RenderManifest.load_from_file(args.manifest)
+    except Exception as e:
+        reporter.emit("error", message=f"Failed to load manifest: {e}")
+        return 1
+    
+    if args.workers:
+        manifest.workers = args.workers
+    if args.retries is not None:
+        manifest.retries = args.retries
+    
+    reporter.emit("status", message=f"Rendering {len(manifest.jobs)} jobs "
+                                    f"with {manifest.workers} workers")
+    
+    queue = RenderQueue(manifest)
+    queue.run(on_result=lambda result: reporter.emit("job_finished", **result.to_dict()))
+    
+    summary_path = queue.save_summary()
+    summary = queue.summary()
+    del summary['results']
+    reporter.emit("summary", path=summary_path, **summary)
+    
+    return 0 if summary['failed'] == 0 else 1
+
+
+def cmd_distribute(args: argparse.Namespace) -> int:
+    """Coordinate a chunked render"""
+    from core.distributed import RenderCoordinator
+    
+    reporter = JsonLineReporter()
+    work_dir = args.work_dir or os.path.splitext(os.path.abspath(args.output))[0] + "_work"
+    
+    coordinator = RenderCoordinator(
+        args.project,
+        args.output,
+        work_dir,
+        chunk_seconds=args.chunk_seconds,
+        local_workers=args.local_workers,
+        preset=args.preset,
+        max_attempts=args.max_attempts,
+        lease_timeout=args.lease_timeout,
+        keep_work_dir=args.keep_work_dir,
+        on_event=reporter.emit
+    )
+    
+    try:
+        return 0 if coordinator.run() else 1
+    except Exception as e:
+        reporter.emit("error", message=f"Distributed render failed: {e}")
+        return 1
+
+
+def cmd_worker(args: argparse.Namespace) -> int:
+    """Render chunks for a coordinator"""
+    from core.distributed import RenderWorker
+    
+    reporter = JsonLineReporter()
+    worker = RenderWorker(
+        args.work_dir,
+        worker_id=args.worker_id,
+        idle_exit=args.idle_exit,
+        on_event=reporter.emit
+    )
+    
+    try:
+        rendered = worker.run()
+    except Exception as e:
+        reporter.emit("error", worker=worker.worker_id, message=f"Worker failed: {e}")
+        return 1
+    
+    reporter.emit("finished", worker=worker.worker_id, chunks=rendered)
+    return 0
+
+
+def cmd_stream(args: argparse.Namespace) -> int:
+    """Stream a project live"""
+    reporter = JsonLineReporter()
+    
+    try:
+        ensure_application()
+        from core.live_stream import LiveStreamer
+        
+        project = load_project(args.project)
+        apply_render_overrides(project, args)
+    except Exception as e:
+        reporter.emit("error", message=f"Failed to load project: {e}")
+        return 1
+    
+    streamer = LiveStreamer(
+        project,
+        args.track,
+        args.output,
+        loop=args.loop,
+        duration=args.duration,
+        preset=args.preset,
+        video_bitrate=args.bitrate,
+        max_lag=args.max_lag,
+        on_event=reporter.emit
+    )
+    
+    try:
+        return 0 if streamer.run() else 1
+    except Exception as e:
+        reporter.emit("error", message=f"Stream failed: {e}")
+        return 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the argument parser with all sub-commands"""
+    parser = argparse.ArgumentParser(
+        prog="python -m visualiserstudio",
+        description="VisualiserStudio headless tools"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    render = subparsers.add_parser("render", help="Render a project to video")
+    render.add_argument("project", help="Project file (.json)")
+    render.add_argument("-o", "--output", required=True, help="Output video file")
+    render.add_argument("--resolution", type=parse_resolution,
+                        help="Override resolution, e.g. 1920x1080")
+    render.add_argument("--fps", type=int, help="Override frame rate")
+    render.add_argument("--crf", type=int, help="Override quality (CRF)")
+    render.add_argument("--preset", default="medium", help="x264 encoding preset")
+    render.add_argument("--grade", type=parse_grade, metavar="LOOK|LUT",
+                        help="Colour grade: warm, cool, vintage or a .cube LUT file")
+    render.add_argument("--grade-intensity", type=float,
+                        help="Strength of the warm and cool looks (default 0.3)")
+    render.add_argument("--start", type=parse_timecode, default=0.0,
+                        help="In point, e.g. 62 or 1:02.5")
+    render.add_argument("--end", type=parse_timecode, help="Out point (default: end)")
+    render.add_argument("--draft", action="store_true",
+                        help="Quick proxy: half size, 15 fps, ultrafast, no antialiasing")
+    render.add_argument("--supersample", type=int, default=1,
+                        help="Paint at N x the resolution and downscale (high-quality masters)")
+    render.add_argument("--rendition", type=parse_rendition_arg, action="append",
+                        default=[], metavar="SPEC",
+                        help="Extra output from the same render pass: a preset "
+                             "(1080p, 720p, vertical, square) or NAME=WxH, with "
+                             "optional :crf=N:preset=P:fit=crop|pad (repeatable)")
+    render.add_argument("--overlay", choices=["prores", "webm", "png", "tiff"],
+                        help="Transparent overlay without background or audio: "
+                             "ProRes 4444 (.mov), VP9 WebM or a PNG/TIFF sequence")
+    render.add_argument("--sequence", choices=["png", "tiff"],
+                        help="Write numbered images into a directory named like the "
+                             "output instead of a video (resumes missing frames)")
+    render.add_argument("--loop", choices=["gif", "webp"],
+                        help="Short looping clip of the range (default: first 15 s) at "
+                             "480 px wide and 15 fps; GIFs use one palette for all frames")
+    render.add_argument("--dither", choices=["sierra2_4a", "floyd_steinberg", "bayer", "none"],
+                        help="GIF dithering (default: sierra2_4a)")
+    render.add_argument("--compression", type=int,
+                        help="Image sequence compression: PNG level 0-9, TIFF 0 = none")
+    render.add_argument("--writers", type=int,
+                        help="Image sequence writer threads (default: one per core)")
+    render.add_argument("--render-workers", type=int,
+                        help="Processes painting frames in parallel into shared memory "
+                             "(default: 0, paint on the export thread)")
+    render.add_argument("--segment-seconds", type=float, default=30.0,
+                        help="Length of checkpointed segments")
+    render.add_argument("--fresh", action="store_true",
+                        help="Discard checkpoints of an interrupted export")
+    render.add_argument("--reencode-audio", action="store_true",
+                        help="Always encode the audio, even if the output container "
+                             "could take the source audio as is")
+    render.add_argument("--audio-bitrate",
+                        help="Bitrate when the audio is encoded (default: 320k)")
+    render.set_defaults(func=cmd_render)
+    
+    batch = subparsers.add_parser("batch", help="Render a batch job manifest")
+    batch.add_argument("manifest", help="Job manifest (.json)")
+    batch.add_argument("--workers", type=int, help="Number of worker processes")
+    batch.add_argument("--retries", type=int, help="Retries per failed job")
+    batch.set_defaults(func=cmd_batch)
+    
+    distribute = subparsers.add_parser("distribute",
+                                       help="Render a project in chunks across workers")
+    distribute.add_argument("project", help="Project file (.json)")
+    distribute.add_argument("-o", "--output", required=True, help="Output video file")
+    distribute.add_argument("--work-dir", help="Shared work directory "
+                                               "(default: <output>_work)")
+    distribute.add_argument("--chunk-seconds", type=float, default=10.0,
+                            help="Length of each chunk")
+    distribute.add_argument("--local-workers", type=int, default=2,
+                            help="Worker processes to start on this machine")
+    distribute.add_argument("--preset", default="medium", help="x264 encoding preset")
+    distribute.add_argument("--max-attempts", type=int, default=3,
+                            help="Attempts per chunk before giving up")
+    distribute.add_argument("--lease-timeout", type=float, default=60.0,
+                            help="Seconds without heartbeat before a chunk is reassigned")
+    distribute.add_argument("--keep-work-dir", action="store_true",
+                            help="Keep segments and logs after success")
+    distribute.set_defaults(func=cmd_distribute)
+    
+    worker = subparsers.add_parser("worker", help="Render chunks for a coordinator")
+    worker.add_argument("work_dir", help="Shared work directory")
+    worker.add_argument("--worker-id", help="Name used in logs (default: host-pid)")
+    worker.add_argument("--idle-exit", action="store_true",
+                        help="Exit when no tasks are waiting")
+    worker.set_defaults(func=cmd_worker)
+    
+    stream = subparsers.add_parser("stream", help="Stream a project live in real time")
+    stream.add_argument("project", help="Project file (.json)")
+    stream.add_argument("-o", "--output", required=True,
+                        help="Stream URL (udp://, srt://, rtmp://...) or a file")
+    stream.add_argument("--track", action="append", default=[], metavar="AUDIO",
+                        help="Playlist track (repeatable, default: the project's audio)")
+    stream.add_argument("--loop", action="store_true", help="Repeat the playlist forever")
+    stream.add_argument("--duration", type=parse_timecode,
+                        help="Stop after this long, e.g. 90 or 1:30")
+    stream.add_argument("--resolution", type=parse_resolution,
+                        help="Override resolution, e.g. 1280x720")
+    stream.add_argument("--fps", type=int, help="Override frame rate")
+    stream.add_argument("--preset", default=LIVE_PRESET, help="x264 encoding preset")
+    stream.add_argument("--grade", type=parse_grade, metavar="LOOK|LUT",
+                        help="Colour grade: warm, cool, vintage or a .cube LUT file")
+    stream.add_argument("--grade-intensity", type=float,
+                        help="Strength of the warm and cool looks (default 0.3)")
+    stream.add_argument("--bitrate", type=int, default=LIVE_VIDEO_BITRATE,
+                        help="Video bitrate in kbit/s")
+    stream.add_argument("--max-lag", type=int, default=LIVE_MAX_LAG_FRAMES,
+                        help="Frames rendering may fall behind before frames are "
+                             "repeated to keep the stream real time")
+    stream.set_defaults(func=cmd_stream)
+    
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    setup_headless_environment()
+    
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    return args.func(args)